@@ -0,0 +1,180 @@
+"""
+Admission control for /invocations.
+Caps how many turns run at once and how many may wait for a slot;
+anything beyond that is shed immediately with a Retry-After hint
+instead of slowing every in-flight request down together.
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed; ``retry_after`` is in whole seconds."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Admission:
+    """A held slot; release it (or use it as a context manager) when the turn ends."""
+
+    def __init__(self, controller: "AdmissionController", queue_wait: float):
+        self._controller = controller
+        self._released = False
+        self.queue_wait = queue_wait
+        self._started = time.perf_counter()
+
+    def release(self):
+        if self._released:
+            return
+        self._released = True
+        self._controller._release(time.perf_counter() - self._started)
+
+    def __enter__(self) -> "Admission":
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class AdmissionController:
+    """
+    Concurrency limit plus a bounded wait queue.
+
+    At most ``max_concurrent`` requests hold a slot and at most ``max_queue``
+    more wait up to ``queue_timeout`` seconds for one. A controller is used
+    either from async handlers (``acquire``) or from worker threads
+    (``acquire_sync``), not both.
+    """
+
+    def __init__(self, max_concurrent: int = 4, max_queue: int = 16, queue_timeout: float = 30.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._thread_slots = threading.BoundedSemaphore(max_concurrent)
+        self._async_slots: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        self._waiting = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._queue_timeouts = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+        # EWMA of how long a slot is held; drives the Retry-After estimate
+        self._hold_avg = 0.0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """Build from AGENT_MAX_CONCURRENT / AGENT_MAX_QUEUE / AGENT_QUEUE_TIMEOUT."""
+        return cls(
+            max_concurrent=int(os.getenv("AGENT_MAX_CONCURRENT", "4")),
+            max_queue=int(os.getenv("AGENT_MAX_QUEUE", "16")),
+            queue_timeout=float(os.getenv("AGENT_QUEUE_TIMEOUT", "30")),
+        )
+
+    @property
+    def busy(self) -> bool:
+        """True when every slot is taken, so new work would have to queue."""
+        return self._in_flight + self._waiting >= self.max_concurrent
+
+    @property
+    def saturated(self) -> bool:
+        """True when the wait queue is full and new work would be shed."""
+        return self._in_flight + self._waiting >= self.max_concurrent + self.max_queue
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to free up for a new caller."""
+        rounds = (self._waiting + 1) / self.max_concurrent
+        return max(1, min(60, math.ceil(self._hold_avg * rounds)))
+
+    def _enqueue(self):
+        with self._lock:
+            if self.saturated:
+                self._rejected += 1
+                raise AdmissionRejected(
+                    f"{self._in_flight} requests running and {self._waiting} queued",
+                    self.retry_after(),
+                )
+            self._waiting += 1
+
+    def _admit(self, enqueued_at: float) -> Admission:
+        wait = time.perf_counter() - enqueued_at
+        with self._lock:
+            self._waiting -= 1
+            self._in_flight += 1
+            self._admitted += 1
+            self._queue_wait_total += wait
+            self._queue_wait_max = max(self._queue_wait_max, wait)
+        return Admission(self, wait)
+
+    def _queue_timeout(self, timeout: Optional[float]) -> float:
+        return self.queue_timeout if timeout is None else min(self.queue_timeout, timeout)
+
+    def _give_up(self, waited: float) -> AdmissionRejected:
+        with self._lock:
+            self._waiting -= 1
+            self._queue_timeouts += 1
+            return AdmissionRejected(f"No slot within {waited:.1f}s", self.retry_after())
+
+    def _release(self, held: float):
+        with self._lock:
+            self._in_flight -= 1
+            self._hold_avg = held if self._hold_avg == 0.0 else 0.8 * self._hold_avg + 0.2 * held
+        if self._async_slots is not None:
+            self._async_slots.release()
+        else:
+            self._thread_slots.release()
+
+    async def acquire(self, timeout: Optional[float] = None) -> Admission:
+        """
+        Wait (without blocking the loop) for a slot, at most ``timeout``
+        seconds if that is shorter than the queue timeout; raises AdmissionRejected.
+        """
+        if self._async_slots is None:
+            self._async_slots = asyncio.Semaphore(self.max_concurrent)
+        self._enqueue()
+        enqueued_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._async_slots.acquire(), self._queue_timeout(timeout))
+        except asyncio.TimeoutError:
+            raise self._give_up(self._queue_timeout(timeout))
+        except BaseException:
+            # Caller went away while queued
+            with self._lock:
+                self._waiting -= 1
+            raise
+        return self._admit(enqueued_at)
+
+    def acquire_sync(self, timeout: Optional[float] = None) -> Admission:
+        """Block the calling thread until a slot frees up (see ``acquire``); raises AdmissionRejected."""
+        self._enqueue()
+        enqueued_at = time.perf_counter()
+        if not self._thread_slots.acquire(timeout=self._queue_timeout(timeout)):
+            raise self._give_up(self._queue_timeout(timeout))
+        return self._admit(enqueued_at)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of limits, load, shed counts and queue wait."""
+        with self._lock:
+            avg_wait = self._queue_wait_total / self._admitted if self._admitted else 0.0
+            return {
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "queue_timeout_seconds": self.queue_timeout,
+                "in_flight": self._in_flight,
+                "queued": self._waiting,
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "queue_timeouts": self._queue_timeouts,
+                "queue_wait_ms": {
+                    "avg": round(avg_wait * 1000, 2),
+                    "max": round(self._queue_wait_max * 1000, 2),
+                },
+            }
@@ -4,12 +4,22 @@ Uses BedrockAgentCoreApp framework with MCP server integration.
 Tracks user_id and session_id for observability and evaluation.
 """
 
+import asyncio
 import os
 from urllib.parse import quote
 from strands import Agent
 from strands.models import BedrockModel
-from strands.tools.mcp import MCPClient
+from strands.agent.conversation_manager import SlidingWindowConversationManager
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
+from bedrock_agentcore.runtime.models import PingStatus
+from starlette.responses import JSONResponse
+from admission import AdmissionController, AdmissionRejected
+from deadline import Deadline, DeadlineExceeded, DeadlineHooks, bind_bedrock_client
+from prompt_cache import PromptCacheFallback, cache_usage, prompt_cache_mode, prompt_cache_options
+from sessions import SessionRegistry
+from tool_catalog import CachedToolsMCPClient, catalog_options
+from tool_results import ToolResultCache
+from warmup import Warmup, warmup_prompt, warmup_wait
 
 # ============================================================================
 # Configuration
@@ -24,6 +34,22 @@ MCP_SERVER_ARN = os.getenv("MCP_SERVER_ARN", "arn:aws:bedrock-agentcore:us-west-
 DEFAULT_USER_ID = os.getenv("DEFAULT_USER_ID", "test-user-001")
 DEFAULT_SESSION_ID = os.getenv("DEFAULT_SESSION_ID", "test-session-001")
 
+# Per-session history window (messages kept by the conversation manager)
+SESSION_HISTORY_WINDOW = int(os.getenv("AGENT_SESSION_WINDOW", "20"))
+
+# Request time budget when the caller sends no X-Request-Deadline / X-Request-Timeout (0: none), and its ceiling
+REQUEST_TIMEOUT = float(os.getenv("AGENT_REQUEST_TIMEOUT", "0")) or None
+MAX_REQUEST_TIMEOUT = float(os.getenv("AGENT_MAX_REQUEST_TIMEOUT", "900")) or None
+
+# Bedrock prompt-cache checkpoints: "auto" (tools + history), "tools" or "off"
+PROMPT_CACHE = prompt_cache_mode()
+
+# Permanent consumer id that keeps the shared MCP client open between session agents
+RUNTIME_CONSUMER = "evaluation-runtime"
+
+# Per-step init timings; /ping reports HealthyBusy until warm-up finishes
+warmup = Warmup()
+
 print("\n" + "=" * 80)
 print(" AgentCore Evaluation Agent - Initialization")
 print("=" * 80)
@@ -33,41 +59,84 @@ print("=" * 80)
 # ============================================================================
 
 print("[1/4] Creating MCP Client...")
-if USE_MCP_ARN:
-    print(f"      MCP Mode: AgentCore Runtime (ARN)")
-    print(f"      ARN: {MCP_SERVER_ARN}")
-    try:
-        from mcp_proxy_for_aws.client import aws_iam_streamablehttp_client
-        encoded_arn = quote(MCP_SERVER_ARN, safe="")
-        mcp_endpoint_url = f"https://bedrock-agentcore.us-west-2.amazonaws.com/runtimes/{encoded_arn}/invocations?qualifier=DEFAULT"
-        mcp_client = MCPClient(
-            lambda: aws_iam_streamablehttp_client(
-                endpoint=mcp_endpoint_url,
-                aws_region="us-west-2",
-                aws_service="bedrock-agentcore"
+with warmup.step("create_mcp_client"):
+    # Results of the tools named in AGENT_TOOL_CACHE_TOOLS are memoized client-side
+    tool_result_cache = ToolResultCache.from_env()
+    if USE_MCP_ARN:
+        print(f"      MCP Mode: AgentCore Runtime (ARN)")
+        print(f"      ARN: {MCP_SERVER_ARN}")
+        try:
+            from mcp_proxy_for_aws.client import aws_iam_streamablehttp_client
+            encoded_arn = quote(MCP_SERVER_ARN, safe="")
+            mcp_endpoint_url = f"https://bedrock-agentcore.us-west-2.amazonaws.com/runtimes/{encoded_arn}/invocations?qualifier=DEFAULT"
+            mcp_client = CachedToolsMCPClient(
+                lambda: aws_iam_streamablehttp_client(
+                    endpoint=mcp_endpoint_url,
+                    aws_region="us-west-2",
+                    aws_service="bedrock-agentcore"
+                ),
+                result_cache=tool_result_cache,
+                **catalog_options(MCP_SERVER_ARN)
             )
-        )
-        print("      ✓ Using AWS IAM authentication")
-    except ImportError:
-        print("      ⚠ mcp-proxy-for-aws not installed, falling back to HTTP")
+            print("      ✓ Using AWS IAM authentication")
+        except ImportError:
+            print("      ⚠ mcp-proxy-for-aws not installed, falling back to HTTP")
+            from mcp.client.streamable_http import streamable_http_client
+            mcp_client = CachedToolsMCPClient(
+                lambda: streamable_http_client(MCP_SERVER_URL), result_cache=tool_result_cache,
+                **catalog_options(MCP_SERVER_URL)
+            )
+    else:
+        print(f"      MCP Mode: HTTP Endpoint")
+        print(f"      URL: {MCP_SERVER_URL}")
         from mcp.client.streamable_http import streamable_http_client
-        mcp_client = MCPClient(lambda: streamable_http_client(MCP_SERVER_URL))
-else:
-    print(f"      MCP Mode: HTTP Endpoint")
-    print(f"      URL: {MCP_SERVER_URL}")
-    from mcp.client.streamable_http import streamable_http_client
-    mcp_client = MCPClient(lambda: streamable_http_client(MCP_SERVER_URL))
-    print("      ✓ Using HTTP client")
+        mcp_client = CachedToolsMCPClient(
+            lambda: streamable_http_client(MCP_SERVER_URL), result_cache=tool_result_cache,
+            **catalog_options(MCP_SERVER_URL)
+        )
+        print("      ✓ Using HTTP client")
+    # The runtime itself holds the client: session agents come and go, and when the last one is
+    # evicted Strands would otherwise stop the MCP session and drop the discovered tool catalog
+    mcp_client.add_consumer(RUNTIME_CONSUMER)
 
 # ============================================================================
 # Initialize Strands Agent
 # ============================================================================
 
 print("\n[2/4] Creating Strands Agent...")
-bedrock_model = BedrockModel(model_id="anthropic.claude-3-5-sonnet-20240620-v1:0")
-agent = Agent(model=bedrock_model, tools=[mcp_client])
+with warmup.step("create_model"):
+    bedrock_model = BedrockModel(model_id="anthropic.claude-3-5-sonnet-20240620-v1:0",
+                                 **prompt_cache_options(PROMPT_CACHE))
+    # Turns caching off and retries if the model rejects cache checkpoints
+    prompt_cache_fallback = PromptCacheFallback()
+    # Refuses Bedrock calls and closes the open response stream once a request's deadline passes
+    bind_bedrock_client(bedrock_model.client)
+    deadline_hooks = DeadlineHooks()
+
+
+def _new_session_agent() -> Agent:
+    # One agent per session so conversations never mix across users
+    return Agent(
+        model=bedrock_model,
+        tools=[mcp_client],
+        conversation_manager=SlidingWindowConversationManager(window_size=SESSION_HISTORY_WINDOW),
+        hooks=[prompt_cache_fallback, deadline_hooks]
+    )
+
+
+with warmup.step("create_sessions"):
+    agent_sessions = SessionRegistry.from_env(_new_session_agent)
+
+# Caps concurrent invocations and queued ones; the rest are shed with Retry-After
+admission = AdmissionController.from_env()
+
 print("      ✓ Bedrock Model: Claude 3.5 Sonnet")
-print("      ✓ MCP Tools: Auto-discovered from MCP server")
+print(f"      ✓ Prompt cache: {PROMPT_CACHE}")
+print("      ✓ MCP Tools: Auto-discovered from MCP server during warm-up")
+print(f"      ✓ Sessions: max {agent_sessions.max_sessions}, idle TTL {agent_sessions.idle_ttl}s, "
+      f"window {SESSION_HISTORY_WINDOW} messages")
+print(f"      ✓ Admission: {admission.max_concurrent} concurrent, {admission.max_queue} queued, "
+      f"queue timeout {admission.queue_timeout}s")
 
 # ============================================================================
 # Configure Observability
@@ -90,6 +159,45 @@ print("      ✓ AgentCore App initialized with observability")
 print("=" * 80 + "\n")
 
 
+# ============================================================================
+# Background Warm-up
+# ============================================================================
+
+def _discover_tools():
+    """Open the MCP session and cache the tool list every session agent reuses."""
+    tools = asyncio.run(mcp_client.load_tools())
+    print(f"      ✓ MCP tools: {', '.join(tool.tool_name for tool in tools)}")
+    catalog = mcp_client.catalog_stats()
+    print(f"      ✓ Tool catalog from {catalog['source']} (age {catalog['age_seconds']}s)")
+
+
+def _send_warmup_prompt():
+    """One short turn on a throwaway session so Bedrock connections are warm."""
+    session = agent_sessions.acquire("warmup")
+    try:
+        session.agent(warmup_prompt())
+    finally:
+        agent_sessions.evict("warmup")
+
+
+warmup.add("discover_tools", _discover_tools)
+if warmup_prompt():
+    warmup.add("warmup_prompt", _send_warmup_prompt, required=False)
+warmup.start()
+
+
+@app.ping
+def ping_status():
+    """
+    HealthyBusy until warm-up has discovered the MCP tools and while every
+    admission slot is taken. If discovery failed, report Healthy so
+    invocations retry it lazily as before.
+    """
+    if admission.busy:
+        return PingStatus.HEALTHY_BUSY
+    return PingStatus.HEALTHY if warmup.ready or warmup.failed else PingStatus.HEALTHY_BUSY
+
+
 # ============================================================================
 # Agent Entrypoint with User/Session Tracking
 # ============================================================================
@@ -100,6 +208,10 @@ def agent_invocation(payload, context):
     Main agent invocation handler.
     Extracts user_id and session_id from payload or context for tracking.
     """
+    # Invocations that arrive during warm-up wait for it rather than race it
+    if not warmup.ready:
+        warmup.wait_ready_sync(warmup_wait())
+    
     # Extract user inputs
     user_message = payload.get("prompt", "No prompt provided")
     
@@ -146,6 +258,26 @@ def agent_invocation(payload, context):
     except Exception as e:
         print(f" [OTEL] Note: {e}")
     
+    # Time budget of this request; the timer cancels it (and the turn) when it runs out
+    deadline = Deadline.from_headers(getattr(context, "request_headers", None) or {},
+                                     REQUEST_TIMEOUT, MAX_REQUEST_TIMEOUT)
+    deadline.start()
+    
+    # Shed load once the wait queue is full instead of slowing everyone down
+    try:
+        ticket = admission.acquire_sync(deadline.remaining())
+    except AdmissionRejected as e:
+        deadline.finish()
+        if deadline.cancelled:
+            print(f" [DEADLINE] {deadline.reason} while queued")
+            return JSONResponse({"error": f"Request {deadline.reason}"}, status_code=504)
+        print(f" [SHED] {str(e)} (retry after {e.retry_after}s)")
+        return JSONResponse(
+            {"error": "Agent is busy, retry later", "admission": admission.stats()},
+            status_code=503,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
     # Invoke agent with X-Ray tracing
     try:
         from opentelemetry import trace as otel_trace
@@ -157,8 +289,25 @@ def agent_invocation(payload, context):
             span.set_attribute("session_id", session_id)
             span.set_attribute("model", "claude-3-5-sonnet")
             span.set_attribute("prompt_length", len(user_message))
+            span.set_attribute("queue_wait_ms", round(ticket.queue_wait * 1000, 2))
             
-            result = agent(user_message)
+            session = agent_sessions.acquire(session_id)
+            with session.lock, deadline.activate():
+                session.turns += 1
+                history = list(session.agent.messages)
+                try:
+                    deadline.check()
+                    result = session.agent(user_message)
+                except Exception as e:
+                    if not deadline.cancelled:
+                        raise
+                    # Drop the half-finished turn so the session's next prompt starts clean
+                    session.agent.messages[:] = history
+                    raise DeadlineExceeded(deadline.reason) from e
+            span.set_attribute("session_turn", session.turns)
+            usage = cache_usage(result)
+            for key, count in usage.items():
+                span.set_attribute(f"gen_ai.usage.{key}", count)
             
             span.set_attribute("response_received", True)
         
@@ -177,6 +326,9 @@ def agent_invocation(payload, context):
             response_text = str(result)
         
         print(f"\n[RESPONSE] {response_text[:200]}{'...' if len(response_text) > 200 else ''}\n")
+        if usage:
+            print(f"[TOKENS] input={usage['input_tokens']} output={usage['output_tokens']} "
+                  f"cache_read={usage['cache_read_tokens']} cache_write={usage['cache_write_tokens']}")
         
         # Return structured response with metadata
         return {
@@ -184,10 +336,24 @@ def agent_invocation(payload, context):
             "metadata": {
                 "user_id": user_id,
                 "session_id": session_id,
-                "response_length": len(response_text)
+                "response_length": len(response_text),
+                "session_turn": session.turns,
+                "active_sessions": agent_sessions.stats()["active"],
+                "queue_wait_ms": round(ticket.queue_wait * 1000, 2),
+                "tool_cache": tool_result_cache.stats()["tools"],
+                "tokens": usage
             }
         }
         
+    except DeadlineExceeded as e:
+        print(f"\n[DEADLINE] {str(e)}\n")
+        if hasattr(context, 'set_trace_attribute'):
+            context.set_trace_attribute("error", str(e))
+        return JSONResponse(
+            {"error": str(e), "metadata": {"user_id": user_id, "session_id": session_id}},
+            status_code=504
+        )
+    
     except Exception as e:
         print(f"\n[ERROR] {str(e)}\n")
         if hasattr(context, 'set_trace_attribute'):
@@ -200,6 +366,10 @@ def agent_invocation(payload, context):
                 "session_id": session_id
             }
         }
+    
+    finally:
+        deadline.finish()
+        ticket.release()
 
 
 # ============================================================================
@@ -0,0 +1,364 @@
+"""
+Cached MCP tool catalog.
+Keeps the discovered tool specs in memory with a TTL and in a local
+snapshot file, so a restart can build agents without a tools/list
+round-trip; the catalog is refreshed in the background when it expires
+or when the server announces that its tool list changed.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from mcp.types import ServerNotification, Tool, ToolListChangedNotification
+from strands.tools.mcp import MCPAgentTool, MCPClient
+
+from deadline import DeadlineExceeded, current_deadline
+from tool_results import ToolResultCache
+
+# MCPClient's prefix for calls that raised (transport error, timeout) rather than returning a tool result
+TRANSPORT_ERROR_PREFIX = "Tool execution failed:"
+
+
+def catalog_options(endpoint: str) -> Dict[str, Any]:
+    """
+    Catalog settings from AGENT_TOOL_CATALOG_TTL / AGENT_TOOL_SNAPSHOT /
+    AGENT_TOOL_SNAPSHOT_DIR; the snapshot file is named after the endpoint.
+    """
+    snapshot_path = None
+    if os.getenv("AGENT_TOOL_SNAPSHOT", "true").lower() in ("true", "1", "yes"):
+        directory = os.getenv("AGENT_TOOL_SNAPSHOT_DIR", tempfile.gettempdir())
+        digest = hashlib.sha256(endpoint.encode("utf-8")).hexdigest()[:16]
+        snapshot_path = os.path.join(directory, f"mcp_tools_{digest}.json")
+    return {
+        "snapshot_path": snapshot_path,
+        "catalog_ttl": float(os.getenv("AGENT_TOOL_CATALOG_TTL", "900")),
+    }
+
+
+class CachedToolsMCPClient(MCPClient):
+    """
+    MCPClient whose tool catalog outlives the session.
+
+    ``load_tools`` answers from memory while the catalog is younger than
+    ``catalog_ttl`` (0 = never expires), then from the snapshot file, and
+    only falls back to a blocking tools/list when neither exists. Expired
+    or snapshot-loaded catalogs are re-listed on a background thread,
+    which also opens the session ahead of the first tool call;
+    ``on_catalog_change`` is called when the refreshed list differs.
+    Calls to tools opted into ``result_cache`` are answered from it when
+    the same arguments were seen before. With a ``breaker`` (see
+    circuit_breaker.CircuitBreaker) set, transport failures of server calls
+    and blocking tool listings are reported to it, and both are refused at
+    once while it is open.
+    """
+
+    def __init__(self, transport_callable: Callable[[], Any], *, snapshot_path: Optional[str] = None,
+                 catalog_ttl: float = 900.0,
+                 on_catalog_change: Optional[Callable[[List[MCPAgentTool]], None]] = None,
+                 result_cache: Optional[ToolResultCache] = None, **kwargs: Any):
+        super().__init__(transport_callable, **kwargs)
+        self.snapshot_path = snapshot_path
+        self.catalog_ttl = catalog_ttl
+        self.on_catalog_change = on_catalog_change
+        self.result_cache = result_cache or ToolResultCache()
+        self.breaker: Any = None
+        self._session_lock = threading.Lock()
+        self._catalog_lock = threading.Lock()
+        self._catalog_stats_lock = threading.Lock()
+        self._catalog_fetched_at: Optional[float] = None
+        self._catalog_fingerprint: Optional[str] = None
+        self._catalog_source: Optional[str] = None
+        self._refreshing = False
+        self._memory_hits = 0
+        self._snapshot_loads = 0
+        self._network_fetches = 0
+        self._background_refreshes = 0
+        self._refresh_failures = 0
+        self._list_changed = 0
+        self._catalog_changes = 0
+
+    # ------------------------------------------------------------------
+    # Session
+    # ------------------------------------------------------------------
+
+    def _open_session(self):
+        """Start the session if it is not running, keeping the state stop() resets."""
+        if self._is_session_active():
+            return
+        with self._session_lock:
+            if self._is_session_active():
+                return
+            consumers = set(self._consumers)
+            tools = self._loaded_tools
+            provider_started = self._tool_provider_started
+            try:
+                if self._background_thread is not None:
+                    # A previous session died; clear it out before starting again
+                    try:
+                        self.stop(None, None, None)
+                    except Exception:
+                        pass
+                self.start()
+            finally:
+                self._consumers = consumers
+                self._loaded_tools = tools
+                self._tool_provider_started = provider_started
+
+    def _deadline_timeout(self, tool_use_id: str, read_timeout_seconds: Optional[timedelta]):
+        """The request's remaining budget as the tools/call timeout, or an error result once it is spent."""
+        deadline = current_deadline()
+        if deadline is None:
+            return None, read_timeout_seconds
+        if deadline.cancelled:
+            return self._handle_tool_execution_error(tool_use_id, DeadlineExceeded(deadline.reason)), None
+        remaining = deadline.remaining()
+        if remaining is not None and (read_timeout_seconds is None
+                                      or read_timeout_seconds.total_seconds() > remaining):
+            read_timeout_seconds = timedelta(seconds=remaining)
+        return None, read_timeout_seconds
+
+    async def call_tool_async(self, tool_use_id: str, name: str, arguments: Optional[Dict[str, Any]] = None,
+                              read_timeout_seconds: Optional[timedelta] = None):
+        expired, read_timeout_seconds = self._deadline_timeout(tool_use_id, read_timeout_seconds)
+        if expired is not None:
+            return expired
+        if not self.result_cache.cacheable(name):
+            return await self._guarded_call_async(tool_use_id, name, arguments, read_timeout_seconds)
+        result = self.result_cache.get(tool_use_id, name, arguments)
+        if result is None:
+            result = await self._guarded_call_async(tool_use_id, name, arguments, read_timeout_seconds)
+            self.result_cache.put(name, arguments, result)
+        return result
+
+    def call_tool_sync(self, tool_use_id: str, name: str, arguments: Optional[Dict[str, Any]] = None,
+                       read_timeout_seconds: Optional[timedelta] = None):
+        expired, read_timeout_seconds = self._deadline_timeout(tool_use_id, read_timeout_seconds)
+        if expired is not None:
+            return expired
+        if not self.result_cache.cacheable(name):
+            return self._guarded_call_sync(tool_use_id, name, arguments, read_timeout_seconds)
+        result = self.result_cache.get(tool_use_id, name, arguments)
+        if result is None:
+            result = self._guarded_call_sync(tool_use_id, name, arguments, read_timeout_seconds)
+            self.result_cache.put(name, arguments, result)
+        return result
+
+    async def _guarded_call_async(self, tool_use_id: str, name: str, arguments: Optional[Dict[str, Any]],
+                                  read_timeout_seconds: Optional[timedelta]):
+        """One server call, refused while the breaker is open."""
+        if self.breaker is None:
+            return await self._call_tool_async(tool_use_id, name, arguments, read_timeout_seconds)
+        if not self.breaker.allow():
+            return self._handle_tool_execution_error(tool_use_id, self.breaker.open_error())
+        result = await self._call_tool_async(tool_use_id, name, arguments, read_timeout_seconds)
+        self._record_outcome(result)
+        return result
+
+    def _guarded_call_sync(self, tool_use_id: str, name: str, arguments: Optional[Dict[str, Any]],
+                           read_timeout_seconds: Optional[timedelta]):
+        if self.breaker is None:
+            return self._call_tool_sync(tool_use_id, name, arguments, read_timeout_seconds)
+        if not self.breaker.allow():
+            return self._handle_tool_execution_error(tool_use_id, self.breaker.open_error())
+        result = self._call_tool_sync(tool_use_id, name, arguments, read_timeout_seconds)
+        self._record_outcome(result)
+        return result
+
+    def _record_outcome(self, result: Dict[str, Any]):
+        # Errors the tool itself returned mean the server is up; only calls that raised count against it
+        text = result["content"][0].get("text", "") if result.get("content") else ""
+        if result["status"] != "error" or not text.startswith(TRANSPORT_ERROR_PREFIX):
+            self.breaker.record_success()
+            return
+        deadline = current_deadline()
+        # A call cut short by the request's own deadline says nothing about the server
+        if deadline is None or not deadline.cancelled:
+            self.breaker.record_failure(text[len(TRANSPORT_ERROR_PREFIX):].strip())
+
+    async def _call_tool_async(self, tool_use_id: str, name: str, arguments: Optional[Dict[str, Any]] = None,
+                               read_timeout_seconds: Optional[timedelta] = None):
+        """One call on the server (no result cache)."""
+        # Tools built from the snapshot have no session behind them yet
+        if not self._is_session_active():
+            try:
+                await asyncio.to_thread(self._open_session)
+            except Exception as e:
+                return self._handle_tool_execution_error(tool_use_id, e)
+        return await super().call_tool_async(tool_use_id, name, arguments, read_timeout_seconds)
+
+    def _call_tool_sync(self, tool_use_id: str, name: str, arguments: Optional[Dict[str, Any]] = None,
+                        read_timeout_seconds: Optional[timedelta] = None):
+        if not self._is_session_active():
+            try:
+                self._open_session()
+            except Exception as e:
+                return self._handle_tool_execution_error(tool_use_id, e)
+        return super().call_tool_sync(tool_use_id, name, arguments, read_timeout_seconds)
+
+    # ------------------------------------------------------------------
+    # Catalog
+    # ------------------------------------------------------------------
+
+    @property
+    def catalog_stale(self) -> bool:
+        if self._catalog_fetched_at is None:
+            return True
+        return self.catalog_ttl > 0 and time.time() - self._catalog_fetched_at > self.catalog_ttl
+
+    async def load_tools(self, **kwargs: Any):
+        """ToolProvider entry point: memory, then snapshot, then the network."""
+        if self._loaded_tools is not None:
+            with self._catalog_stats_lock:
+                self._memory_hits += 1
+            if self.catalog_stale:
+                self.refresh_catalog_async()
+            return self._loaded_tools
+
+        if self._load_snapshot():
+            self._tool_provider_started = True
+            # Check the snapshot against the server and warm the session off the request path
+            self.refresh_catalog_async(force=True)
+            return self._loaded_tools
+
+        if self.breaker is not None and not self.breaker.allow():
+            raise self.breaker.open_error()
+        try:
+            tools = await asyncio.to_thread(self._fetch_catalog)
+        except Exception as e:
+            if self.breaker is not None:
+                self.breaker.record_failure(f"{type(e).__name__}: {e}")
+            raise
+        if self.breaker is not None:
+            self.breaker.record_success()
+        with self._catalog_stats_lock:
+            self._network_fetches += 1
+        self._install(tools, "network")
+        return self._loaded_tools
+
+    def _fetch_catalog(self) -> List[MCPAgentTool]:
+        """tools/list over the session, following pagination."""
+        self._open_session()
+        self._tool_provider_started = True
+        tools: List[MCPAgentTool] = []
+        pagination_token = None
+        while True:
+            page = self.list_tools_sync(pagination_token, prefix=self._prefix, tool_filters=self._tool_filters)
+            tools.extend(page)
+            pagination_token = page.pagination_token
+            if pagination_token is None:
+                return tools
+
+    def refresh_catalog_async(self, force: bool = False):
+        """Re-list the tools on a background thread unless a refresh is already running."""
+        with self._catalog_lock:
+            if self._refreshing or not (force or self.catalog_stale):
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh, name="mcp-tool-catalog", daemon=True).start()
+
+    def _refresh(self):
+        try:
+            tools = self._fetch_catalog()
+        except Exception as e:
+            with self._catalog_stats_lock:
+                self._refresh_failures += 1
+            print(f"[TOOLS] background catalog refresh failed: {str(e)}")
+            return
+        finally:
+            with self._catalog_lock:
+                self._refreshing = False
+        with self._catalog_stats_lock:
+            self._background_refreshes += 1
+        changed = self._install(tools, "network")
+        if changed:
+            print(f"[TOOLS] catalog changed: {', '.join(tool.tool_name for tool in tools)}")
+            if self.on_catalog_change is not None:
+                self.on_catalog_change(tools)
+
+    def _install(self, tools: List[MCPAgentTool], source: str) -> bool:
+        """Swap in a catalog; True if it differs from the one it replaces."""
+        entries = [{"name": tool.tool_name, "mcp_tool": tool.mcp_tool.model_dump(mode="json", exclude_none=True)}
+                   for tool in tools]
+        fingerprint = hashlib.sha256(json.dumps(entries, sort_keys=True).encode("utf-8")).hexdigest()
+        changed = self._catalog_fingerprint is not None and fingerprint != self._catalog_fingerprint
+        if changed:
+            with self._catalog_stats_lock:
+                self._catalog_changes += 1
+            # A changed tool may compute different results now
+            self.result_cache.clear()
+        if self._loaded_tools is None or changed or self._catalog_fingerprint is None:
+            self._loaded_tools = tools
+        self._catalog_fingerprint = fingerprint
+        self._catalog_fetched_at = time.time()
+        self._catalog_source = source
+        if source == "network":
+            self._write_snapshot(entries)
+        return changed
+
+    def _load_snapshot(self) -> bool:
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            tools = [MCPAgentTool(Tool.model_validate(entry["mcp_tool"]), self, name_override=entry["name"])
+                     for entry in snapshot["tools"]]
+        except Exception as e:
+            print(f"[TOOLS] ignoring unreadable snapshot {self.snapshot_path}: {str(e)}")
+            return False
+        self._install(tools, "snapshot")
+        # Age the catalog from when it was listed, not when it was read back
+        self._catalog_fetched_at = snapshot.get("fetched_at", 0.0)
+        with self._catalog_stats_lock:
+            self._snapshot_loads += 1
+        return True
+
+    def _write_snapshot(self, entries: List[Dict[str, Any]]):
+        if not self.snapshot_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+            # Write-then-rename so a crash never leaves a half-written snapshot
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"fetched_at": self._catalog_fetched_at, "tools": entries}, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            print(f"[TOOLS] could not write snapshot {self.snapshot_path}: {str(e)}")
+
+    async def _handle_error_message(self, message: Any) -> None:
+        # The session's message handler also receives server notifications
+        if isinstance(message, ServerNotification) and isinstance(message.root, ToolListChangedNotification):
+            with self._catalog_stats_lock:
+                self._list_changed += 1
+            self.refresh_catalog_async(force=True)
+        await super()._handle_error_message(message)
+
+    def catalog_stats(self) -> Dict[str, Any]:
+        """Where the catalog came from and how often discovery went to the network."""
+        with self._catalog_stats_lock:
+            loads = self._memory_hits + self._snapshot_loads + self._network_fetches
+            return {
+                "tools": len(self._loaded_tools or []),
+                "source": self._catalog_source,
+                "age_seconds": round(time.time() - self._catalog_fetched_at, 1) if self._catalog_fetched_at else None,
+                "ttl_seconds": self.catalog_ttl,
+                "snapshot_path": self.snapshot_path,
+                "loads": loads,
+                "memory_hits": self._memory_hits,
+                "snapshot_loads": self._snapshot_loads,
+                "network_fetches": self._network_fetches,
+                "background_refreshes": self._background_refreshes,
+                "refresh_failures": self._refresh_failures,
+                "list_changed_notifications": self._list_changed,
+                "catalog_changes": self._catalog_changes,
+                # Only blocking fetches cost the caller a round-trip
+                "network_ratio": round(self._network_fetches / loads, 4) if loads else None,
+            }
@@ -4,11 +4,32 @@ Implements required /invocations and /ping endpoints.
 """
 
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 from datetime import datetime
-import json
+import asyncio
+import os
+import threading
+import time
 from strands import Agent
+from strands.agent.conversation_manager import SlidingWindowConversationManager
+import codec
+from codec import JSONBytesResponse
+from coalesce import SingleFlight, request_key
+from deadline import (
+    CLIENT_DISCONNECTED, DEADLINE_EXCEEDED, Deadline, DeadlineExceeded, DeadlineHooks, bind_bedrock_client,
+    cancel_on_disconnect
+)
+from executor import AgentExecutor, ExecutorSaturated, ExecutorTimeout
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, AgentMetrics
+from request_log import RequestLog
+from response_cache import CACHE_HEADER, ResponseCache, wants_cache_bypass
+from sessions import SessionRegistry, resolve_session_id
+from warmup import PING_HEALTHY_BUSY, Warmup, warmup_prompt, warmup_wait
+from streaming import (
+    SSE_HEADERS, SSE_MEDIA_TYPE, StreamRelay, format_sse, run_streaming_turn, wants_event_stream
+)
 
 # ============================================================================
 # Initialization
@@ -20,10 +41,33 @@ print("=" * 70)
 
 app = FastAPI(title="Agent PDZ-01", version="2.0.0")
 
+# Per-step init timings; /ping reports HealthyBusy until warm-up finishes
+warmup = Warmup()
+
+# Structured per-request logging, written off the event loop
+request_log = RequestLog.from_env()
+
+# Per-stage latency, token and error aggregates served on /metrics;
+# the hooks time every model call and tool call inside a turn
+metrics = AgentMetrics()
+stage_hooks = metrics.hooks()
+
+# Skips model and tool calls once the request's deadline has passed or its client went away
+deadline_hooks = DeadlineHooks()
+
+
+def _new_agent(**kwargs) -> Agent:
+    agent = Agent(hooks=[stage_hooks, deadline_hooks], **kwargs)
+    # Refuse Bedrock calls and close the open response stream once the deadline is cancelled
+    bind_bedrock_client(agent.model.client)
+    return agent
+
+
 # Initialize Strands agent
-print("[Step 1/2] Creating Strands agent...")
+print("[Step 1/4] Creating Strands agent...")
 try:
-    strands_agent = Agent()
+    with warmup.step("create_agent"):
+        strands_agent = _new_agent()
     AGENT_READY = True
     print("   ✓ Strands agent initialized successfully")
 except Exception as e:
@@ -32,16 +76,212 @@ except Exception as e:
     print(f"   ⚠ Strands agent failed: {str(e)}")
     print("   ℹ Agent will operate in mock mode")
 
-print("[Step 2/2] FastAPI configured")
+# Model turns are blocking, so they run on a bounded worker pool.
+# A Strands Agent must not be invoked concurrently, so each worker owns
+# the agent it uses for stateless requests.
+print("[Step 2/4] Creating agent executor...")
+with warmup.step("create_executor"):
+    agent_executor = AgentExecutor.from_env()
+    _worker_state = threading.local()
+metrics.registry.gauge("turns_in_flight", "Turns running on a worker.",
+                       lambda: agent_executor.stats()["in_flight"])
+metrics.registry.gauge("turns_queued", "Turns waiting for a worker.",
+                       lambda: agent_executor.stats()["queued"])
+print(f"   ✓ Workers: {agent_executor.max_workers}, queue: {agent_executor.max_queue}, "
+      f"timeout: {agent_executor.timeout}s")
+
+# Callers may shorten the turn timeout with X-Request-Deadline / X-Request-Timeout,
+# or lengthen it up to this ceiling
+MAX_REQUEST_TIMEOUT = float(os.getenv("AGENT_MAX_REQUEST_TIMEOUT", "900")) or None
+
+# Callers that send a session id get their own agent and history;
+# requests without one run stateless on a worker-owned agent.
+print("[Step 3/4] Creating session registry...")
+SESSION_HISTORY_WINDOW = int(os.getenv("AGENT_SESSION_WINDOW", "20"))
+
+
+def _new_session_agent() -> Agent:
+    return _new_agent(
+        conversation_manager=SlidingWindowConversationManager(window_size=SESSION_HISTORY_WINDOW)
+    )
+
+
+with warmup.step("create_sessions"):
+    agent_sessions = SessionRegistry.from_env(_new_session_agent)
+print(f"   ✓ Max sessions: {agent_sessions.max_sessions}, idle TTL: {agent_sessions.idle_ttl}s, "
+      f"history window: {SESSION_HISTORY_WINDOW} messages")
+
+# Identical concurrent stateless prompts share one model turn (opt-in)
+coalescer = SingleFlight.from_env()
+
+
+def _model_id(agent) -> str:
+    try:
+        return str(agent.model.get_config().get("model_id"))
+    except Exception:
+        return "unknown"
+
+
+def _tool_fingerprint(agent) -> str:
+    try:
+        return ",".join(sorted(agent.tool_names))
+    except Exception:
+        return ""
+
+
+MODEL_ID = _model_id(strands_agent)
+TOOL_FINGERPRINT = _tool_fingerprint(strands_agent)
+
+# Exact-match cache of stateless replies (opt-in)
+response_cache = ResponseCache.from_env()
+
+print("[Step 4/4] FastAPI configured")
+print(f"   ✓ Coalescing identical prompts: {'on' if coalescer.enabled else 'off'}")
+print(f"   ✓ Response cache: {'on' if response_cache.enabled else 'off'} "
+      f"({response_cache.max_entries} entries, TTL {response_cache.ttl}s)")
+print(f"   ✓ Request log: level {request_log.stats()['level']}, sample rate {request_log.sample_rate}, "
+      f"body limit {request_log.body_limit} chars")
 print("=" * 70 + "\n")
 
 
+def _worker_agent() -> Agent:
+    """Return the Strands agent owned by the current worker thread."""
+    agent = getattr(_worker_state, "agent", None)
+    if agent is None:
+        agent = _new_agent()
+        _worker_state.agent = agent
+    return agent
+
+
+def _run_strands_turn(session_id: Optional[str], user_message: str, on_event=None,
+                      deadline: Optional[Deadline] = None):
+    """Blocking model turn within ``deadline``; always called on an executor worker."""
+    deadline = deadline or Deadline()
+    with deadline.activate():
+        if session_id is None:
+            agent = _worker_agent()
+            agent.messages.clear()
+            return _call_within(deadline, agent, user_message, on_event)
+
+        session = agent_sessions.acquire(session_id)
+        with session.lock:
+            session.turns += 1
+            history = list(session.agent.messages)
+            try:
+                return _call_within(deadline, session.agent, user_message, on_event)
+            except DeadlineExceeded:
+                # Drop the half-finished turn so the session's next prompt starts clean
+                session.agent.messages[:] = history
+                raise
+
+
+def _call_within(deadline: Deadline, agent: Agent, user_message: str, on_event=None):
+    deadline.check()
+    try:
+        return _call_agent(agent, user_message, on_event)
+    except Exception as e:
+        # A cancelled turn fails wherever it was cut off (hook, closed stream)
+        if deadline.cancelled:
+            raise DeadlineExceeded(deadline.reason) from e
+        raise
+
+
+def _call_agent(agent: Agent, user_message: str, on_event=None):
+    if on_event is None:
+        return agent(user_message)
+    return run_streaming_turn(agent, user_message, on_event)
+
+
+def _prime_worker_agents():
+    """Build every idle worker's agent (and its Bedrock client) up front."""
+    primed = agent_executor.prime(_worker_agent)
+    print(f"   ✓ Primed {primed}/{agent_executor.max_workers} worker agents")
+
+
+def _send_warmup_prompt():
+    """One short turn per idle worker so credentials and TLS connections are warm."""
+    prompt = warmup_prompt()
+    agent_executor.prime(lambda: _run_strands_turn(None, prompt))
+
+
+if AGENT_READY:
+    warmup.add("prime_worker_agents", _prime_worker_agents)
+    if warmup_prompt():
+        warmup.add("warmup_prompt", _send_warmup_prompt, required=False)
+
+
+def _extract_response_text(result) -> str:
+    """Pull the first text block out of a Strands AgentResult."""
+    response_text = ""
+    
+    # result.message is a DICT, not an object!
+    if hasattr(result, 'message'):
+        message = result.message
+        
+        # message is a dict with 'role' and 'content' keys; content is a list of dicts
+        if isinstance(message, dict) and 'content' in message:
+            content = message['content']
+            if content and len(content) > 0:
+                first_content = content[0]
+                if isinstance(first_content, dict) and 'text' in first_content:
+                    response_text = first_content['text']
+                else:
+                    request_log.debug("content[0] has no 'text' key")
+                    response_text = str(first_content)
+        else:
+            request_log.debug("unexpected message structure")
+            response_text = str(message)
+    else:
+        request_log.debug("result has no 'message' attribute")
+        response_text = str(result)
+    
+    if not response_text:
+        response_text = "Agent processed your request successfully."
+    
+    return response_text
+
+
+def _build_output(response_text: str) -> Dict[str, Any]:
+    """AgentCore output body for an assistant reply."""
+    return {
+        "message": {
+            "role": "assistant",
+            "content": [{"text": response_text}]
+        },
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+def _busy(retry_after: int) -> HTTPException:
+    """Fast 503 for shed requests; Retry-After estimates when a worker frees up."""
+    return HTTPException(status_code=503, detail="Agent is busy, retry later",
+                         headers={"Retry-After": str(retry_after)})
+
+
+def _serialize(body: Dict[str, Any], headers: Dict[str, str]) -> JSONBytesResponse:
+    """Encode the reply, timing the serialize stage."""
+    started = time.perf_counter()
+    response = JSONBytesResponse(body, headers=headers)
+    metrics.observe_stage("serialize", time.perf_counter() - started)
+    return response
+
+
+def _record_execution(request: Request, execution):
+    metrics.observe_stage("queue", execution.queue_wait)
+    metrics.observe_stage("turn", execution.run_time)
+    metrics.record_usage(execution.value)
+    request.state.log_fields.update(
+        queue_wait_ms=round(execution.queue_wait * 1000, 2),
+        model_ms=round(execution.run_time * 1000, 2)
+    )
+
+
 # ============================================================================
 # Request/Response Models
 # ============================================================================
 
 class InvocationResponse(BaseModel):
-    """Response model"""
+    """Response model (documents the schema; replies are encoded by the codec)"""
     output: Dict[str, Any]
 
 
@@ -49,24 +289,93 @@ class InvocationResponse(BaseModel):
 # Middleware for request logging
 # ============================================================================
 
-@app.middleware("http")
-async def log_all_requests(request: Request, call_next):
-    """Log all incoming requests with full details"""
-    print("\n" + "=" * 70)
-    print(f"[REQUEST] {request.method} {request.url.path}")
-    print(f"[TIME] {datetime.utcnow().isoformat()}Z")
-    
-    if request.method == "POST":
+class LogRequests:
+    """
+    Write one structured line per request once the response has been sent.
+    Plain ASGI rather than @app.middleware("http"): Starlette's
+    BaseHTTPMiddleware hides client disconnects from the handler.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        # Becomes request.state.log_fields in the handler
+        log_fields = scope.setdefault("state", {})["log_fields"] = {}
+        status = {"code": 500}
+
+        async def send_and_record(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
         try:
-            body = await request.body()
-            print(f"[BODY] {body.decode('utf-8')}")
-        except:
-            pass
-    
-    print("=" * 70)
-    
-    response = await call_next(request)
-    return response
+            await self.app(scope, receive, send_and_record)
+        finally:
+            request_log.access(scope["method"], scope["path"], status["code"],
+                               time.perf_counter() - started, log_fields)
+            if scope["path"] == "/invocations":
+                metrics.requests.inc(str(status["code"]))
+
+
+app.add_middleware(LogRequests)
+
+
+# ============================================================================
+# Streaming
+# ============================================================================
+
+async def _stream_invocation(session_id: Optional[str], user_message: str, deadline: Deadline):
+    """SSE body: delta/tool_use frames while the turn runs, then the output frame."""
+    relay = StreamRelay(asyncio.get_running_loop())
+    turn = asyncio.ensure_future(
+        agent_executor.run(_run_strands_turn, session_id, user_message, relay.on_event, deadline,
+                           timeout=deadline.remaining())
+    )
+    try:
+        async for frame in relay.frames(turn):
+            yield frame
+        execution = turn.result()
+    except ExecutorSaturated as e:
+        metrics.record_error("queue", "rejected")
+        request_log.error("stream rejected", detail=str(e))
+        yield format_sse("error", {"status": 503, "detail": "Agent is busy, retry later",
+                                   "retry_after": e.retry_after})
+        return
+    except (ExecutorTimeout, DeadlineExceeded) as e:
+        deadline.cancel(DEADLINE_EXCEEDED)
+        metrics.record_error("turn", "timeout")
+        request_log.error("stream timed out", detail=str(e))
+        yield format_sse("error", {"status": 504, "detail": str(e)})
+        return
+    except Exception as e:
+        metrics.record_error("turn", type(e).__name__)
+        request_log.error("strands error", detail=str(e), stream=True)
+        yield format_sse("error", {"status": 500, "detail": f"Error from Strands agent: {str(e)}"})
+        return
+    finally:
+        # Client went away mid-stream: drop the turn if it is still queued,
+        # and stop it at its next model or tool call if it is running
+        if not turn.done():
+            deadline.cancel(CLIENT_DISCONNECTED)
+            turn.cancel()
+            request_log.error("stream cancelled", detail=CLIENT_DISCONNECTED, session=session_id)
+        deadline.finish()
+
+    metrics.observe_stage("queue", execution.queue_wait)
+    metrics.observe_stage("turn", execution.run_time)
+    metrics.record_usage(execution.value)
+    response_text = _extract_response_text(execution.value)
+    if request_log.debug_enabled:
+        request_log.debug("stream complete", session=session_id,
+                          queue_wait_ms=round(execution.queue_wait * 1000, 2),
+                          model_ms=round(execution.run_time * 1000, 2),
+                          response=request_log.truncate(response_text))
+    yield format_sse("output", {"output": _build_output(response_text)})
 
 
 # ============================================================================
@@ -78,120 +387,160 @@ async def invoke_agent(request: Request):
     """
     REQUIRED: Main invocation endpoint for agent interactions.
     AWS AgentCore Runtime sends: {"prompt": "..."}
+    Send "Accept: text/event-stream" to receive the reply as SSE frames.
     """
-    print("\n" + "=" * 70)
-    print(f" [INVOCATION] {datetime.utcnow().isoformat()}Z")
-    print("=" * 70)
+    log_fields = request.state.log_fields
+    response_headers = {}
+    # X-Request-Deadline / X-Request-Timeout bound the whole request, the turn timeout otherwise
+    deadline = Deadline.from_headers(request.headers, agent_executor.timeout, MAX_REQUEST_TIMEOUT)
+    deadline.start(asyncio.get_running_loop())
+    streaming = False
+    
+    # Requests that arrive during warm-up wait for it rather than race it
+    if not warmup.ready:
+        await warmup.wait_ready(warmup_wait())
     
     try:
-        # Parse JSON body
+        # Parse JSON body; replies are encoded straight to bytes by the codec
         raw_body = await request.body()
-        request_data = json.loads(raw_body)
-        
-        print(f"[REQUEST DATA] {json.dumps(request_data, indent=2)}")
+        parse_started = time.perf_counter()
+        try:
+            request_data = codec.loads(raw_body)
+        except Exception:
+            metrics.record_error("parse", "invalid_json")
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
+        metrics.observe_stage("parse", time.perf_counter() - parse_started)
+        if not isinstance(request_data, dict):
+            metrics.record_error("parse", "not_an_object")
+            raise HTTPException(status_code=400, detail="Request body must be a JSON object")
+        if request_log.debug_enabled:
+            request_log.debug("request body", body=request_log.truncate(raw_body.decode("utf-8", "replace")))
         
         # Extract prompt from AWS format: {"prompt": "..."}
         user_message = request_data.get("prompt", "")
         
         if not user_message:
-            print(f"[ERROR] No prompt found")
             raise HTTPException(
                 status_code=400,
                 detail="No prompt provided"
             )
         
-        print(f"[PROMPT] {user_message}")
+        session_id = resolve_session_id(request.headers, request_data)
+        log_fields.update(session=session_id or "stateless", prompt_chars=len(user_message))
+        
+        if wants_event_stream(request) and AGENT_READY and strands_agent:
+            log_fields["stream"] = True
+            # Shed before the 200 and SSE headers go out
+            if agent_executor.saturated:
+                metrics.record_error("queue", "rejected")
+                raise _busy(agent_executor.retry_after())
+            # The stream body owns the deadline from here on
+            streaming = True
+            return StreamingResponse(
+                _stream_invocation(session_id, user_message, deadline),
+                media_type=SSE_MEDIA_TYPE,
+                headers=SSE_HEADERS
+            )
+        
+        # Stateless requests may be answered from the response cache
+        cache_key = None
+        if session_id is None and response_cache.enabled:
+            if wants_cache_bypass(request.headers):
+                response_cache.record_bypass()
+                response_headers[CACHE_HEADER] = "bypass"
+            else:
+                cache_key = request_key(user_message, MODEL_ID, TOOL_FINGERPRINT)
+                cached_text = response_cache.get(cache_key)
+                response_headers[CACHE_HEADER] = "miss" if cached_text is None else "hit"
+                if cached_text is not None:
+                    log_fields.update(cache="hit", response_chars=len(cached_text))
+                    return _serialize({"output": _build_output(cached_text)}, response_headers)
         
         # Process with Strands agent
         response_text = ""
         
         if AGENT_READY and strands_agent:
-            print("[PROCESSING] Invoking Strands agent...")
-            print(f"[STRANDS INPUT] {user_message}")
             try:
-                result = strands_agent(user_message)
-                print(f"[STRANDS RESULT TYPE] {type(result)}")
-                
-                # result.message is a DICT, not an object!
-                if hasattr(result, 'message'):
-                    message = result.message
-                    print(f"[STRANDS MESSAGE TYPE] {type(message)}")
-                    print(f"[STRANDS MESSAGE] {message}")
-                    
-                    # message is a dict with 'role' and 'content' keys
-                    if isinstance(message, dict) and 'content' in message:
-                        content = message['content']
-                        print(f"[STRANDS CONTENT TYPE] {type(content)}")
-                        print(f"[STRANDS CONTENT LENGTH] {len(content) if content else 0}")
-                        
-                        # content is a list of dicts
-                        if content and len(content) > 0:
-                            first_content = content[0]
-                            print(f"[STRANDS CONTENT[0] TYPE] {type(first_content)}")
-                            print(f"[STRANDS CONTENT[0]] {first_content}")
-                            
-                            # Extract text from the dict
-                            if isinstance(first_content, dict) and 'text' in first_content:
-                                response_text = first_content['text']
-                                print(f"[STRANDS TEXT EXTRACTED] {response_text[:100]}...")
-                            else:
-                                print(f"[WARNING] Content[0] has no 'text' key")
-                                response_text = str(first_content)
-                    else:
-                        print(f"[WARNING] Message structure unexpected")
-                        response_text = str(message)
+                if session_id is None and coalescer.enabled:
+                    # The shared turn runs to the leader's deadline
+                    execution = await coalescer.run(
+                        request_key(user_message, MODEL_ID, TOOL_FINGERPRINT),
+                        lambda: agent_executor.run(_run_strands_turn, None, user_message, None, deadline,
+                                                   timeout=deadline.remaining())
+                    )
                 else:
-                    print(f"[WARNING] Result has no 'message' attribute")
-                    response_text = str(result)
-                
-                if not response_text:
-                    print("[WARNING] Response text is empty, using default")
-                    response_text = "Agent processed your request successfully."
-                
-                print("[SUCCESS] Agent completed processing")
+                    # Nobody else waits on this turn, so it stops when its client disconnects
+                    watcher = asyncio.ensure_future(cancel_on_disconnect(request, deadline))
+                    try:
+                        execution = await agent_executor.run(_run_strands_turn, session_id, user_message,
+                                                             None, deadline, timeout=deadline.remaining())
+                    finally:
+                        watcher.cancel()
+                _record_execution(request, execution)
+                response_text = _extract_response_text(execution.value)
+                if cache_key is not None:
+                    response_cache.put(cache_key, response_text)
                 
+            except ExecutorSaturated as e:
+                log_fields["detail"] = str(e)
+                metrics.record_error("queue", "rejected")
+                raise _busy(e.retry_after)
+            except ExecutorTimeout as e:
+                # The worker keeps running until the turn notices the cancelled deadline
+                deadline.cancel(DEADLINE_EXCEEDED)
+                metrics.record_error("turn", "timeout")
+                raise HTTPException(status_code=504, detail=str(e))
+            except DeadlineExceeded as e:
+                metrics.record_error("turn", e.reason.replace(" ", "_"))
+                # 499: the client closed the request (nobody reads it; it shows in /metrics)
+                raise HTTPException(status_code=499 if e.reason == CLIENT_DISCONNECTED else 504,
+                                    detail=str(e))
             except Exception as e:
-                print(f"[STRANDS ERROR] {str(e)}")
-                import traceback
-                print(f"[STRANDS TRACEBACK] {traceback.format_exc()}")
+                metrics.record_error("turn", type(e).__name__)
+                request_log.error("strands error", detail=str(e), session=session_id)
                 response_text = f"Error from Strands agent: {str(e)}"
         else:
-            print("[MOCK] Strands agent not available")
+            log_fields["mock"] = True
             response_text = f"Mock response: {user_message}"
         
         # Build response
-        output = {
-            "message": {
-                "role": "assistant",
-                "content": [{"text": response_text}]
-            },
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        
-        print(f"[RESPONSE TEXT] {response_text}")
-        print(f"[OUTPUT OBJECT] {json.dumps(output, indent=2)}")
-        print("[RESPONSE] Returning output")
-        print("=" * 70 + "\n")
+        output = _build_output(response_text)
+        log_fields["response_chars"] = len(response_text)
+        if request_log.debug_enabled:
+            request_log.debug("response", text=request_log.truncate(response_text))
         
-        return InvocationResponse(output=output)
+        return _serialize({"output": output}, response_headers)
     
-    except HTTPException:
-        print("=" * 70 + "\n")
+    except HTTPException as e:
+        log_fields["detail"] = e.detail
         raise
     except Exception as e:
         error_msg = f"Error: {str(e)}"
-        print(f"[ERROR] {error_msg}")
-        print("=" * 70 + "\n")
+        log_fields["detail"] = error_msg
         raise HTTPException(status_code=500, detail=error_msg)
+    finally:
+        if not streaming:
+            deadline.finish()
 
 
 @app.get("/ping")
 async def ping():
     """
     REQUIRED: Health check endpoint.
+    Reports HealthyBusy until background warm-up has finished and
+    whenever every worker is taken, so new sessions are routed elsewhere.
     """
-    print(f"[PING] Healthy - Agent ready: {AGENT_READY}")
-    return {"status": "healthy"}
+    if warmup.failed:
+        return JSONBytesResponse({"status": "Unhealthy", "startup": warmup.report()}, status_code=503)
+    if agent_executor.busy:
+        return {"status": PING_HEALTHY_BUSY, "time_of_last_update": int(time.time())}
+    return {"status": warmup.ping_status(), "time_of_last_update": int(warmup.last_update)}
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus text exposition of stage latencies, tokens and errors."""
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
 
 
 @app.get("/")
@@ -201,10 +550,30 @@ async def root():
         "agent": "PDZ-01",
         "version": "2.0.0",
         "status": "running",
-        "agent_ready": AGENT_READY
+        "agent_ready": AGENT_READY,
+        "startup": warmup.report(),
+        "executor": agent_executor.stats(),
+        "sessions": agent_sessions.stats(),
+        "logging": request_log.stats(),
+        "coalescing": coalescer.stats(),
+        "response_cache": response_cache.stats()
     }
 
 
+@app.on_event("startup")
+async def start_background_work():
+    """Start the log writer, then warm up in the background while serving /ping."""
+    request_log.start()
+    warmup.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_executor():
+    """Stop accepting turns, drop anything still queued and flush logs."""
+    agent_executor.shutdown()
+    request_log.stop()
+
+
 # ============================================================================
 # Server Entry Point
 # ============================================================================
@@ -0,0 +1,92 @@
+"""
+Micro-benchmark: /invocations JSON handling, previous path vs codec path.
+
+Previous path: json.loads -> dict -> InvocationResponse -> FastAPI response
+validation + JSON-mode dump -> json.dumps.
+Codec path:    codec.loads -> dict -> codec.dumps.
+
+Run from agent_pdz_01:  python benchmark_codec.py
+Compare codecs with:    AGENT_JSON_CODEC=stdlib python benchmark_codec.py
+"""
+
+import json
+import timeit
+from datetime import datetime
+from typing import Any, Dict
+
+from pydantic import BaseModel, TypeAdapter
+
+import codec
+
+
+class InvocationResponse(BaseModel):
+    output: Dict[str, Any]
+
+
+RESPONSE_ADAPTER = TypeAdapter(InvocationResponse)
+
+# (label, prompt chars, reply chars)
+PAYLOAD_SIZES = [
+    ("small", 60, 400),
+    ("medium", 500, 4_000),
+    ("large", 4_000, 64_000),
+]
+
+
+def build_output(response_text: str) -> Dict[str, Any]:
+    return {
+        "message": {
+            "role": "assistant",
+            "content": [{"text": response_text}]
+        },
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+def previous_path(raw_body: bytes, response_text: str) -> bytes:
+    request_data = json.loads(raw_body)
+    request_data.get("prompt", "")
+    model = InvocationResponse(output=build_output(response_text))
+    # What FastAPI does with a response_model: dump, re-validate, dump in JSON mode
+    validated = RESPONSE_ADAPTER.validate_python(model.model_dump())
+    content = RESPONSE_ADAPTER.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def codec_path(raw_body: bytes, response_text: str) -> bytes:
+    request_data = codec.loads(raw_body)
+    request_data.get("prompt", "")
+    return codec.dumps({"output": build_output(response_text)})
+
+
+def measure(fn, raw_body: bytes, response_text: str, number: int) -> float:
+    """Best-of-5 microseconds per call."""
+    timer = timeit.Timer(lambda: fn(raw_body, response_text))
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e6
+
+
+def main():
+    print("=" * 70)
+    print(" /invocations JSON path benchmark")
+    print("=" * 70)
+    print(f" Codec: {codec.CODEC_NAME}\n")
+    print(f" {'payload':<8} {'previous (us)':>14} {'codec (us)':>12} {'saved (us)':>12} {'speedup':>9}")
+    print(" " + "-" * 58)
+
+    for label, prompt_chars, reply_chars in PAYLOAD_SIZES:
+        raw_body = json.dumps({"prompt": "p" * prompt_chars, "session_id": "bench-session"}).encode("utf-8")
+        response_text = "Agent reply with unicode ✓ " * (reply_chars // 27)
+        assert json.loads(previous_path(raw_body, response_text))["output"]["message"] == \
+            json.loads(codec_path(raw_body, response_text))["output"]["message"]
+
+        number = 2000 if reply_chars < 10_000 else 300
+        before = measure(previous_path, raw_body, response_text, number)
+        after = measure(codec_path, raw_body, response_text, number)
+        print(f" {label:<8} {before:>14.1f} {after:>12.1f} {before - after:>12.1f} {before / after:>8.1f}x")
+
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
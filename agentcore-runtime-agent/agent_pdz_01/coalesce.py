@@ -0,0 +1,99 @@
+"""
+Single-flight coalescing of identical concurrent invocations.
+While one stateless turn for a prompt is running, identical requests
+wait for it and share its result instead of starting their own turn.
+"""
+
+import asyncio
+import hashlib
+import os
+from typing import Any, Awaitable, Callable, Dict
+
+
+def _env_flag(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).lower() in ("true", "1", "yes")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so trivially different copies share a key."""
+    return " ".join(prompt.split())
+
+
+def request_key(prompt: str, *config: Any) -> str:
+    """Stable key for a normalized prompt plus whatever config shapes the answer."""
+    material = "\x1f".join([normalize_prompt(prompt), *(str(part) for part in config)])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LeaderCancelled(RuntimeError):
+    """Set on the shared future when the leading call is cancelled; waiting callers retry."""
+
+
+class SingleFlight:
+    """
+    Event-loop-local single-flight group.
+
+    The first caller for a key runs ``fn``; callers arriving before it
+    finishes await the same future. If the leader is cancelled, the
+    callers still waiting run the call again, one of them leading.
+    Nothing is kept once the call ends.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._executions = 0
+        self._coalesced = 0
+        self._saved = 0
+
+    @classmethod
+    def from_env(cls) -> "SingleFlight":
+        """Enabled with AGENT_COALESCE=true."""
+        return cls(enabled=_env_flag("AGENT_COALESCE"))
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.enabled:
+            return await fn()
+
+        joined = False
+        while (shared := self._in_flight.get(key)) is not None:
+            if not joined:
+                self._coalesced += 1
+                joined = True
+            try:
+                # shield: a follower disconnecting must not cancel the leader's turn
+                result = await asyncio.shield(shared)
+            except LeaderCancelled:
+                # The leader's entry is gone by now; the first follower to resume leads the retry
+                continue
+            self._saved += 1
+            return result
+
+        shared = asyncio.get_running_loop().create_future()
+        # Mark the outcome as retrieved even if nobody else was waiting
+        shared.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._in_flight[key] = shared
+        self._executions += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            # Not shared.cancel(): followers would get CancelledError, which escapes their error handling
+            shared.set_exception(LeaderCancelled(f"coalesced call {key[:12]} was cancelled"))
+            raise
+        except Exception as e:
+            shared.set_exception(e)
+            raise
+        else:
+            shared.set_result(result)
+            return result
+        finally:
+            del self._in_flight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self._in_flight),
+            "executions": self._executions,
+            "coalesced_requests": self._coalesced,
+            "saved_model_calls": self._saved,
+        }
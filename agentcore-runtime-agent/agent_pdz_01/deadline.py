@@ -0,0 +1,205 @@
+"""
+Per-request deadlines.
+Callers bound a request with X-Request-Deadline (absolute, Unix epoch
+seconds) or X-Request-Timeout (seconds from now). The deadline is made
+current for the turn, so the Bedrock call and every tool call can see how
+much of the budget is left. When the budget runs out or the client goes
+away, the deadline is cancelled: the open Bedrock response stream is
+closed and model or tool calls that have not started yet are skipped, so
+abandoned requests stop holding capacity.
+"""
+
+import asyncio
+import contextlib
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, List, Mapping, Optional
+
+from strands.hooks import BeforeModelCallEvent, BeforeToolCallEvent, HookProvider, HookRegistry
+
+DEADLINE_HEADER = "X-Request-Deadline"
+TIMEOUT_HEADER = "X-Request-Timeout"
+
+DEADLINE_EXCEEDED = "deadline exceeded"
+CLIENT_DISCONNECTED = "client disconnected"
+
+_current: ContextVar[Optional["Deadline"]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's deadline has passed or its client went away; ``reason`` says which."""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Request {reason}")
+        self.reason = reason
+
+
+class Deadline:
+    """
+    Time budget and cancellation flag of one request.
+
+    ``timeout`` of None means no time limit; the deadline can still be
+    cancelled (client disconnect). Callbacks registered with ``on_cancel``
+    run once, on whichever thread cancels.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout if timeout is not None else None
+        self.reason: Optional[str] = None
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], Any]] = []
+        self._timer: Any = None
+
+    @classmethod
+    def from_headers(cls, headers: Mapping[str, str], default_timeout: Optional[float] = None,
+                     max_timeout: Optional[float] = None) -> "Deadline":
+        """
+        Build from X-Request-Deadline or X-Request-Timeout; ``default_timeout``
+        applies when neither is sent and ``max_timeout`` caps what a caller
+        may ask for. Malformed values are ignored.
+        """
+        headers = {key.lower(): value for key, value in headers.items()}
+        timeout = None
+        try:
+            if DEADLINE_HEADER.lower() in headers:
+                timeout = float(headers[DEADLINE_HEADER.lower()]) - time.time()
+            elif TIMEOUT_HEADER.lower() in headers:
+                timeout = float(headers[TIMEOUT_HEADER.lower()])
+        except ValueError:
+            timeout = None
+        if timeout is None:
+            timeout = default_timeout
+        if timeout is not None and max_timeout is not None:
+            timeout = min(timeout, max_timeout)
+        return cls(max(0.0, timeout) if timeout is not None else None)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, 0 once cancelled, None if unbounded."""
+        if self.reason is not None:
+            return 0.0
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def cancelled(self) -> bool:
+        if self.reason is None and self.expires_at is not None and time.monotonic() >= self.expires_at:
+            self.cancel(DEADLINE_EXCEEDED)
+        return self.reason is not None
+
+    def check(self):
+        """Raise DeadlineExceeded if the request is over."""
+        if self.cancelled:
+            raise DeadlineExceeded(self.reason)
+
+    def cancel(self, reason: str = DEADLINE_EXCEEDED):
+        with self._lock:
+            if self.reason is not None:
+                return
+            self.reason = reason
+            callbacks, self._callbacks = self._callbacks, []
+        self._stop_timer()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def on_cancel(self, callback: Callable[[], Any]):
+        """Run ``callback`` when the deadline is cancelled (now, if it already is)."""
+        with self._lock:
+            if self.reason is None:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Cancel at expiry: on ``loop`` if given, otherwise from a timer thread."""
+        remaining = self.remaining()
+        if remaining is None or self._timer is not None:
+            return
+        if loop is not None:
+            self._timer = loop.call_later(remaining, self.cancel, DEADLINE_EXCEEDED)
+        else:
+            self._timer = threading.Timer(remaining, self.cancel, (DEADLINE_EXCEEDED,))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def finish(self):
+        """The request is done; drop the expiry timer and pending callbacks."""
+        self._stop_timer()
+        with self._lock:
+            self._callbacks = []
+
+    def _stop_timer(self):
+        timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator["Deadline"]:
+        """Make this the current deadline for the calling thread (and the tasks it starts)."""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+async def cancel_on_disconnect(request: Any, deadline: Deadline, interval: float = 0.5):
+    """Poll the Starlette request and cancel ``deadline`` once its client has gone away."""
+    while not deadline.cancelled:
+        if await request.is_disconnected():
+            deadline.cancel(CLIENT_DISCONNECTED)
+            return
+        await asyncio.sleep(interval)
+
+
+class DeadlineHooks(HookProvider):
+    """Stops a turn at the next model call, and skips its tool calls, once the request is over."""
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any):
+        registry.add_callback(BeforeModelCallEvent, self._before_model)
+        registry.add_callback(BeforeToolCallEvent, self._before_tool)
+
+    def _before_model(self, event: BeforeModelCallEvent):
+        deadline = current_deadline()
+        if deadline is not None:
+            deadline.check()
+
+    def _before_tool(self, event: BeforeToolCallEvent):
+        deadline = current_deadline()
+        if deadline is not None and deadline.cancelled:
+            event.cancel_tool = f"Request {deadline.reason}; tool not run"
+
+
+def bind_bedrock_client(client: Any):
+    """
+    Tie Bedrock calls made through ``client`` (a bedrock-runtime boto3
+    client) to the current deadline: a call is refused once the request is
+    over, and an open response stream is closed when it is cancelled,
+    which ends the read loop on the model thread.
+    """
+    def before_call(**kwargs: Any):
+        deadline = current_deadline()
+        if deadline is not None:
+            deadline.check()
+
+    def after_call(parsed: Any = None, **kwargs: Any):
+        deadline = current_deadline()
+        stream = parsed.get("stream") if isinstance(parsed, dict) else None
+        if deadline is not None and stream is not None:
+            deadline.on_cancel(stream.close)
+
+    events = client.meta.events
+    for operation in ("Converse", "ConverseStream"):
+        events.register(f"before-call.bedrock-runtime.{operation}", before_call,
+                        unique_id=f"request-deadline-before-{operation}")
+    events.register("after-call.bedrock-runtime.ConverseStream", after_call,
+                    unique_id="request-deadline-after-ConverseStream")
@@ -0,0 +1,217 @@
+"""
+Bounded executor for blocking Strands agent turns.
+Runs model turns on a worker thread pool so the uvicorn event loop
+(and /ping) stays responsive while Bedrock is generating.
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+
+# ============================================================================
+# Errors
+# ============================================================================
+
+class ExecutorSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ExecutorTimeout(Exception):
+    """Raised when a turn does not finish within its deadline."""
+
+
+# ============================================================================
+# Executor
+# ============================================================================
+
+@dataclass
+class ExecutionResult:
+    """Value returned by a turn plus how long it waited and ran."""
+    value: Any
+    queue_wait: float
+    run_time: float
+
+
+class AgentExecutor:
+    """
+    Thread pool with a bounded wait queue and a per-turn deadline.
+
+    At most ``max_workers`` turns run at once and at most ``max_queue``
+    more may wait for a worker; anything beyond that is rejected
+    immediately with ExecutorSaturated.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 16, timeout: Optional[float] = 120.0):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="strands-turn")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+        self._started = 0
+        # EWMA of turn run time; drives the Retry-After estimate
+        self._run_time_avg = 0.0
+
+    @classmethod
+    def from_env(cls) -> "AgentExecutor":
+        """Build an executor from AGENT_MAX_WORKERS / AGENT_MAX_QUEUE / AGENT_TURN_TIMEOUT."""
+        timeout = float(os.getenv("AGENT_TURN_TIMEOUT", "120"))
+        return cls(
+            max_workers=int(os.getenv("AGENT_MAX_WORKERS", "4")),
+            max_queue=int(os.getenv("AGENT_MAX_QUEUE", "16")),
+            timeout=timeout if timeout > 0 else None,
+        )
+
+    @property
+    def busy(self) -> bool:
+        """True when every worker is taken, so new turns would have to queue."""
+        return self._pending >= self.max_workers
+
+    @property
+    def saturated(self) -> bool:
+        """True when the wait queue is full and new turns would be rejected."""
+        return self._pending >= self.max_workers + self.max_queue
+
+    def retry_after(self) -> int:
+        """Seconds until a worker is likely to free up for a new turn."""
+        queued = max(0, self._pending - self._in_flight)
+        rounds = (queued + 1) / self.max_workers
+        return max(1, min(60, math.ceil(self._run_time_avg * rounds)))
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> ExecutionResult:
+        """Run ``fn(*args)`` on the pool and await it without blocking the loop."""
+        with self._lock:
+            if self.saturated:
+                self._rejected += 1
+                raise ExecutorSaturated(
+                    f"{self._in_flight} turns running and {self._pending - self._in_flight} queued",
+                    self.retry_after(),
+                )
+            self._pending += 1
+            self._submitted += 1
+
+        enqueued_at = time.perf_counter()
+        timing = {"queue_wait": 0.0, "run_time": 0.0}
+
+        def _task():
+            started_at = time.perf_counter()
+            wait = started_at - enqueued_at
+            timing["queue_wait"] = wait
+            with self._lock:
+                self._in_flight += 1
+                self._started += 1
+                self._queue_wait_total += wait
+                self._queue_wait_max = max(self._queue_wait_max, wait)
+            try:
+                return fn(*args)
+            finally:
+                run_time = time.perf_counter() - started_at
+                timing["run_time"] = run_time
+                with self._lock:
+                    self._in_flight -= 1
+                    self._run_time_avg = (run_time if self._run_time_avg == 0.0
+                                          else 0.8 * self._run_time_avg + 0.2 * run_time)
+
+        def _release(future):
+            with self._lock:
+                self._pending -= 1
+                if future.cancelled():
+                    return
+                if future.exception() is not None:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+
+        # A queued turn is cancelled when its deadline passes; a running one
+        # cannot be interrupted, so its slot is only freed once it returns.
+        future = self._pool.submit(_task)
+        future.add_done_callback(_release)
+
+        deadline = self.timeout if timeout is None else timeout
+        try:
+            value = await asyncio.wait_for(asyncio.wrap_future(future), deadline)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._timed_out += 1
+            raise ExecutorTimeout(f"Agent turn exceeded {deadline:.1f}s")
+
+        return ExecutionResult(value=value, queue_wait=timing["queue_wait"], run_time=timing["run_time"])
+
+    def prime(self, fn: Callable[[], Any], timeout: float = 120.0) -> int:
+        """
+        Run ``fn`` once on every idle worker thread, ideally before traffic arrives.
+        A barrier keeps each call on its own thread, so those workers are
+        started and each gets to build its own per-thread state. Workers
+        busy with a turn are skipped and build their state on first use;
+        if a turn takes a worker while priming, the calls that did run
+        still count. Returns how many workers ran ``fn``.
+        """
+        with self._lock:
+            idle = self.max_workers - self._pending
+        if idle <= 0:
+            return 0
+        barrier = threading.Barrier(idle)
+
+        def _task():
+            try:
+                return fn()
+            finally:
+                try:
+                    barrier.wait(timeout)
+                except threading.BrokenBarrierError:
+                    pass
+
+        futures = [self._pool.submit(_task) for _ in range(idle)]
+        done, not_done = wait(futures, timeout)
+        # A priming call stuck behind a turn is dropped rather than run late,
+        # and the workers already primed stop waiting for it
+        for future in not_done:
+            future.cancel()
+        barrier.abort()
+        for future in done:
+            future.result()
+        return sum(1 for future in futures if not future.cancelled())
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool sizing and queue wait, for the info endpoint."""
+        with self._lock:
+            avg_wait = self._queue_wait_total / self._started if self._started else 0.0
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "timeout_seconds": self.timeout,
+                "in_flight": self._in_flight,
+                "queued": self._pending - self._in_flight,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "busy": self.busy,
+                "retry_after_seconds": self.retry_after(),
+                "queue_wait_ms": {
+                    "avg": round(avg_wait * 1000, 2),
+                    "max": round(self._queue_wait_max * 1000, 2),
+                },
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,262 @@
+"""
+Per-stage latency, token and error metrics in Prometheus text format.
+Hot-path updates go to per-thread shards with no locking; shards are
+only summed when /metrics is scraped, so the metrics can stay on in
+production without adding contention to the request path.
+"""
+
+import bisect
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from strands.hooks import (
+    AfterModelCallEvent, AfterToolCallEvent, BeforeModelCallEvent, BeforeToolCallEvent,
+    HookProvider, HookRegistry
+)
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers sub-millisecond parsing up to multi-minute agent turns
+LATENCY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Token usage keys in a Strands result, mapped to the exported label
+TOKEN_TYPES = (
+    ("inputTokens", "input"),
+    ("outputTokens", "output"),
+    ("cacheReadInputTokens", "cache_read"),
+    ("cacheWriteInputTokens", "cache_write"),
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Sharded:
+    """Base for metrics whose samples live in one dict per writer thread."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._local = threading.local()
+        self._shards: List[Dict[Tuple[str, ...], Any]] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> Dict[Tuple[str, ...], Any]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            self._local.shard = shard
+            # Only a thread's first write takes the lock
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _snapshots(self) -> List[Dict[Tuple[str, ...], Any]]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        return [dict(shard) for shard in shards]
+
+
+class Counter(_Sharded):
+    """Monotonic counter with optional labels."""
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def collect(self) -> Dict[Tuple[str, ...], float]:
+        totals: Dict[Tuple[str, ...], float] = {}
+        for shard in self._snapshots():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0.0) + value
+        return totals
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value:g}")
+        return lines
+
+
+class Histogram(_Sharded):
+    """Cumulative-bucket histogram with optional labels."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str):
+        shard = self._shard()
+        # [per-bucket counts..., +Inf count, sum]
+        series = shard.get(labels)
+        if series is None:
+            series = [0] * (len(self.buckets) + 1) + [0.0]
+            shard[labels] = series
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def collect(self) -> Dict[Tuple[str, ...], List[float]]:
+        totals: Dict[Tuple[str, ...], List[float]] = {}
+        for shard in self._snapshots():
+            for labels, series in shard.items():
+                merged = totals.setdefault(labels, [0] * (len(self.buckets) + 1) + [0.0])
+                for i, value in enumerate(list(series)):
+                    merged[i] += value
+        return totals
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                bucket_labels = _format_labels(self.labelnames, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Value read from a callback at scrape time (queue depth, cache size, ...)."""
+
+    def __init__(self, name: str, documentation: str, fn: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.fn = fn
+
+    def render(self) -> List[str]:
+        try:
+            value = float(self.fn())
+        except Exception:
+            return []
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge",
+                f"{self.name} {value:g}"]
+
+
+class MetricsRegistry:
+    """Holds every metric exported on /metrics."""
+
+    def __init__(self, prefix: str = "agent"):
+        self.prefix = prefix
+        self._metrics: List[Any] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(f"{self.prefix}_{name}", documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(f"{self.prefix}_{name}", documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, documentation: str, fn: Callable[[], float]) -> Gauge:
+        metric = Gauge(f"{self.prefix}_{name}", documentation, fn)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class AgentMetrics:
+    """
+    The metric set shared by the agent runtimes.
+
+    ``stage_seconds`` covers parse, queue, turn, model, tool and serialize;
+    tool calls carry the tool name so slow MCP round-trips stand out.
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        self.stage_seconds = self.registry.histogram(
+            "stage_seconds", "Time spent per /invocations stage.", ("stage", "tool"))
+        self.requests = self.registry.counter(
+            "requests_total", "Completed /invocations requests by status code.", ("status",))
+        self.errors = self.registry.counter(
+            "errors_total", "Errors by stage and kind.", ("stage", "kind"))
+        self.tokens = self.registry.counter(
+            "tokens_total", "Model tokens reported by Strands results.", ("type",))
+        self.tool_calls = self.registry.counter(
+            "tool_calls_total", "Tool calls by tool and outcome.", ("tool", "status"))
+
+    def observe_stage(self, stage: str, seconds: float, tool: str = ""):
+        self.stage_seconds.observe(seconds, stage, tool)
+
+    def record_error(self, stage: str, kind: str):
+        self.errors.inc(stage, kind)
+
+    def record_usage(self, result: Any):
+        """Add the token usage of one Strands AgentResult."""
+        try:
+            usage = result.metrics.latest_agent_invocation.usage
+        except AttributeError:
+            return
+        for key, label in TOKEN_TYPES:
+            count = usage.get(key)
+            if count:
+                self.tokens.inc(label, amount=count)
+
+    def hooks(self) -> "StageHooks":
+        return StageHooks(self)
+
+    def render(self) -> str:
+        return self.registry.render()
+
+
+class StageHooks(HookProvider):
+    """Strands hooks timing every model call and tool call of a turn."""
+
+    def __init__(self, metrics: AgentMetrics):
+        self._metrics = metrics
+        # Keyed by toolUseId / agent id; tools of one turn may run concurrently
+        self._tool_started: Dict[str, float] = {}
+        self._model_started: Dict[int, float] = {}
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any):
+        registry.add_callback(BeforeModelCallEvent, self._before_model)
+        registry.add_callback(AfterModelCallEvent, self._after_model)
+        registry.add_callback(BeforeToolCallEvent, self._before_tool)
+        registry.add_callback(AfterToolCallEvent, self._after_tool)
+
+    def _before_model(self, event: BeforeModelCallEvent):
+        self._model_started[id(event.agent)] = time.perf_counter()
+
+    def _after_model(self, event: AfterModelCallEvent):
+        started = self._model_started.pop(id(event.agent), None)
+        if started is not None:
+            self._metrics.observe_stage("model", time.perf_counter() - started)
+        if event.exception is not None:
+            self._metrics.record_error("model", type(event.exception).__name__)
+
+    def _before_tool(self, event: BeforeToolCallEvent):
+        self._tool_started[event.tool_use["toolUseId"]] = time.perf_counter()
+
+    def _after_tool(self, event: AfterToolCallEvent):
+        name = event.tool_use.get("name", "unknown")
+        started = self._tool_started.pop(event.tool_use["toolUseId"], None)
+        if started is not None:
+            self._metrics.observe_stage("tool", time.perf_counter() - started, name)
+        failed = event.exception is not None or (event.result or {}).get("status") == "error"
+        self._metrics.tool_calls.inc(name, "error" if failed else "success")
+        if failed:
+            self._metrics.record_error("tool", name)
@@ -0,0 +1,167 @@
+"""
+Structured request logging for the agent.
+Emits one JSON line per request; records are handed to a background
+thread through a bounded queue, so stdout I/O never runs on the event loop.
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+
+LOGGER_NAME = "agent"
+
+# Health checks and metric scrapes arrive every few seconds; only log them at DEBUG
+QUIET_PATHS = ("/ping", "/metrics")
+
+
+class JsonFormatter(logging.Formatter):
+    """Render a record and its ``fields`` extra as a single JSON object."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        return json.dumps(entry, default=str)
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RequestLog:
+    """
+    Levelled, sampled, truncating request logger.
+
+    Successful requests are logged with probability ``sample_rate``;
+    errors are always logged. Bodies and model text only appear at DEBUG
+    and are cut to ``body_limit`` characters.
+    """
+
+    def __init__(self, level: str = "INFO", sample_rate: float = 1.0, body_limit: int = 512,
+                 queue_size: int = 10000):
+        self.level = logging.getLevelName(level.upper())
+        if not isinstance(self.level, int):
+            self.level = logging.INFO
+        self.sample_rate = sample_rate
+        self.body_limit = body_limit
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.logger.setLevel(self.level)
+        self.logger.propagate = False
+
+        self._handler = _DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        stream = logging.StreamHandler()
+        stream.setFormatter(JsonFormatter())
+        self._listener = logging.handlers.QueueListener(self._handler.queue, stream)
+        self.logger.addHandler(self._handler)
+
+        self._lock = threading.Lock()
+        self._emitted = 0
+        self._sampled_out = 0
+        self._emit_seconds = 0.0
+
+    @classmethod
+    def from_env(cls) -> "RequestLog":
+        """Build from AGENT_LOG_LEVEL / AGENT_LOG_SAMPLE_RATE / AGENT_LOG_BODY_LIMIT."""
+        return cls(
+            level=os.getenv("AGENT_LOG_LEVEL", "INFO"),
+            sample_rate=float(os.getenv("AGENT_LOG_SAMPLE_RATE", "1.0")),
+            body_limit=int(os.getenv("AGENT_LOG_BODY_LIMIT", "512")),
+        )
+
+    def start(self):
+        self._listener.start()
+
+    def stop(self):
+        """Flush queued records and stop the writer thread."""
+        self._listener.stop()
+
+    @property
+    def debug_enabled(self) -> bool:
+        return self.level <= logging.DEBUG
+
+    def truncate(self, text: Any) -> str:
+        text = text if isinstance(text, str) else str(text)
+        if len(text) <= self.body_limit:
+            return text
+        return f"{text[:self.body_limit]}...[{len(text) - self.body_limit} more chars]"
+
+    def debug(self, msg: str, **fields: Any):
+        """Detail line, only built when DEBUG is on."""
+        if self.debug_enabled:
+            self._emit(logging.DEBUG, msg, fields)
+
+    def error(self, msg: str, **fields: Any):
+        self._emit(logging.ERROR, msg, fields)
+
+    def access(self, method: str, path: str, status: int, duration: float,
+               fields: Optional[Dict[str, Any]] = None):
+        """The one summary line written per request."""
+        level = logging.INFO
+        if path in QUIET_PATHS:
+            level = logging.DEBUG
+        if status >= 500:
+            level = logging.ERROR
+        elif status >= 400:
+            level = logging.WARNING
+
+        if level < self.level:
+            return
+        if level == logging.INFO and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            with self._lock:
+                self._sampled_out += 1
+            return
+
+        entry = {
+            "method": method,
+            "path": path,
+            "status": status,
+            "duration_ms": round(duration * 1000, 2),
+        }
+        if fields:
+            entry.update(fields)
+        self._emit(level, "request", entry)
+
+    def _emit(self, level: int, msg: str, fields: Dict[str, Any]):
+        started = time.perf_counter()
+        self.logger.log(level, msg, extra={"fields": fields})
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._emitted += 1
+            self._emit_seconds += elapsed
+
+    def stats(self) -> Dict[str, Any]:
+        """Logging volume and the caller-side cost of each emitted line."""
+        with self._lock:
+            avg = self._emit_seconds / self._emitted if self._emitted else 0.0
+            return {
+                "level": logging.getLevelName(self.level),
+                "sample_rate": self.sample_rate,
+                "body_limit": self.body_limit,
+                "emitted": self._emitted,
+                "sampled_out": self._sampled_out,
+                "dropped": self._handler.dropped,
+                "avg_emit_us": round(avg * 1e6, 2),
+            }
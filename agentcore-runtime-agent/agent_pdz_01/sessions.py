@@ -0,0 +1,119 @@
+"""
+Per-session Strands agents with LRU and idle-TTL eviction.
+Keeps each caller's conversation separate and bounds how many
+conversations (and how much history) the process holds at once.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+
+# Header set by AgentCore Runtime on every invocation of a runtime session
+SESSION_HEADER = "x-amzn-bedrock-agentcore-runtime-session-id"
+
+
+@dataclass
+class Session:
+    """One conversation: its agent plus a lock so turns never overlap."""
+    session_id: str
+    agent: Any
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    turns: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class SessionRegistry:
+    """
+    Maps session ids to agents built by ``factory``.
+
+    Entries are kept in last-used order, so the least recently used
+    session is evicted first when ``max_sessions`` is reached and idle
+    sessions expire from the front once ``idle_ttl`` seconds pass.
+    """
+
+    def __init__(self, factory: Callable[[], Any], max_sessions: int = 100, idle_ttl: float = 900.0):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._reused = 0
+        self._evicted_lru = 0
+        self._evicted_ttl = 0
+
+    @classmethod
+    def from_env(cls, factory: Callable[[], Any]) -> "SessionRegistry":
+        """Build a registry from AGENT_MAX_SESSIONS / AGENT_SESSION_TTL."""
+        return cls(
+            factory,
+            max_sessions=int(os.getenv("AGENT_MAX_SESSIONS", "100")),
+            idle_ttl=float(os.getenv("AGENT_SESSION_TTL", "900")),
+        )
+
+    def acquire(self, session_id: str) -> Session:
+        """Return the session for ``session_id``, creating it if needed."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                session.last_used = now
+                self._reused += 1
+                return session
+
+        # Building an agent can be slow; do it outside the registry lock
+        agent = self.factory()
+
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = Session(session_id=session_id, agent=agent)
+                self._sessions[session_id] = session
+                self._created += 1
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self._evicted_lru += 1
+            else:
+                self._sessions.move_to_end(session_id)
+                self._reused += 1
+            session.last_used = now
+            return session
+
+    def evict(self, session_id: str) -> bool:
+        """Drop a session explicitly (e.g. when the client ends it)."""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _expire(self, now: float):
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_used < self.idle_ttl:
+                break
+            self._sessions.popitem(last=False)
+            self._evicted_ttl += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Registry size and eviction counters."""
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                "active": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "idle_ttl_seconds": self.idle_ttl,
+                "created": self._created,
+                "reused": self._reused,
+                "evicted_lru": self._evicted_lru,
+                "evicted_ttl": self._evicted_ttl,
+            }
+
+
+def resolve_session_id(headers: Any, payload: Dict[str, Any]) -> Optional[str]:
+    """Session id from the runtime header, falling back to payload ``session_id``."""
+    return headers.get(SESSION_HEADER) or payload.get("session_id") or None
@@ -0,0 +1,93 @@
+"""
+Server-Sent Events streaming for /invocations.
+Clients opt in with ``Accept: text/event-stream``; text deltas and tool
+starts are forwarded as Strands produces them, and the last frame carries
+the usual ``{"output": {"message": ...}}`` body.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from fastapi import Request
+
+import codec
+
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+# Keep proxies from buffering the stream
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def wants_event_stream(request: Request) -> bool:
+    """True when the client asked for an SSE response."""
+    return SSE_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Encode one SSE frame."""
+    return f"event: {event}\ndata: {codec.dumps(data).decode('utf-8')}\n\n"
+
+
+def run_streaming_turn(agent: Any, prompt: str, on_event: Callable[[Dict[str, Any]], None]) -> Any:
+    """
+    Blocking streaming turn for a worker thread.
+
+    Drives ``agent.stream_async`` on a private event loop, hands every
+    event except the final one to ``on_event`` and returns the AgentResult.
+    """
+    async def _drive():
+        result = None
+        async for event in agent.stream_async(prompt):
+            if "result" in event:
+                result = event["result"]
+            else:
+                on_event(event)
+        return result
+
+    return asyncio.run(_drive())
+
+
+class StreamRelay:
+    """Carries SSE frames from the worker thread to the response generator."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._tool_ids = set()
+
+    def on_event(self, event: Dict[str, Any]):
+        """Strands event callback; runs on the worker thread."""
+        frame = self._to_frame(event)
+        if frame is not None:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, frame)
+
+    def _to_frame(self, event: Dict[str, Any]) -> Optional[str]:
+        text = event.get("data")
+        if isinstance(text, str) and text:
+            return format_sse("delta", {"text": text})
+
+        tool = event.get("current_tool_use")
+        if tool:
+            # current_tool_use repeats while the tool input streams in;
+            # announce each tool once
+            tool_id = tool.get("toolUseId")
+            if tool_id and tool_id not in self._tool_ids:
+                self._tool_ids.add(tool_id)
+                return format_sse("tool_use", {"toolUseId": tool_id, "name": tool.get("name")})
+        return None
+
+    async def frames(self, turn: "asyncio.Future") -> AsyncIterator[str]:
+        """Yield frames until ``turn`` finishes, then whatever is still queued."""
+        while not turn.done():
+            getter = asyncio.ensure_future(self._queue.get())
+            done, _ = await asyncio.wait({getter, turn}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                yield getter.result()
+            else:
+                getter.cancel()
+        while not self._queue.empty():
+            yield self._queue.get_nowait()
@@ -0,0 +1,141 @@
+"""
+Startup timing and background warm-up.
+Times every init step, runs the slow priming steps (client creation,
+tool discovery, optional warm-up prompt) on a background thread, and
+tells /ping whether the runtime is ready for traffic yet.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+
+# AgentCore Runtime /ping statuses
+PING_HEALTHY = "Healthy"
+PING_HEALTHY_BUSY = "HealthyBusy"
+
+
+class Warmup:
+    """
+    Records per-step init timings and gates readiness on background steps.
+
+    Import-time steps are wrapped in ``step()``; slower priming steps are
+    registered with ``add()`` and run in order by ``start()``. The runtime
+    is ready once every background step has been attempted and no
+    required step failed; a failed required step stops warm-up.
+    """
+
+    def __init__(self):
+        self._steps: List[Dict[str, Any]] = []
+        self._background: List[tuple] = []
+        self._lock = threading.Lock()
+        # Set once warm-up has finished, whether or not it succeeded
+        self._done = threading.Event()
+        self._state = "pending"
+        self._created_at = time.perf_counter()
+        self._ready_after: Optional[float] = None
+        self.last_update = time.time()
+
+    @contextmanager
+    def step(self, name: str):
+        """Time a synchronous init step."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self._record(name, started, "import", error=e)
+            raise
+        self._record(name, started, "import")
+
+    def add(self, name: str, fn: Callable[[], Any], required: bool = True):
+        """Register a background step; optional steps may fail without blocking readiness."""
+        self._background.append((name, fn, required))
+
+    def start(self) -> threading.Thread:
+        """Run the background steps on a daemon thread."""
+        self._set_state("warming")
+        thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def _run(self):
+        for name, fn, required in self._background:
+            started = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:
+                self._record(name, started, "background", error=e)
+                if required:
+                    self._set_state("failed")
+                    self._done.set()
+                    self._print_breakdown()
+                    return
+                continue
+            self._record(name, started, "background")
+
+        self._ready_after = time.perf_counter() - self._created_at
+        self._set_state("ready")
+        self._done.set()
+        self._print_breakdown()
+
+    def _record(self, name: str, started: float, phase: str, error: Optional[Exception] = None):
+        entry = {"name": name, "phase": phase, "ms": round((time.perf_counter() - started) * 1000, 1), "ok": error is None}
+        if error is not None:
+            entry["error"] = str(error)
+        with self._lock:
+            self._steps.append(entry)
+        status = "✓" if error is None else "⚠"
+        print(f"   {status} [startup] {name}: {entry['ms']}ms" + (f" ({error})" if error else ""))
+
+    def _set_state(self, state: str):
+        with self._lock:
+            self._state = state
+            self.last_update = time.time()
+
+    def _print_breakdown(self):
+        report = self.report()
+        print(f"[STARTUP] {report['state']} after {report['ready_after_ms']}ms: "
+              + ", ".join(f"{s['name']}={s['ms']}ms" for s in report["steps"]))
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set() and self._state == "ready"
+
+    @property
+    def failed(self) -> bool:
+        return self._state == "failed"
+
+    def wait_ready_sync(self, timeout: Optional[float] = None) -> bool:
+        """Block until warm-up finishes (or fails); True if it succeeded."""
+        self._done.wait(timeout)
+        return self.ready
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait (without blocking the loop) until warm-up finishes or fails."""
+        if not self._done.is_set():
+            await asyncio.get_running_loop().run_in_executor(None, self._done.wait, timeout)
+        return self.ready
+
+    def ping_status(self) -> str:
+        return PING_HEALTHY if self.ready else PING_HEALTHY_BUSY
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._state,
+                "ready_after_ms": round(self._ready_after * 1000, 1) if self._ready_after is not None else None,
+                "steps": list(self._steps),
+            }
+
+
+def warmup_prompt() -> str:
+    """Optional prompt sent once during warm-up (AGENT_WARMUP_PROMPT); empty disables it."""
+    return os.getenv("AGENT_WARMUP_PROMPT", "")
+
+
+def warmup_wait() -> float:
+    """Seconds an early invocation waits for warm-up (AGENT_WARMUP_WAIT)."""
+    return float(os.getenv("AGENT_WARMUP_WAIT", "30"))
@@ -5,16 +5,39 @@ Supports both HTTP MCP servers and AgentCore Runtime MCP servers.
 """
 
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, Any
 from datetime import datetime
-import json
+import asyncio
 import os
-from urllib.parse import quote
+import time
 from strands import Agent
 from strands.models import BedrockModel
-from strands.tools.mcp import MCPClient
-from mcp.client.streamable_http import streamablehttp_client
+import codec
+from admission import AdmissionController, AdmissionRejected
+from agent_pool import AgentPool
+from circuit_breaker import STATE_CODES, CircuitBreaker
+from codec import JSONBytesResponse
+from local_tools import server_module_path, server_tools, tool_binding
+from coalesce import SingleFlight, request_key
+from conversation_memory import MemoryStats, TokenBudgetConversationManager, conversation_manager_factory, memory_mode
+from deadline import (
+    CLIENT_DISCONNECTED, Deadline, DeadlineExceeded, DeadlineHooks, bind_bedrock_client, cancel_on_disconnect
+)
+from mcp_balancer import MCPEndpointPool
+from mcp_pool import ManagedMCPClient, endpoint_transport
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, AgentMetrics
+from prompt_cache import PromptCacheFallback, cache_usage, prompt_cache_mode, prompt_cache_options
+from response_cache import CACHE_HEADER, ResponseCache, wants_cache_bypass
+from sessions import SessionRegistry, resolve_session_id
+from warmup import PING_HEALTHY_BUSY, Warmup, warmup_prompt, warmup_wait
+from streaming import (
+    SSE_HEADERS, SSE_MEDIA_TYPE, StreamRelay, format_sse, run_streaming_turn, wants_event_stream
+)
+from tool_catalog import catalog_options
+from tool_executor import tool_executor_from_env
+from tool_results import ToolResultCache
 
 # ============================================================================
 # Configuration
@@ -29,10 +52,47 @@ USE_MCP_ARN = os.getenv("USE_MCP_ARN", "true").lower() in ("true", "1", "yes")
 # MCP Server configuration
 MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://localhost:8000/mcp")
 MCP_SERVER_ARN = os.getenv("MCP_SERVER_ARN", "arn:aws:bedrock-agentcore:us-west-2:381492273521:runtime/mcp_server_pdz_02-eHybfZHxYT")
+# Comma-separated URLs and/or ARNs (each ARN is called in its own region); more than one is load-balanced
+MCP_SERVER_ENDPOINTS = [e.strip() for e in os.getenv("MCP_SERVER_ENDPOINTS", "").split(",") if e.strip()]
+# "mcp" reaches the tools over MCP; "in_process" imports mcp_server.py and calls them directly
+TOOL_BINDING = tool_binding()
+
+MODEL_ID = "anthropic.claude-3-5-sonnet-20240620-v1:0"
+# System prompt of the tool-less agent that answers while the MCP circuit is open (AGENT_MCP_BREAKER_MODE=degrade)
+DEGRADED_SYSTEM_PROMPT = ("The calculation tools are temporarily unavailable. Answer from your own knowledge, "
+                          "and say so when a number was not computed with a tool.")
+# Budget of a request without X-Request-Deadline / X-Request-Timeout (0 = none), and the cap on what callers ask for
+REQUEST_TIMEOUT = float(os.getenv("AGENT_REQUEST_TIMEOUT", "0")) or None
+MAX_REQUEST_TIMEOUT = float(os.getenv("AGENT_MAX_REQUEST_TIMEOUT", "900")) or None
+# Bedrock prompt-cache checkpoints: "auto" (tools + history), "tools" or "off"
+PROMPT_CACHE = prompt_cache_mode()
+
+# Per-session history window (messages kept by the conversation manager)
+SESSION_HISTORY_WINDOW = int(os.getenv("AGENT_SESSION_WINDOW", "20"))
+# Session memory: "summarizing" folds old turns into a summary past a token budget; "window" keeps the last messages
+MEMORY_MODE = memory_mode()
 
 AGENT_READY = False
 strands_agent = None
 mcp_client = None
+mcp_breaker = None
+agent_sessions = None
+TOOL_FINGERPRINT = ""
+
+# Per-step init timings; /ping reports HealthyBusy until warm-up finishes
+warmup = Warmup()
+
+# Per-stage latency, token and error aggregates served on /metrics;
+# the hooks time every model call and MCP tool call inside a turn
+metrics = AgentMetrics()
+stage_hooks = metrics.hooks()
+# Several tool calls in one model turn go out together (AGENT_TOOL_EXECUTION / AGENT_TOOL_CONCURRENCY)
+tool_executor = tool_executor_from_env()
+tool_executor.stats.on_batch = lambda calls, wall: metrics.observe_stage("tool_batch", wall)
+# Turns caching off and retries if the model rejects cache checkpoints
+prompt_cache_fallback = PromptCacheFallback()
+# Skips model and tool calls once the request's deadline has passed or its client went away
+deadline_hooks = DeadlineHooks()
 
 
 # ============================================================================
@@ -43,56 +103,400 @@ print("\n" + "=" * 70)
 print(" Agent PDZ-02 Initialization")
 print("=" * 70)
 
-# Determine MCP server type from constant
-if USE_MCP_ARN:
+# Determine MCP server type from constant; MCP_SERVER_ENDPOINTS overrides both
+if TOOL_BINDING == "in_process":
+    print(f" Tool binding: in-process (AGENT_TOOL_BINDING=in_process)")
+    print(f" Server module: {server_module_path()}\n")
+elif MCP_SERVER_ENDPOINTS:
+    print(f" MCP Mode: {len(MCP_SERVER_ENDPOINTS)} endpoint(s) (MCP_SERVER_ENDPOINTS)")
+    for endpoint in MCP_SERVER_ENDPOINTS:
+        print(f"   - {endpoint}")
+    print()
+    endpoints = MCP_SERVER_ENDPOINTS
+elif USE_MCP_ARN:
     print(f" MCP Mode: AgentCore Runtime (USE_MCP_ARN=True)")
     print(f" ARN: {MCP_SERVER_ARN}\n")
-    mcp_endpoint = MCP_SERVER_ARN
+    endpoints = [MCP_SERVER_ARN]
 else:
     print(f" MCP Mode: HTTP Endpoint (USE_MCP_ARN=False)")
     print(f" URL: {MCP_SERVER_URL}\n")
-    mcp_endpoint = MCP_SERVER_URL
+    endpoints = [MCP_SERVER_URL]
 
-# Create MCP client
-print("[1/2] Creating MCP Client...")
-if USE_MCP_ARN:
-    # mcp-proxy-for-aws expects an HTTP(S) URL, not an ARN. Build the AgentCore invoke URL from ARN.
-    try:
-        from mcp_proxy_for_aws.client import aws_iam_streamablehttp_client
-        # Bedrock AgentCore invoke URL: https://bedrock-agentcore.{region}.amazonaws.com/runtimes/{encoded_arn}/invocations?qualifier=DEFAULT
-        encoded_arn = quote(MCP_SERVER_ARN, safe="")
-        mcp_endpoint_url = f"https://bedrock-agentcore.us-west-2.amazonaws.com/runtimes/{encoded_arn}/invocations?qualifier=DEFAULT"
-        mcp_client = MCPClient(
-            lambda: aws_iam_streamablehttp_client(
-                endpoint=mcp_endpoint_url,
-                aws_region="us-west-2",
-                aws_service="bedrock-agentcore"
-            )
-        )
-        print("      Using AWS IAM authentication for AgentCore Runtime")
-    except ImportError:
-        print("      ERROR: mcp-proxy-for-aws not installed")
-        print("      Install: pip install mcp-proxy-for-aws")
-        print("      Falling back to HTTP endpoint...")
-        mcp_client = MCPClient(lambda: streamablehttp_client(MCP_SERVER_URL))
+# Results of the tools named in AGENT_TOOL_CACHE_TOOLS are memoized client-side
+tool_result_cache = ToolResultCache.from_env()
+
+if TOOL_BINDING == "in_process":
+    # Co-located server: call its tool functions directly, no MCP transport
+    print("[1/3] Binding MCP server tools in-process...")
+    with warmup.step("bind_local_tools"):
+        agent_tools = server_tools()
+        mcp_endpoint = f"in-process:{server_module_path()}"
+    print(f"      ✓ Tools: {', '.join(tool.tool_name for tool in agent_tools)}")
 else:
-    # For HTTP MCP servers, use streamable HTTP client
-    mcp_client = MCPClient(lambda: streamablehttp_client(MCP_SERVER_URL))
-    print("      Using HTTP client for MCP server")
+    # Create MCP client: one long-lived session per endpoint, reconnected with backoff if it breaks
+    print("[1/3] Creating MCP Client...")
+    with warmup.step("create_mcp_client"):
+        transports = {}
+        for endpoint in endpoints:
+            try:
+                transports[endpoint] = endpoint_transport(endpoint)
+            except ImportError:
+                print("      ERROR: mcp-proxy-for-aws not installed")
+                print("      Install: pip install mcp-proxy-for-aws")
+                print("      Falling back to HTTP endpoint...")
+                transports[MCP_SERVER_URL] = endpoint_transport(MCP_SERVER_URL)
+        mcp_endpoint = ",".join(transports)
+        if len(transports) == 1:
+            mcp_client = ManagedMCPClient.from_env(
+                transports[mcp_endpoint],
+                result_cache=tool_result_cache,
+                **catalog_options(mcp_endpoint)
+            )
+        else:
+            # Health-checked, latency-routed pool with failover between endpoints
+            mcp_client = MCPEndpointPool.from_env(
+                transports,
+                result_cache=tool_result_cache,
+                **catalog_options(mcp_endpoint)
+            )
+            print(f"      Routing across {len(transports)} endpoints ({mcp_client.strategy})")
+        # Opens after repeated MCP transport failures, so requests stop waiting on an unreachable server
+        mcp_breaker = CircuitBreaker.from_env("MCP", mcp_client.probe)
+        mcp_client.breaker = mcp_breaker
+        if any(endpoint.startswith("arn:") for endpoint in transports):
+            print("      Using AWS IAM authentication for AgentCore Runtime")
+        else:
+            print("      Using HTTP client for MCP server")
+        agent_tools = [mcp_client]
 
-print("      MCP Client created successfully")
+    print("      MCP Client created successfully")
+    if mcp_breaker is not None:
+        print(f"      ✓ Circuit breaker: opens after {mcp_breaker.failure_threshold} failures, "
+              f"probes every {mcp_breaker.reset_timeout}s, {mcp_breaker.mode} while open")
 
-# Create Strands agent with MCP client
-print("\n[2/2] Creating Strands Agent...")
-bedrock_model = BedrockModel(model_id="anthropic.claude-3-5-sonnet-20240620-v1:0")
-strands_agent = Agent(model=bedrock_model, tools=[mcp_client])
-AGENT_READY = True
+# Create the Bedrock model now; the agent itself is built during warm-up
+# because it connects to the MCP server and discovers its tools
+print("\n[2/3] Creating Bedrock model...")
+with warmup.step("create_model"):
+    bedrock_model = BedrockModel(model_id=MODEL_ID, **prompt_cache_options(PROMPT_CACHE))
+    # A cancelled request closes its open Bedrock response stream
+    bind_bedrock_client(bedrock_model.client)
 
 print("      ✓ Bedrock Model: Claude 3.5 Sonnet")
-print("      ✓ MCP Tools: Auto-discovered from MCP server")
-print("      ✓ Agent Status: Ready")
+print(f"      ✓ Prompt cache: {PROMPT_CACHE}")
+print("      ✓ MCP Tools: Auto-discovered from MCP server during warm-up")
+
+# Each session gets its own agent sharing the model and MCP client
+print("\n[3/3] Creating session registry...")
+
+
+def _on_summarize(seconds: float, folded_messages: int):
+    metrics.observe_stage("summarize", seconds)
+    memory_stats.record(seconds, folded_messages)
+
+
+memory_stats = MemoryStats()
+new_conversation_manager = conversation_manager_factory(bedrock_model, SESSION_HISTORY_WINDOW, MEMORY_MODE,
+                                                        _on_summarize)
+
+
+def _new_session_agent() -> Agent:
+    return Agent(
+        model=bedrock_model,
+        tools=agent_tools,
+        conversation_manager=new_conversation_manager(),
+        hooks=[stage_hooks, prompt_cache_fallback, deadline_hooks],
+        tool_executor=tool_executor
+    )
+
+
+with warmup.step("create_sessions"):
+    agent_sessions = SessionRegistry.from_env(_new_session_agent)
+print(f"      ✓ Max sessions: {agent_sessions.max_sessions}, idle TTL: {agent_sessions.idle_ttl}s")
+memory = new_conversation_manager()
+if isinstance(memory, TokenBudgetConversationManager):
+    print(f"      ✓ History: ~{memory.token_budget} tokens, last {memory.keep_turns} turns verbatim, "
+          f"older ones summarized")
+else:
+    print(f"      ✓ History window: {SESSION_HISTORY_WINDOW} messages")
 print("=" * 70 + "\n")
 
+degraded_turns = metrics.registry.counter(
+    "degraded_turns_total", "Turns answered without tools while the MCP circuit was open.")
+
+# Identical concurrent stateless prompts share one model turn (AGENT_COALESCE=true)
+coalescer = SingleFlight.from_env()
+
+# Exact-match cache of stateless replies (AGENT_RESPONSE_CACHE=true)
+response_cache = ResponseCache.from_env()
+
+# Caps concurrent turns and queued requests; the rest are shed with Retry-After
+admission = AdmissionController.from_env()
+
+
+def _new_stateless_agent() -> Agent:
+    return Agent(model=bedrock_model, tools=agent_tools, hooks=[stage_hooks, prompt_cache_fallback, deadline_hooks],
+                 tool_executor=tool_executor)
+
+
+# Requests without a session id each check out an agent (history cleared) for their turn,
+# so stateless turns run as concurrently as admission allows
+stateless_agents = AgentPool(_new_stateless_agent, max_idle=admission.max_concurrent)
+# Answer without tools while the MCP circuit is open (degrade mode)
+degraded_agents = AgentPool(lambda: Agent(model=bedrock_model, system_prompt=DEGRADED_SYSTEM_PROMPT,
+                                          hooks=[stage_hooks, prompt_cache_fallback, deadline_hooks]),
+                            max_idle=admission.max_concurrent)
+metrics.registry.gauge("turns_in_flight", "Turns holding an admission slot.",
+                       lambda: admission.stats()["in_flight"])
+metrics.registry.gauge("turns_queued", "Requests waiting for an admission slot.",
+                       lambda: admission.stats()["queued"])
+metrics.registry.gauge("tool_cache_hits", "Tool calls answered from the tool-result cache.",
+                       lambda: sum(t["hits"] for t in tool_result_cache.stats()["tools"].values()))
+metrics.registry.gauge("tool_cache_misses", "Cacheable tool calls that went to the MCP server.",
+                       lambda: sum(t["misses"] for t in tool_result_cache.stats()["tools"].values()))
+metrics.registry.gauge("prompt_cache_read_ratio", "Share of prompt input tokens read from the Bedrock prompt cache.",
+                       lambda: _prompt_cache_stats()["read_ratio"] or 0.0)
+if mcp_client is not None:
+    metrics.registry.gauge("mcp_healthy_endpoints", "MCP endpoints currently in rotation.",
+                           lambda: mcp_client.stats().get("healthy_endpoints", int(mcp_client.connected)))
+    metrics.registry.gauge("mcp_handshakes", "MCP sessions opened (connect + initialize).",
+                           lambda: mcp_client.stats()["handshakes"])
+    metrics.registry.gauge("tool_catalog_network_fetches", "tools/list round-trips (blocking and background).",
+                           lambda: sum(mcp_client.catalog_stats()[k] for k in ("network_fetches", "background_refreshes")))
+    metrics.registry.gauge("tool_catalog_loads", "Tool catalog lookups by agents.",
+                           lambda: mcp_client.catalog_stats()["loads"])
+    metrics.registry.gauge("mcp_reuse_ratio", "Share of tool calls served on an already-open MCP session.",
+                           lambda: mcp_client.stats()["reuse_ratio"] or 0.0)
+if mcp_breaker is not None:
+    metrics.registry.gauge("mcp_circuit_state", "MCP circuit breaker state (0 closed, 1 half-open, 2 open).",
+                           lambda: STATE_CODES[mcp_breaker.state])
+    metrics.registry.gauge("mcp_circuit_opens", "Times the MCP circuit has opened.",
+                           lambda: mcp_breaker.stats()["opens"])
+    metrics.registry.gauge("mcp_circuit_rejected", "MCP calls and tool listings refused while the circuit was open.",
+                           lambda: mcp_breaker.stats()["rejected"])
+
+
+def _tool_fingerprint() -> str:
+    """MCP server plus the discovered tool names; part of every reuse key."""
+    try:
+        names = ",".join(sorted(strands_agent.tool_names))
+    except Exception:
+        names = ""
+    return f"{mcp_endpoint}|{names}"
+
+
+def _discover_tools():
+    """Build the first stateless agent: opens the MCP session and lists its tools (unless bound in-process)."""
+    global strands_agent, AGENT_READY, TOOL_FINGERPRINT
+    try:
+        strands_agent = _new_stateless_agent()
+    except Exception as e:
+        if mcp_breaker is None or mcp_breaker.mode != "degrade":
+            raise
+        # Serve without tools; discovery is retried once the breaker's probe reaches the server
+        mcp_breaker.trip(f"tool discovery failed: {str(e)}")
+        AGENT_READY = True
+        print("      ⚠ MCP tools unavailable, answering without them until the server is reachable")
+        return
+    TOOL_FINGERPRINT = _tool_fingerprint()
+    stateless_agents.seed(strands_agent)
+    AGENT_READY = True
+    print(f"      ✓ Agent ready with tools: {', '.join(strands_agent.tool_names)}")
+    if mcp_client is not None:
+        mcp_client.start_keepalive()
+        catalog = mcp_client.catalog_stats()
+        print(f"      ✓ Tool catalog from {catalog['source']} (age {catalog['age_seconds']}s)")
+
+
+def _on_tool_catalog_change(tools):
+    """The server's tools changed: rebuild the stateless agents and re-key caches."""
+    global strands_agent, TOOL_FINGERPRINT
+    strands_agent = _new_stateless_agent()
+    stateless_agents.replace(_new_stateless_agent)
+    stateless_agents.seed(strands_agent)
+    TOOL_FINGERPRINT = _tool_fingerprint()
+    # Session agents keep the tools they were built with until they expire
+    print(f"      ✓ Stateless agents rebuilt with tools: {', '.join(strands_agent.tool_names)}")
+
+
+if mcp_client is not None:
+    mcp_client.on_catalog_change = _on_tool_catalog_change
+
+
+def _on_circuit_change(state: str):
+    """The MCP server is reachable again: discover the tools if startup could not."""
+    if state == "closed" and strands_agent is None:
+        try:
+            _discover_tools()
+        except Exception as e:
+            print(f"      ⚠ Tool discovery failed after the circuit closed: {str(e)}")
+
+
+if mcp_breaker is not None:
+    mcp_breaker.on_state_change = _on_circuit_change
+
+
+def _degraded() -> bool:
+    """MCP circuit open in degrade mode: stateless turns are answered without tools."""
+    return mcp_breaker is not None and mcp_breaker.mode == "degrade" and not mcp_breaker.closed
+
+
+def _failing_fast() -> bool:
+    """MCP circuit open in fail_fast mode: invocations are refused with 503."""
+    return mcp_breaker is not None and mcp_breaker.mode == "fail_fast" and not mcp_breaker.closed
+
+
+def _send_warmup_prompt():
+    """One short turn so Bedrock credentials and connections are warm."""
+    _run_turn(None, warmup_prompt())
+
+
+warmup.add("discover_tools", _discover_tools)
+if warmup_prompt():
+    warmup.add("warmup_prompt", _send_warmup_prompt, required=False)
+
+
+def _run_turn(session_id, user_message: str, on_event=None, deadline: Deadline = None):
+    """Run one model turn on the stateless agent or the caller's session agent, within ``deadline``."""
+    deadline = deadline or Deadline()
+    with deadline.activate():
+        # Session agents keep their tools, whose calls fail fast while the circuit is open;
+        # until the tools are discovered (also while discovery reruns after the circuit
+        # closed) there is no agent with tools to build, so every turn goes without them
+        if strands_agent is None or (_degraded() and session_id is None):
+            degraded_turns.inc()
+            with degraded_agents.checkout() as agent:
+                return _call_within(deadline, agent, user_message, on_event)
+        if session_id is None:
+            with stateless_agents.checkout() as agent:
+                return _call_within(deadline, agent, user_message, on_event)
+
+        session = agent_sessions.acquire(session_id)
+        with session.lock:
+            session.turns += 1
+            history = list(session.agent.messages)
+            try:
+                return _call_within(deadline, session.agent, user_message, on_event)
+            except DeadlineExceeded:
+                # Drop the half-finished turn so the session's next prompt starts clean
+                session.agent.messages[:] = history
+                raise
+
+
+def _call_within(deadline: Deadline, agent: Agent, user_message: str, on_event=None):
+    deadline.check()
+    try:
+        return _call_agent(agent, user_message, on_event)
+    except Exception as e:
+        # A cancelled turn fails wherever it was cut off (hook, closed stream, tool timeout)
+        if deadline.cancelled:
+            raise DeadlineExceeded(deadline.reason) from e
+        raise
+
+
+def _error_kind(e: Exception) -> str:
+    return e.reason.replace(" ", "_") if isinstance(e, DeadlineExceeded) else type(e).__name__
+
+
+async def _run_admitted(session_id, user_message: str, on_event=None, deadline: Deadline = None):
+    """Wait for an admission slot, then run the turn on a worker thread."""
+    try:
+        ticket = await admission.acquire(deadline.remaining() if deadline is not None else None)
+    except AdmissionRejected:
+        if deadline is not None and deadline.cancelled:
+            metrics.record_error("queue", deadline.reason.replace(" ", "_"))
+            raise DeadlineExceeded(deadline.reason)
+        metrics.record_error("queue", "rejected")
+        raise
+    metrics.observe_stage("queue", ticket.queue_wait)
+    started = time.perf_counter()
+    turn = asyncio.get_running_loop().run_in_executor(None, _run_turn, session_id, user_message, on_event,
+                                                      deadline)
+    # The worker thread cannot be interrupted; the slot is held until it
+    # returns, which a cancelled deadline makes happen at the next model
+    # or tool boundary (or at once, mid-stream)
+    turn.add_done_callback(lambda _: ticket.release())
+    try:
+        result = await asyncio.shield(turn)
+    except Exception as e:
+        metrics.record_error("turn", _error_kind(e))
+        raise
+    metrics.observe_stage("turn", time.perf_counter() - started)
+    metrics.record_usage(result)
+    usage = cache_usage(result)
+    if usage:
+        print(f"[TOKENS] input={usage['input_tokens']} output={usage['output_tokens']} "
+              f"cache_read={usage['cache_read_tokens']} cache_write={usage['cache_write_tokens']}")
+    return result
+
+
+def _prompt_cache_stats() -> Dict[str, Any]:
+    """Cache checkpoint mode and the cumulative cache token counts."""
+    tokens = {labels[0]: value for labels, value in metrics.tokens.collect().items()}
+    read, write = int(tokens.get("cache_read", 0)), int(tokens.get("cache_write", 0))
+    prompt = int(tokens.get("input", 0)) + read + write
+    return {
+        "mode": PROMPT_CACHE,
+        "enabled": bool(bedrock_model.get_config().get("cache_tools")),
+        "disabled_reason": prompt_cache_fallback.disabled_reason,
+        "cache_read_tokens": read,
+        "cache_write_tokens": write,
+        "read_ratio": round(read / prompt, 4) if prompt else None,
+    }
+
+
+def _busy(retry_after: int) -> HTTPException:
+    """Fast 503 for shed requests; Retry-After estimates when a slot frees up."""
+    return HTTPException(status_code=503, detail="Agent is busy, retry later",
+                         headers={"Retry-After": str(retry_after)})
+
+
+def _tools_unavailable() -> HTTPException:
+    """Fast 503 while the MCP circuit is open in fail_fast mode; Retry-After is the next probe."""
+    metrics.record_error("mcp", "circuit_open")
+    return HTTPException(status_code=503, detail=str(mcp_breaker.open_error()),
+                         headers={"Retry-After": str(mcp_breaker.retry_after())})
+
+
+def _serialize(body: Dict[str, Any], headers: Dict[str, str]) -> JSONBytesResponse:
+    """Encode the reply, timing the serialize stage."""
+    started = time.perf_counter()
+    response = JSONBytesResponse(body, headers=headers)
+    metrics.observe_stage("serialize", time.perf_counter() - started)
+    return response
+
+
+def _call_agent(agent: Agent, user_message: str, on_event=None):
+    if on_event is None:
+        return agent(user_message)
+    return run_streaming_turn(agent, user_message, on_event)
+
+
+def _extract_response_text(result) -> str:
+    response_text = ""
+    if hasattr(result, 'message'):
+        message = result.message
+        if isinstance(message, dict) and 'content' in message:
+            content = message['content']
+            if content and len(content) > 0:
+                first_content = content[0]
+                if isinstance(first_content, dict) and 'text' in first_content:
+                    response_text = first_content['text']
+    
+    if not response_text:
+        response_text = str(result)
+    return response_text
+
+
+def _build_output(response_text: str) -> Dict[str, Any]:
+    return {
+        "message": {
+            "role": "assistant",
+            "content": [{"text": response_text}]
+        },
+        "timestamp": datetime.now().isoformat()
+    }
+
 
 # ============================================================================
 # Response Model
@@ -102,69 +506,216 @@ class InvocationResponse(BaseModel):
     output: Dict[str, Any]
 
 
+# ============================================================================
+# Streaming
+# ============================================================================
+
+async def _stream_invocation(session_id, user_message: str, deadline: Deadline):
+    """SSE body: delta/tool_use frames while the turn runs, then the output frame."""
+    relay = StreamRelay(asyncio.get_running_loop())
+    turn = asyncio.ensure_future(_run_admitted(session_id, user_message, relay.on_event, deadline))
+    try:
+        async for frame in relay.frames(turn):
+            yield frame
+        result = turn.result()
+    except AdmissionRejected as e:
+        print(f"[SHED] {str(e)}")
+        yield format_sse("error", {"status": 503, "detail": "Agent is busy, retry later",
+                                   "retry_after": e.retry_after})
+        return
+    except DeadlineExceeded as e:
+        print(f"[DEADLINE] {str(e)}")
+        yield format_sse("error", {"status": 504, "detail": str(e)})
+        return
+    except Exception as e:
+        print(f"[ERROR] {str(e)}")
+        yield format_sse("error", {"status": 500, "detail": str(e)})
+        return
+    finally:
+        # Starlette cancels the body when the client disconnects; stop the turn with it
+        if not turn.done():
+            deadline.cancel(CLIENT_DISCONNECTED)
+            # Nobody is left to read the turn's DeadlineExceeded
+            turn.add_done_callback(lambda t: t.cancelled() or t.exception())
+            print(f"[DEADLINE] {CLIENT_DISCONNECTED}, turn cancelled")
+        deadline.finish()
+    
+    response_text = _extract_response_text(result)
+    print(f"[RESPONSE] {response_text[:100]}...")
+    yield format_sse("output", {"output": _build_output(response_text)})
+
+
 # ============================================================================
 # Endpoints
 # ============================================================================
 
+class CountInvocations:
+    """
+    Count /invocations responses by status code for /metrics.
+    Plain ASGI rather than @app.middleware("http"): Starlette's
+    BaseHTTPMiddleware hides client disconnects from the handler.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != "/invocations":
+            await self.app(scope, receive, send)
+            return
+        status = {"code": 500}
+
+        async def send_and_record(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            metrics.requests.inc(str(status["code"]))
+
+
+app.add_middleware(CountInvocations)
+
+
 @app.post("/invocations", response_model=InvocationResponse)
 async def invoke_agent(request: Request):
-    """Main invocation endpoint"""
+    """Main invocation endpoint ("Accept: text/event-stream" streams the reply)"""
     print(f"\n[INVOCATION] {datetime.now().isoformat()}Z")
+    response_headers = {}
+    # X-Request-Deadline / X-Request-Timeout bound the whole request, queueing included
+    deadline = Deadline.from_headers(request.headers, REQUEST_TIMEOUT, MAX_REQUEST_TIMEOUT)
+    deadline.start(asyncio.get_running_loop())
+    streaming = False
     
     try:
+        # Requests that arrive during warm-up wait for it rather than race it
+        if not warmup.ready:
+            await warmup.wait_ready(warmup_wait())
+        if not AGENT_READY:
+            raise HTTPException(status_code=503, detail="Agent is still starting up")
+        
+        # Replies are encoded straight to bytes by the codec, no model validation
         raw_body = await request.body()
-        request_data = json.loads(raw_body)
+        parse_started = time.perf_counter()
+        try:
+            request_data = codec.loads(raw_body)
+        except Exception:
+            metrics.record_error("parse", "invalid_json")
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
+        metrics.observe_stage("parse", time.perf_counter() - parse_started)
+        if not isinstance(request_data, dict):
+            metrics.record_error("parse", "not_an_object")
+            raise HTTPException(status_code=400, detail="Request body must be a JSON object")
         user_message = request_data.get("prompt", "")
         
         if not user_message:
             raise HTTPException(status_code=400, detail="No prompt provided")
         
+        session_id = resolve_session_id(request.headers, request_data)
         print(f"[PROMPT] {user_message}")
+        print(f"[SESSION] {session_id or 'stateless'}")
         
-        # Strands manages MCP client lifecycle automatically
-        result = strands_agent(user_message)
+        if wants_event_stream(request):
+            # Shed before the 200 and SSE headers go out
+            if _failing_fast():
+                raise _tools_unavailable()
+            if admission.saturated:
+                metrics.record_error("queue", "rejected")
+                raise _busy(admission.retry_after())
+            # The stream body owns the deadline from here on
+            streaming = True
+            return StreamingResponse(
+                _stream_invocation(session_id, user_message, deadline),
+                media_type=SSE_MEDIA_TYPE,
+                headers=SSE_HEADERS
+            )
         
-        # Extract response text
-        response_text = ""
-        if hasattr(result, 'message'):
-            message = result.message
-            if isinstance(message, dict) and 'content' in message:
-                content = message['content']
-                if content and len(content) > 0:
-                    first_content = content[0]
-                    if isinstance(first_content, dict) and 'text' in first_content:
-                        response_text = first_content['text']
+        # Stateless requests may be answered from the response cache
+        cache_key = None
+        if session_id is None and response_cache.enabled:
+            if wants_cache_bypass(request.headers):
+                response_cache.record_bypass()
+                response_headers[CACHE_HEADER] = "bypass"
+            else:
+                cache_key = request_key(user_message, MODEL_ID, TOOL_FINGERPRINT)
+                cached_text = response_cache.get(cache_key)
+                response_headers[CACHE_HEADER] = "miss" if cached_text is None else "hit"
+                if cached_text is not None:
+                    print("[CACHE] hit")
+                    return _serialize({"output": _build_output(cached_text)}, response_headers)
         
-        if not response_text:
-            response_text = str(result)
+        if _failing_fast():
+            raise _tools_unavailable()
         
-        output = {
-            "message": {
-                "role": "assistant",
-                "content": [{"text": response_text}]
-            },
-            "timestamp": datetime.now().isoformat()
-        }
+        # Strands manages MCP client lifecycle automatically.
+        # The turn runs off the event loop so identical requests can coalesce;
+        # only the leader of a coalesced group takes an admission slot, and
+        # the shared turn runs to the leader's deadline.
+        if session_id is None and coalescer.enabled:
+            result = await coalescer.run(
+                request_key(user_message, MODEL_ID, TOOL_FINGERPRINT),
+                lambda: _run_admitted(None, user_message, deadline=deadline)
+            )
+        else:
+            # Nobody else waits on this turn, so it stops when its client disconnects
+            watcher = asyncio.ensure_future(cancel_on_disconnect(request, deadline))
+            try:
+                result = await _run_admitted(session_id, user_message, deadline=deadline)
+            finally:
+                watcher.cancel()
+        response_text = _extract_response_text(result)
+        output = _build_output(response_text)
+        # Answers given without tools are not worth reusing
+        if cache_key is not None and not _degraded():
+            response_cache.put(cache_key, response_text)
         
         print(f"[RESPONSE] {response_text[:100]}...")
-        return InvocationResponse(output=output)
+        return _serialize({"output": output}, response_headers)
         
+    except HTTPException:
+        raise
+    except AdmissionRejected as e:
+        print(f"[SHED] {str(e)}")
+        raise _busy(e.retry_after)
+    except DeadlineExceeded as e:
+        print(f"[DEADLINE] {str(e)}")
+        # 499: the client closed the request (nobody reads it; it shows in /metrics)
+        raise HTTPException(status_code=499 if e.reason == CLIENT_DISCONNECTED else 504, detail=str(e))
     except Exception as e:
         print(f"[ERROR] {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if not streaming:
+            deadline.finish()
 
 
 @app.get("/ping")
 async def ping():
-    """Health check"""
+    """
+    Health check: HealthyBusy until warm-up (MCP tool discovery) finishes, while every slot is taken
+    and while the MCP circuit is open in fail_fast mode
+    """
+    if warmup.failed:
+        return JSONBytesResponse({"status": "Unhealthy", "startup": warmup.report()}, status_code=503)
+    busy = admission.busy or _failing_fast()
     return {
-        "status": "healthy",
+        "status": PING_HEALTHY_BUSY if busy else warmup.ping_status(),
+        "time_of_last_update": int(time.time() if busy else warmup.last_update),
         "agent_ready": AGENT_READY,
         "mcp_mode": "arn" if USE_MCP_ARN else "url",
-        "mcp_server": MCP_SERVER_ARN if USE_MCP_ARN else MCP_SERVER_URL
+        "mcp_server": MCP_SERVER_ARN if USE_MCP_ARN else MCP_SERVER_URL,
+        "mcp_circuit": mcp_breaker.state if mcp_breaker is not None else None
     }
 
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus text exposition of stage latencies, tokens and errors"""
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.get("/")
 async def root():
     """Info endpoint"""
@@ -174,10 +725,31 @@ async def root():
         "bedrock_ready": AGENT_READY,
         "mcp_server": MCP_SERVER_ARN if USE_MCP_ARN else MCP_SERVER_URL,
         "mcp_server_type": "agentcore-runtime" if USE_MCP_ARN else "http",
-        "mcp_tools": "auto-discovered"
+        "mcp_tools": "auto-discovered",
+        "tool_binding": TOOL_BINDING,
+        "startup": warmup.report(),
+        "mcp_connection": mcp_client.stats() if mcp_client is not None else None,
+        "tool_catalog": mcp_client.catalog_stats() if mcp_client is not None else None,
+        "mcp_circuit": {**mcp_breaker.stats(), "degraded_turns": int(degraded_turns.collect().get((), 0))}
+        if mcp_breaker is not None else None,
+        "tool_result_cache": tool_result_cache.stats(),
+        "tool_execution": tool_executor.stats.stats(),
+        "prompt_cache": _prompt_cache_stats(),
+        "sessions": agent_sessions.stats(),
+        "stateless_agents": stateless_agents.stats(),
+        "conversation_memory": {"mode": MEMORY_MODE, **memory_stats.stats()},
+        "admission": admission.stats(),
+        "coalescing": coalescer.stats(),
+        "response_cache": response_cache.stats()
     }
 
 
+@app.on_event("startup")
+async def start_warmup():
+    """Discover MCP tools in the background while /ping answers HealthyBusy."""
+    warmup.start()
+
+
 # ============================================================================
 # Server Entry Point
 # ============================================================================
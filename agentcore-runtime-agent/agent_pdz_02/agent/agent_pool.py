@@ -0,0 +1,81 @@
+"""
+Pool of interchangeable stateless agents.
+A Strands agent runs one turn at a time, so requests without a session
+check out an agent of their own instead of queueing on a shared one;
+concurrency is then bounded by admission, not by a lock.
+"""
+
+import contextlib
+import threading
+from typing import Any, Callable, Dict, Iterator, List
+
+from strands import Agent
+
+
+class AgentPool:
+    """
+    Idle agents built by ``factory``, handed out one turn at a time.
+
+    An empty pool builds a new agent, so the pool grows to the number of
+    turns that run at once; at most ``max_idle`` are kept between turns.
+    ``replace`` swaps the factory (e.g. after the tool catalog changed):
+    idle agents are dropped and agents checked out before the swap are
+    not returned to the pool.
+    """
+
+    def __init__(self, factory: Callable[[], Agent], max_idle: int = 4):
+        self.max_idle = max_idle
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._idle: List[Agent] = []
+        self._generation = 0
+        self._checked_out = 0
+        self._built = 0
+        self._reused = 0
+
+    def seed(self, agent: Agent):
+        """Add an already-built agent of the current factory to the idle set."""
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(agent)
+
+    def replace(self, factory: Callable[[], Agent]):
+        """Build agents with ``factory`` from now on and drop the ones built before."""
+        with self._lock:
+            self._factory = factory
+            self._generation += 1
+            self._idle.clear()
+
+    @contextlib.contextmanager
+    def checkout(self) -> Iterator[Agent]:
+        """An agent with empty history for one turn; it goes back to the pool afterwards."""
+        with self._lock:
+            generation = self._generation
+            agent = self._idle.pop() if self._idle else None
+            factory = self._factory
+            self._checked_out += 1
+            if agent is not None:
+                self._reused += 1
+        try:
+            if agent is None:
+                # Built outside the lock: it lists the MCP tools
+                agent = factory()
+                with self._lock:
+                    self._built += 1
+            agent.messages.clear()
+            yield agent
+        finally:
+            with self._lock:
+                self._checked_out -= 1
+                if agent is not None and generation == self._generation and len(self._idle) < self.max_idle:
+                    self._idle.append(agent)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "idle": len(self._idle),
+                "in_use": self._checked_out,
+                "max_idle": self.max_idle,
+                "built": self._built,
+                "reused": self._reused,
+            }
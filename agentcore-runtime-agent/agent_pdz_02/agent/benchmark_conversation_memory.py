@@ -0,0 +1,125 @@
+"""
+Benchmark: per-turn latency and prompt size as a session grows.
+
+Compares the full history (what a session keeps without a conversation
+manager), the sliding message window and the token-budget summarizing
+manager. A scripted model stands in for Bedrock: each turn it calls
+calculate_statistics (bound in-process, no server needed) and answers,
+and every model call sleeps in proportion to its prompt size the way
+prefill time grows with input tokens. Summaries come from the same
+scripted model, so their cost shows up in the turns that fold.
+
+Run from agent_pdz_02/agent:  python benchmark_conversation_memory.py --turns 100
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import statistics
+import time
+from typing import Any, AsyncGenerator, Dict, List
+
+from strands import Agent
+from strands.agent.conversation_manager import NullConversationManager, SlidingWindowConversationManager
+from strands.models import Model
+
+from conversation_memory import TokenBudgetConversationManager, estimate_tokens
+from local_tools import server_tools
+
+ANSWER = ("The mean of the series is {mean}, with the median and spread as reported by the tool. "
+          "Compared to the earlier series this one is shifted, so the trend the user asked about holds. ") * 3
+
+
+class PrefillModel(Model):
+    """Scripted model whose latency is ``base + per_1k * prompt tokens / 1000``."""
+
+    def __init__(self, base: float, per_1k: float):
+        self.base = base
+        self.per_1k = per_1k
+        self.config: Dict[str, Any] = {"model_id": "prefill"}
+        self.prompt_tokens: List[int] = []
+
+    def update_config(self, **model_config: Any):
+        self.config.update(model_config)
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError
+        yield
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs) -> AsyncGenerator[Any, None]:
+        tokens = estimate_tokens(messages) + estimate_tokens(tool_specs or [])
+        self.prompt_tokens.append(tokens)
+        await asyncio.sleep(self.base + self.per_1k * tokens / 1000)
+        yield {"messageStart": {"role": "assistant"}}
+        last = messages[-1]["content"]
+        if not tool_specs:
+            text = "- The user compared several numeric series; means and spreads were computed for each."
+        elif "toolResult" in last[0]:
+            result = json.loads(last[0]["toolResult"]["content"][0]["text"])
+            text = ANSWER.format(mean=result["mean"])
+        else:
+            turn = len(self.prompt_tokens)
+            arguments = {"numbers": [float((turn * 7 + i * 13) % 50) for i in range(12)]}
+            yield {"contentBlockStart": {"start": {"toolUse": {"toolUseId": f"call-{turn}",
+                                                               "name": "calculate_statistics"}}}}
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps(arguments)}}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "tool_use"}}
+            return
+        yield {"contentBlockDelta": {"delta": {"text": text}}}
+        yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": "end_turn"}}
+
+
+def run_session(name: str, manager_factory, tools, args) -> Dict[str, List[float]]:
+    model = PrefillModel(args.base, args.per_1k)
+    agent = Agent(model=model, tools=tools, conversation_manager=manager_factory(model), callback_handler=None)
+    timings, tokens = [], []
+    for turn in range(1, args.turns + 1):
+        before = len(model.prompt_tokens)
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent(f"Turn {turn}: compute the statistics of today's series and compare it to the earlier ones.")
+        timings.append(time.perf_counter() - started)
+        tokens.append(max(model.prompt_tokens[before:]))
+    return {"name": name, "timings": timings, "tokens": tokens}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--base", type=float, default=0.01, help="seconds per model call")
+    parser.add_argument("--per-1k", type=float, default=0.01, help="extra seconds per 1000 prompt tokens")
+    parser.add_argument("--budget", type=int, default=4000, help="token budget of the summarizing manager")
+    parser.add_argument("--keep-turns", type=int, default=4)
+    parser.add_argument("--window", type=int, default=20, help="messages kept by the sliding window")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        tools = server_tools()
+    runs = [
+        run_session("full", lambda model: NullConversationManager(), tools, args),
+        run_session("window", lambda model: SlidingWindowConversationManager(window_size=args.window), tools, args),
+        run_session("summarizing", lambda model: TokenBudgetConversationManager(
+            model, token_budget=args.budget, keep_turns=args.keep_turns), tools, args),
+    ]
+
+    print(f"turns: {args.turns}   model: {args.base * 1000:.0f} ms + {args.per_1k * 1000:.0f} ms/1k tokens   "
+          f"budget: {args.budget} tokens, {args.keep_turns} turns verbatim")
+    header = "".join(f"{run['name'] + ' ms':>16}{'tokens':>8}" for run in runs)
+    print(f"{'turns':>10}{header}")
+    step = max(1, args.turns // 10)
+    for start in range(0, args.turns, step):
+        end = min(start + step, args.turns)
+        row = "".join(f"{statistics.median(run['timings'][start:end]) * 1000:>16.1f}"
+                      f"{max(run['tokens'][start:end]):>8}" for run in runs)
+        print(f"{f'{start + 1}-{end}':>10}{row}")
+
+
+if __name__ == "__main__":
+    main()
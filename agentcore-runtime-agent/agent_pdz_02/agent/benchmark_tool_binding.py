@@ -0,0 +1,83 @@
+"""
+Benchmark: per-tool-call latency, streamable-HTTP MCP vs in-process binding.
+
+Both sides are driven through their Strands tool objects, the way the
+agent's tool executor calls them: the MCP tools via ManagedMCPClient on a
+warm session, the in-process ones via local_tools. The replies are
+checked to be identical before timing.
+
+Start the MCP server first (python ../mcp_server/mcp_server.py), then
+run from agent_pdz_02/agent:  python benchmark_tool_binding.py
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import statistics
+import time
+from typing import Any, Dict, List
+
+from mcp_pool import ManagedMCPClient, endpoint_transport
+from local_tools import server_tools
+
+TOOL_CALLS = [
+    ("calculate_statistics", {"numbers": [12.5, 3.0, 7.25, 9.0, 41.0, 0.5, 18.0]}),
+    ("compound_interest", {"principal": 10000, "rate": 5.5, "time": 10}),
+    ("text_analyzer", {"text": "The quick brown fox jumps over the lazy dog. " * 40}),
+]
+
+
+async def call(tool: Any, name: str, arguments: Dict[str, Any], call_id: str) -> Dict[str, Any]:
+    result = None
+    async for event in tool.stream({"toolUseId": call_id, "name": name, "input": arguments}, {}):
+        result = event
+    return result.tool_result
+
+
+async def time_calls(tool: Any, name: str, arguments: Dict[str, Any], iterations: int) -> List[float]:
+    timings = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        await call(tool, name, arguments, f"bench-{i}")
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+async def run(url: str, iterations: int):
+    mcp_client = ManagedMCPClient(endpoint_transport(url), snapshot_path=None, keepalive_interval=0)
+    mcp_tools = {tool.tool_name: tool for tool in await mcp_client.load_tools()}
+    # The server's tools print every call; keep that out of the in-process timings
+    with contextlib.redirect_stdout(io.StringIO()):
+        local = {tool.tool_name: tool for tool in await asyncio.to_thread(server_tools)}
+
+    print(f"MCP server: {url}   iterations: {iterations}")
+    print(f"{'tool':<22} {'http p50 us':>12} {'http p99 us':>12} {'local p50 us':>13} {'local p99 us':>13} {'speedup':>8}")
+    for name, arguments in TOOL_CALLS:
+        with contextlib.redirect_stdout(io.StringIO()):
+            over_http = await call(mcp_tools[name], name, arguments, "check")
+            in_process = await call(local[name], name, arguments, "check")
+        assert over_http["content"] == in_process["content"], (over_http, in_process)
+
+        http = await time_calls(mcp_tools[name], name, arguments, iterations)
+        with contextlib.redirect_stdout(io.StringIO()):
+            local_timings = await time_calls(local[name], name, arguments, iterations)
+
+        def pct(values, q):
+            return sorted(values)[min(len(values) - 1, int(q * len(values)))] * 1e6
+
+        http_p50, local_p50 = statistics.median(http) * 1e6, statistics.median(local_timings) * 1e6
+        print(f"{name:<22} {http_p50:>12.0f} {pct(http, 0.99):>12.0f} {local_p50:>13.0f} "
+              f"{pct(local_timings, 0.99):>13.0f} {http_p50 / local_p50:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000/mcp")
+    parser.add_argument("--iterations", type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark: per-turn wall time of sequential vs concurrent tool execution.
+
+A scripted model asks for N tools in one turn (statistics, interest and
+text analysis, round-robin) and then answers; the tools run against a
+real MCP server through the agent's ManagedMCPClient. ``--rtt`` adds a
+simulated network round-trip per call, since a local server answers in
+about a millisecond while a deployed MCP runtime is tens of ms away.
+
+Start the MCP server first (python ../mcp_server/mcp_server.py), then
+run from agent_pdz_02/agent:  python benchmark_tool_executor.py --rtt 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, AsyncGenerator, Dict, List
+
+from mcp.client.streamable_http import streamablehttp_client
+from strands import Agent
+from strands.models import Model
+
+from mcp_pool import ManagedMCPClient, with_pooled_http
+from tool_executor import OrderedConcurrentToolExecutor, TimedSequentialToolExecutor
+
+TOOL_CALLS = [
+    ("calculate_statistics", {"numbers": [12.5, 3.0, 7.25, 9.0, 41.0, 0.5, 18.0]}),
+    ("compound_interest", {"principal": 10000, "rate": 5.5, "time": 10, "compounds_per_year": 12}),
+    ("text_analyzer", {"text": "The quick brown fox jumps over the lazy dog. " * 40}),
+]
+
+
+class ScriptedModel(Model):
+    """First call requests ``tool_count`` tools in one message, the second call answers."""
+
+    def __init__(self, tool_count: int):
+        self.tool_count = tool_count
+        self.config: Dict[str, Any] = {"model_id": "scripted"}
+
+    def update_config(self, **model_config: Any):
+        self.config.update(model_config)
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError
+        yield
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs) -> AsyncGenerator[Any, None]:
+        yield {"messageStart": {"role": "assistant"}}
+        if messages[-1]["content"] and "toolResult" in messages[-1]["content"][0]:
+            yield {"contentBlockDelta": {"delta": {"text": "done"}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "end_turn"}}
+            return
+        for i in range(self.tool_count):
+            name, arguments = TOOL_CALLS[i % len(TOOL_CALLS)]
+            yield {"contentBlockStart": {"start": {"toolUse": {"toolUseId": f"call-{i}", "name": name}}}}
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps(arguments)}}}}
+            yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": "tool_use"}}
+
+
+class DelayedMCPClient(ManagedMCPClient):
+    """Adds a fixed delay to every tool call to stand in for network latency."""
+
+    rtt = 0.0
+
+    async def _call_tool_async(self, *args: Any, **kwargs: Any):
+        await asyncio.sleep(self.rtt)
+        return await super()._call_tool_async(*args, **kwargs)
+
+
+# The MCP client shuts its session down when its last agent is collected; keep them all
+_agents: List[Agent] = []
+
+
+def run_turns(executor, mcp_client, tool_count: int, turns: int) -> List[float]:
+    agent = Agent(model=ScriptedModel(tool_count), tools=[mcp_client], tool_executor=executor,
+                  callback_handler=None)
+    _agents.append(agent)
+    timings = []
+    for _ in range(turns):
+        agent.messages.clear()
+        started = time.perf_counter()
+        agent("benchmark")
+        timings.append(time.perf_counter() - started)
+    result_ids = [block["toolResult"]["toolUseId"] for block in agent.messages[-2]["content"]]
+    assert result_ids == [f"call-{i}" for i in range(tool_count)], result_ids
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000/mcp")
+    parser.add_argument("--rtt", type=float, default=0.0, help="simulated seconds of latency per tool call")
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    transport_kwargs = with_pooled_http(streamablehttp_client, url=args.url)
+    mcp_client = DelayedMCPClient(lambda: streamablehttp_client(**transport_kwargs), snapshot_path=None,
+                                  keepalive_interval=0)
+    mcp_client.rtt = args.rtt
+
+    print(f"MCP server: {args.url}   simulated RTT: {args.rtt * 1000:.0f} ms   turns: {args.turns}")
+    print(f"{'tools/turn':>10} {'sequential ms':>14} {'concurrent ms':>14} {'speedup':>8}")
+    for tool_count in (1, 2, 3, 6):
+        sequential = run_turns(TimedSequentialToolExecutor(), mcp_client, tool_count, args.turns)
+        concurrent = run_turns(OrderedConcurrentToolExecutor(args.concurrency), mcp_client, tool_count, args.turns)
+        seq_ms = statistics.median(sequential) * 1000
+        con_ms = statistics.median(concurrent) * 1000
+        print(f"{tool_count:>10} {seq_ms:>14.2f} {con_ms:>14.2f} {seq_ms / con_ms:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Circuit breaker for the MCP tool provider.
+After repeated transport failures (unreachable server, timeouts, dropped
+sessions) the circuit opens and MCP work is refused at once instead of
+every call waiting out the connect and reconnect timeouts. While open, a
+background prober checks the server every ``reset_timeout`` seconds
+(half-open); the first successful probe closes the circuit again.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+# /metrics gauge value per state
+STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# "degrade" answers from the model without tools while open; "fail_fast" sheds requests with 503
+BREAKER_MODES = ("degrade", "fail_fast")
+
+
+class CircuitOpen(ConnectionError):
+    """Raised (or returned as a tool error) while the circuit is open."""
+
+    def __init__(self, name: str, retry_after: int, last_error: Optional[str] = None):
+        detail = f": {last_error}" if last_error else ""
+        super().__init__(f"{name} circuit is open, not calling the server{detail}")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker around a dependency.
+
+    ``failure_threshold`` consecutive failures open the circuit; any
+    success in between resets the count. Requests never probe: while the
+    circuit is open or half-open ``allow`` is False, and a background
+    thread runs ``probe`` (which raises on failure) every
+    ``reset_timeout`` seconds until it succeeds. ``on_state_change`` is
+    called with the new state after every transition.
+    """
+
+    def __init__(self, name: str, probe: Callable[[], Any], *, failure_threshold: int = 5,
+                 reset_timeout: float = 30.0, mode: str = "degrade",
+                 on_state_change: Optional[Callable[[str], None]] = None):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        if mode not in BREAKER_MODES:
+            raise ValueError(f"Unknown breaker mode {mode!r}; expected one of {BREAKER_MODES}")
+        self.name = name
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.mode = mode
+        self.on_state_change = on_state_change
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._next_probe_at: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._opens = 0
+        self._rejected = 0
+        self._probes = 0
+        self._probe_failures = 0
+        self._stop = threading.Event()
+        self._prober: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls, name: str, probe: Callable[[], Any], **kwargs: Any) -> Optional["CircuitBreaker"]:
+        """
+        Build from AGENT_MCP_BREAKER_FAILURES / AGENT_MCP_BREAKER_RESET /
+        AGENT_MCP_BREAKER_MODE; None when AGENT_MCP_BREAKER_FAILURES is 0.
+        """
+        failure_threshold = int(os.getenv("AGENT_MCP_BREAKER_FAILURES", "5"))
+        if failure_threshold <= 0:
+            return None
+        return cls(
+            name,
+            probe,
+            failure_threshold=failure_threshold,
+            reset_timeout=float(os.getenv("AGENT_MCP_BREAKER_RESET", "30")),
+            mode=os.getenv("AGENT_MCP_BREAKER_MODE", "degrade").lower(),
+            **kwargs,
+        )
+
+    # ------------------------------------------------------------------
+    # Request path
+    # ------------------------------------------------------------------
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @property
+    def closed(self) -> bool:
+        return self._state == CLOSED
+
+    def allow(self) -> bool:
+        """True if a call may go to the server; counts the ones refused."""
+        if self._state == CLOSED:
+            return True
+        with self._lock:
+            self._rejected += 1
+        return False
+
+    def retry_after(self) -> int:
+        """Seconds until the next probe could close the circuit."""
+        next_probe_at = self._next_probe_at
+        if self._state == CLOSED or next_probe_at is None:
+            return 1
+        return max(1, int(next_probe_at - time.monotonic() + 0.999))
+
+    def open_error(self) -> CircuitOpen:
+        return CircuitOpen(self.name, self.retry_after(), self._last_error)
+
+    def record_success(self):
+        if self._consecutive_failures:
+            with self._lock:
+                self._consecutive_failures = 0
+
+    def record_failure(self, error: str):
+        with self._lock:
+            self._consecutive_failures += 1
+            self._last_error = error
+            if self._state != CLOSED or self._consecutive_failures < self.failure_threshold:
+                return
+            failures = self._consecutive_failures
+            self._open()
+        print(f"[MCP] circuit open after {failures} consecutive failures: {error}")
+        self._changed(OPEN)
+
+    def trip(self, error: str):
+        """Open the circuit now, e.g. when the server cannot be reached at startup."""
+        with self._lock:
+            self._last_error = error
+            if self._state != CLOSED:
+                return
+            self._open()
+        print(f"[MCP] circuit open: {error}")
+        self._changed(OPEN)
+
+    def _open(self):
+        # Caller holds the lock
+        self._state = OPEN
+        self._opens += 1
+        self._opened_at = time.monotonic()
+        self._next_probe_at = self._opened_at + self.reset_timeout
+        if self._prober is None or not self._prober.is_alive():
+            self._prober = threading.Thread(target=self._probe_loop, name="mcp-breaker", daemon=True)
+            self._prober.start()
+
+    # ------------------------------------------------------------------
+    # Background probing
+    # ------------------------------------------------------------------
+
+    def _probe_loop(self):
+        while not self._stop.wait(max(0.0, self._next_probe_at - time.monotonic())):
+            with self._lock:
+                self._state = HALF_OPEN
+                self._probes += 1
+            self._changed(HALF_OPEN)
+            try:
+                self.probe()
+            except Exception as e:
+                with self._lock:
+                    self._state = OPEN
+                    self._probe_failures += 1
+                    self._last_error = f"{type(e).__name__}: {e}"
+                    self._next_probe_at = time.monotonic() + self.reset_timeout
+                self._changed(OPEN)
+                continue
+            with self._lock:
+                self._state = CLOSED
+                self._consecutive_failures = 0
+                open_seconds = time.monotonic() - self._opened_at
+                self._opened_at = None
+                self._next_probe_at = None
+            print(f"[MCP] circuit closed, server reachable again after {open_seconds:.1f}s")
+            self._changed(CLOSED)
+            return
+
+    def _changed(self, state: str):
+        if self.on_state_change is not None:
+            try:
+                self.on_state_change(state)
+            except Exception as e:
+                print(f"[MCP] circuit state callback failed: {str(e)}")
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._state,
+                "mode": self.mode,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout_seconds": self.reset_timeout,
+                "consecutive_failures": self._consecutive_failures,
+                "opens": self._opens,
+                "rejected": self._rejected,
+                "probes": self._probes,
+                "probe_failures": self._probe_failures,
+                "open_seconds": round(time.monotonic() - self._opened_at, 1) if self._opened_at else None,
+                "last_error": self._last_error,
+            }
@@ -0,0 +1,64 @@
+"""
+JSON codec for the /invocations hot path.
+Uses orjson or msgspec when installed and falls back to the stdlib, so
+payloads are parsed and written straight to bytes without building a
+pydantic model and re-serializing it.
+"""
+
+import json
+import os
+from typing import Any, Callable, Dict, Tuple
+
+from fastapi.responses import Response
+
+
+def _stdlib_codec() -> Tuple[Callable[[bytes], Any], Callable[[Any], bytes]]:
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return json.loads, dumps
+
+
+def _orjson_codec() -> Tuple[Callable[[bytes], Any], Callable[[Any], bytes]]:
+    import orjson
+    return orjson.loads, orjson.dumps
+
+
+def _msgspec_codec() -> Tuple[Callable[[bytes], Any], Callable[[Any], bytes]]:
+    import msgspec
+    decoder = msgspec.json.Decoder()
+    encoder = msgspec.json.Encoder()
+    return decoder.decode, encoder.encode
+
+
+CODECS: Dict[str, Callable[[], Tuple[Callable[[bytes], Any], Callable[[Any], bytes]]]] = {
+    "orjson": _orjson_codec,
+    "msgspec": _msgspec_codec,
+    "stdlib": _stdlib_codec,
+}
+
+
+def load_codec(name: str = "auto") -> Tuple[str, Callable[[bytes], Any], Callable[[Any], bytes]]:
+    """
+    Return ``(name, loads, dumps)`` for the requested codec.
+    "auto" picks the first of orjson, msgspec, stdlib that imports.
+    """
+    candidates = list(CODECS) if name == "auto" else [name, "stdlib"]
+    for candidate in candidates:
+        try:
+            loads, dumps = CODECS[candidate]()
+            return candidate, loads, dumps
+        except (ImportError, KeyError):
+            continue
+    raise RuntimeError("No JSON codec available")
+
+
+# Selected once at import; AGENT_JSON_CODEC=orjson|msgspec|stdlib|auto
+CODEC_NAME, loads, dumps = load_codec(os.getenv("AGENT_JSON_CODEC", "auto").lower())
+
+
+class JSONBytesResponse(Response):
+    """JSON response rendered by the selected codec with no validation pass."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,259 @@
+"""
+Token-budgeted conversation memory for session agents.
+The last few turns stay verbatim; once the history grows past its token
+budget, the older turns are folded into a running summary written by the
+model. The most recent tool results from folded turns are carried along
+verbatim, so numbers the model computed earlier are not lost to
+paraphrase. A turn's prompt therefore stays roughly the same size however
+long the session runs.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from strands import Agent
+from strands.agent.conversation_manager import ConversationManager, SlidingWindowConversationManager
+from strands.types.exceptions import ContextWindowOverflowException
+
+SUMMARY_MARKER = "[Summary of the earlier conversation]"
+TOOL_RESULTS_MARKER = "[Tool results from earlier turns]"
+
+SUMMARIZATION_PROMPT = """You maintain the running summary of a conversation between a user and an \
+assistant that uses calculation tools. Merge the previous summary (if any) with the new transcript \
+into one concise bullet-point summary written in the third person. Keep every number, parameter and \
+result the user may refer back to, the questions asked and the conclusions reached. Do not address \
+the user and do not add anything that is not in the input."""
+
+
+def estimate_tokens(value: Any) -> int:
+    """Rough token count (about 4 characters per token) of a message, content block or string."""
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+    return len(text) // 4 + 1
+
+
+def _is_turn_start(message: Dict[str, Any]) -> bool:
+    # A user message that is not just tool results opens a new turn
+    return message["role"] == "user" and not any("toolResult" in block for block in message["content"])
+
+
+def _result_text(tool_result: Dict[str, Any]) -> str:
+    parts = []
+    for block in tool_result.get("content", []):
+        if "text" in block:
+            # FastMCP pretty-prints JSON results; the indentation is not worth carrying
+            try:
+                parts.append(json.dumps(json.loads(block["text"]), separators=(",", ":")))
+            except ValueError:
+                parts.append(block["text"])
+        elif "json" in block:
+            parts.append(json.dumps(block["json"], separators=(",", ":"), default=str))
+    return " ".join(parts)
+
+
+class TokenBudgetConversationManager(ConversationManager):
+    """
+    Keeps the last ``keep_turns`` turns verbatim and folds older ones into
+    a rolling summary once the history exceeds ``token_budget`` (estimated)
+    tokens.
+
+    Folding runs after a turn completes, never in the middle of one, and
+    always down to ``keep_turns``, so the summary is rewritten only every
+    few turns rather than on each one (which also keeps the prompt-cache
+    prefix stable in between). The summary is a model call on a separate,
+    tool-less agent sharing ``model``; without a model, or if that call
+    fails, an extractive summary of the user prompts is used instead. Up
+    to ``tool_result_tokens`` of the newest folded tool results are kept
+    verbatim next to the summary.
+    """
+
+    def __init__(self, model: Any = None, *, token_budget: int = 8000, keep_turns: int = 4,
+                 tool_result_tokens: int = 1000, on_summarize: Optional[Callable[[float, int], None]] = None):
+        super().__init__()
+        if keep_turns < 1:
+            raise ValueError("keep_turns must be at least 1")
+        self.model = model
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.tool_result_tokens = tool_result_tokens
+        self.on_summarize = on_summarize
+        self.summary = ""
+        self.tool_results: List[str] = []
+        self.summaries = 0
+        self.summary_failures = 0
+
+    # ------------------------------------------------------------------
+    # ConversationManager
+    # ------------------------------------------------------------------
+
+    def apply_management(self, agent: Agent, **kwargs: Any):
+        if self.history_tokens(agent.messages) > self.token_budget:
+            self._fold(agent, self.keep_turns)
+
+    def reduce_context(self, agent: Agent, e: Optional[Exception] = None, **kwargs: Any):
+        # The model rejected the prompt as too long: keep only the current turn verbatim
+        if not self._fold(agent, 1):
+            raise ContextWindowOverflowException("Cannot fold the conversation any further") from e
+
+    # ------------------------------------------------------------------
+    # Folding
+    # ------------------------------------------------------------------
+
+    def history_tokens(self, messages: List[Dict[str, Any]]) -> int:
+        return sum(estimate_tokens(block) for message in messages for block in message["content"])
+
+    def _fold(self, agent: Agent, keep_turns: int) -> bool:
+        """Summarize everything before the last ``keep_turns`` turns; False if there is nothing to fold."""
+        messages = agent.messages
+        starts = [i for i, message in enumerate(messages) if _is_turn_start(message)]
+        if len(starts) <= keep_turns:
+            return False
+        split = starts[-keep_turns]
+        folded = [self._strip_summary(message) for message in messages[:split]]
+        kept = [dict(message, content=list(message["content"])) for message in messages[split:]]
+
+        started = time.perf_counter()
+        self.tool_results = self._carry_tool_results(folded)
+        self.summary = self._summarize(folded)
+        elapsed = time.perf_counter() - started
+
+        # The summary rides on the first kept prompt so roles keep alternating
+        kept[0]["content"] = [{"text": self._summary_text()}] + kept[0]["content"]
+        agent.messages[:] = kept
+        self.removed_message_count += split
+        self.summaries += 1
+        if self.on_summarize is not None:
+            self.on_summarize(elapsed, split)
+        return True
+
+    def _strip_summary(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        # The previous summary is already in self.summary; do not feed it in twice
+        content = [block for block in message["content"]
+                   if not block.get("text", "").startswith(SUMMARY_MARKER)]
+        return dict(message, content=content)
+
+    def _summary_text(self) -> str:
+        text = f"{SUMMARY_MARKER}\n{self.summary}"
+        if self.tool_results:
+            text += f"\n\n{TOOL_RESULTS_MARKER}\n" + "\n".join(self.tool_results)
+        return text
+
+    def _carry_tool_results(self, folded: List[Dict[str, Any]]) -> List[str]:
+        """Newest tool calls and results first, within ``tool_result_tokens``, returned oldest first."""
+        uses = {}
+        lines = []
+        for message in folded:
+            for block in message["content"]:
+                if "toolUse" in block:
+                    uses[block["toolUse"]["toolUseId"]] = block["toolUse"]
+                elif "toolResult" in block and block["toolResult"].get("status") != "error":
+                    use = uses.get(block["toolResult"]["toolUseId"], {})
+                    arguments = json.dumps(use.get("input", {}), sort_keys=True, default=str)
+                    lines.append(f"- {use.get('name', 'tool')}({arguments}) -> {_result_text(block['toolResult'])}")
+        carried, budget = [], self.tool_result_tokens
+        for line in reversed(self.tool_results + lines):
+            cost = estimate_tokens(line)
+            if cost > budget:
+                break
+            carried.append(line)
+            budget -= cost
+        return carried[::-1]
+
+    def _summarize(self, folded: List[Dict[str, Any]]) -> str:
+        transcript = self._transcript(folded)
+        if self.model is not None:
+            try:
+                # Tool-less, history-less agent on the shared model; its reply never touches the session
+                summarizer = Agent(model=self.model, system_prompt=SUMMARIZATION_PROMPT, callback_handler=None)
+                prompt = f"Previous summary:\n{self.summary or '(none)'}\n\nNew transcript:\n{transcript}"
+                summary = str(summarizer(prompt)).strip()
+                if summary:
+                    return summary
+            except Exception as e:
+                self.summary_failures += 1
+                print(f"[MEMORY] summarization failed, using extractive summary: {str(e)}")
+        return self._extractive_summary(folded)
+
+    def _transcript(self, folded: List[Dict[str, Any]]) -> str:
+        lines = []
+        for message in folded:
+            for block in message["content"]:
+                if "text" in block:
+                    lines.append(f"{message['role']}: {block['text']}")
+                elif "toolUse" in block:
+                    lines.append(f"tool call: {block['toolUse']['name']}"
+                                 f"({json.dumps(block['toolUse'].get('input', {}), default=str)})")
+                elif "toolResult" in block:
+                    lines.append(f"tool result: {_result_text(block['toolResult'])}")
+        return "\n".join(lines)
+
+    def _extractive_summary(self, folded: List[Dict[str, Any]]) -> str:
+        # Previous summary plus one line per folded prompt, trimmed to a quarter of the budget
+        lines = [self.summary] if self.summary else []
+        for message in folded:
+            if _is_turn_start(message):
+                text = " ".join(block["text"] for block in message["content"] if "text" in block)
+                lines.append(f"- The user asked: {text[:200]}")
+        budget = max(1, self.token_budget // 4) * 4
+        return "\n".join(lines)[-budget:]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "summaries": self.summaries,
+            "summary_failures": self.summary_failures,
+            "removed_messages": self.removed_message_count,
+            "summary_tokens": estimate_tokens(self._summary_text()) if self.summary else 0,
+        }
+
+
+class MemoryStats:
+    """Summarization counts across every session's conversation manager."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.summaries = 0
+        self.folded_messages = 0
+        self.summarize_seconds = 0.0
+
+    def record(self, seconds: float, folded_messages: int):
+        with self._lock:
+            self.summaries += 1
+            self.folded_messages += folded_messages
+            self.summarize_seconds += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "summaries": self.summaries,
+                "folded_messages": self.folded_messages,
+                "avg_summarize_ms": round(self.summarize_seconds / self.summaries * 1000, 2)
+                if self.summaries else None,
+            }
+
+
+def memory_mode() -> str:
+    """AGENT_MEMORY: ``summarizing`` (default) or ``window``."""
+    return os.getenv("AGENT_MEMORY", "summarizing").lower()
+
+
+def conversation_manager_factory(model: Any, window_size: int, mode: str = None,
+                                 on_summarize: Optional[Callable[[float, int], None]] = None
+                                 ) -> Callable[[], ConversationManager]:
+    """
+    Builds session conversation managers for ``mode``; the summarizing ones
+    read AGENT_MEMORY_TOKEN_BUDGET, AGENT_MEMORY_KEEP_TURNS and
+    AGENT_MEMORY_TOOL_RESULT_TOKENS.
+    """
+    mode = mode or memory_mode()
+    if mode == "window":
+        return lambda: SlidingWindowConversationManager(window_size=window_size)
+    if mode != "summarizing":
+        raise ValueError(f"Unknown AGENT_MEMORY {mode!r}; expected 'summarizing' or 'window'")
+    token_budget = int(os.getenv("AGENT_MEMORY_TOKEN_BUDGET", "8000"))
+    keep_turns = int(os.getenv("AGENT_MEMORY_KEEP_TURNS", "4"))
+    tool_result_tokens = int(os.getenv("AGENT_MEMORY_TOOL_RESULT_TOKENS", "1000"))
+    return lambda: TokenBudgetConversationManager(
+        model, token_budget=token_budget, keep_turns=keep_turns,
+        tool_result_tokens=tool_result_tokens, on_summarize=on_summarize)
@@ -0,0 +1,91 @@
+"""
+In-process tool binding.
+For local runs and single-container deployments: imports the FastMCP
+server module and registers its tools directly as Strands tools, so a
+tool call is a plain function call instead of JSON-RPC over HTTP/SSE.
+Names, descriptions and schemas are taken from the server's own
+tools/list answer, arguments go through the same argument model and
+results are rendered the way FastMCP renders them, so the model sees
+exactly what it would over MCP.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import os
+from typing import Any, Callable, Dict, List
+
+import pydantic_core
+from mcp.server.fastmcp import FastMCP
+from strands.tools.tools import PythonAgentTool
+
+DEFAULT_SERVER_MODULE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "mcp_server", "mcp_server.py")
+
+
+def tool_binding() -> str:
+    """AGENT_TOOL_BINDING: ``mcp`` (default) or ``in_process``."""
+    return os.getenv("AGENT_TOOL_BINDING", "mcp").lower().replace("-", "_")
+
+
+def server_module_path() -> str:
+    return os.path.abspath(os.getenv("AGENT_MCP_SERVER_MODULE", DEFAULT_SERVER_MODULE))
+
+
+def _load_server(path: str) -> FastMCP:
+    """Import the server module (its ``__main__`` block does not run) and return its FastMCP app."""
+    spec = importlib.util.spec_from_file_location("mcp_server", path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot import MCP server module from {path}")
+    module = importlib.util.module_from_spec(spec)
+    # FastMCP() configures root logging for a server process; keep the agent's setup
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        root.handlers[:] = handlers
+        root.setLevel(level)
+    for value in vars(module).values():
+        if isinstance(value, FastMCP):
+            return value
+    raise ImportError(f"No FastMCP server defined in {path}")
+
+
+def _render(result: Any) -> List[Dict[str, str]]:
+    # Same text FastMCP puts in the tool result's content block
+    if isinstance(result, str):
+        return [{"text": result}]
+    return [{"text": pydantic_core.to_json(result, fallback=str, indent=2).decode()}]
+
+
+def _bind(server_tool: Any) -> Callable[..., Dict[str, Any]]:
+    metadata = server_tool.fn_metadata
+
+    def call(tool_use: Dict[str, Any], **invocation_state: Any) -> Dict[str, Any]:
+        tool_use_id = tool_use["toolUseId"]
+        try:
+            # FastMCP's own coercion (e.g. 10 -> 10.0 for float parameters), without the transport
+            arguments = metadata.arg_model.model_validate(metadata.pre_parse_json(tool_use.get("input") or {}))
+            result = server_tool.fn(**arguments.model_dump_one_level())
+        except Exception as e:
+            return {"toolUseId": tool_use_id, "status": "error",
+                    "content": [{"text": f"Error executing tool {server_tool.name}: {str(e)}"}]}
+        return {"toolUseId": tool_use_id, "status": "success", "content": _render(result)}
+    return call
+
+
+def server_tools(path: str = None) -> List[PythonAgentTool]:
+    """The server's tools as Strands tools that call the functions directly."""
+    server = _load_server(path or server_module_path())
+    server_tools_by_name = {tool.name: tool for tool in server._tool_manager.list_tools()}
+    tools = []
+    for mcp_tool in asyncio.run(server.list_tools()):
+        spec: Dict[str, Any] = {
+            "inputSchema": {"json": mcp_tool.inputSchema},
+            "name": mcp_tool.name,
+            "description": mcp_tool.description or f"Tool which performs {mcp_tool.name}",
+        }
+        if mcp_tool.outputSchema:
+            spec["outputSchema"] = {"json": mcp_tool.outputSchema}
+        tools.append(PythonAgentTool(mcp_tool.name, spec, _bind(server_tools_by_name[mcp_tool.name])))
+    return tools
@@ -0,0 +1,312 @@
+"""
+Client-side balancing across several MCP endpoints.
+Each endpoint (URL or AgentCore Runtime ARN, any region) has its own
+long-lived session. A background checker pings all of them; tool calls
+go to the healthy endpoint with the best latency/load score and fail
+over to the next one when an endpoint drops out mid-call.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from strands.tools.mcp import MCPAgentTool
+
+from mcp_pool import ManagedMCPClient, _describe
+from tool_catalog import CachedToolsMCPClient
+
+ROUTING_STRATEGIES = ("ewma", "least_outstanding")
+
+
+class MCPEndpoint:
+    """One MCP server behind the pool: its client plus the routing state for it."""
+
+    def __init__(self, name: str, client: ManagedMCPClient, ewma_alpha: float):
+        self.name = name
+        self.client = client
+        self.ewma_alpha = ewma_alpha
+        self.healthy = True
+        self.ewma: Optional[float] = None
+        self.outstanding = 0
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+
+    def observe(self, seconds: float):
+        """Fold a latency sample (tool call or health ping) into the EWMA."""
+        if self.ewma is None:
+            self.ewma = seconds
+        else:
+            self.ewma = self.ewma_alpha * seconds + (1 - self.ewma_alpha) * self.ewma
+
+    def mark_up(self):
+        self.healthy = True
+        self.consecutive_failures = 0
+
+    def mark_down(self, error: str):
+        self.healthy = False
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = error
+
+    def score(self, strategy: str) -> tuple:
+        # Unmeasured endpoints score 0 so they get probed by real traffic
+        latency = self.ewma or 0.0
+        if strategy == "least_outstanding":
+            return (self.outstanding, latency)
+        return (latency * (self.outstanding + 1), self.outstanding)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "endpoint": self.name,
+            "healthy": self.healthy,
+            "connected": self.client.connected,
+            "ewma_ms": round(self.ewma * 1000, 2) if self.ewma is not None else None,
+            "outstanding": self.outstanding,
+            "calls": self.calls,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "checked_seconds_ago": round(time.time() - self.checked_at, 1) if self.checked_at else None,
+        }
+
+
+class MCPEndpointPool(CachedToolsMCPClient):
+    """
+    One tool provider in front of several MCP endpoints serving the same tools.
+
+    The tool catalog (and result cache) belongs to the pool; tools are
+    listed from whichever endpoint is best at the time. Calls are routed by
+    ``strategy``: ``ewma`` picks the lowest EWMA latency weighted by calls
+    in flight, ``least_outstanding`` the fewest calls in flight. An
+    endpoint whose session is lost on a call or a health check is taken
+    out of rotation until a later check reaches it again; if every
+    endpoint is down, the one that failed least recently is still tried.
+    """
+
+    def __init__(self, endpoints: Dict[str, Callable[[], Any]], *, strategy: str = "ewma",
+                 health_interval: float = 10.0, ewma_alpha: float = 0.3, **kwargs: Any):
+        if not endpoints:
+            raise ValueError("MCPEndpointPool needs at least one endpoint")
+        if strategy not in ROUTING_STRATEGIES:
+            raise ValueError(f"Unknown routing strategy {strategy!r}; expected one of {ROUTING_STRATEGIES}")
+        # The pool never opens a session of its own; the transport is only there to satisfy MCPClient
+        super().__init__(next(iter(endpoints.values())), **kwargs)
+        self.strategy = strategy
+        self.health_interval = health_interval
+        # Failover replaces per-endpoint retries: one connect attempt each, no member keep-alive
+        self.endpoints = [
+            MCPEndpoint(name, ManagedMCPClient(transport, reconnect_attempts=1, keepalive_interval=0), ewma_alpha)
+            for name, transport in endpoints.items()
+        ]
+        self._route_lock = threading.Lock()
+        self._failovers = 0
+        self._health_stop = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+        self._checker = ThreadPoolExecutor(max_workers=len(self.endpoints), thread_name_prefix="mcp-health")
+
+    @classmethod
+    def from_env(cls, endpoints: Dict[str, Callable[[], Any]], **kwargs: Any) -> "MCPEndpointPool":
+        """Build from AGENT_MCP_ROUTING / AGENT_MCP_HEALTH_INTERVAL / AGENT_MCP_EWMA_ALPHA."""
+        return cls(
+            endpoints,
+            strategy=os.getenv("AGENT_MCP_ROUTING", "ewma").lower(),
+            health_interval=float(os.getenv("AGENT_MCP_HEALTH_INTERVAL", "10")),
+            ewma_alpha=float(os.getenv("AGENT_MCP_EWMA_ALPHA", "0.3")),
+            **kwargs,
+        )
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    @property
+    def connected(self) -> bool:
+        return any(endpoint.client.connected for endpoint in self.endpoints)
+
+    def _is_session_active(self) -> bool:
+        return self.connected
+
+    def _ranked(self, exclude: Optional[set] = None) -> List[MCPEndpoint]:
+        """Endpoints in routing order: healthy by score, then down ones by how long ago they failed."""
+        candidates = [e for e in self.endpoints if not exclude or e.name not in exclude]
+        with self._route_lock:
+            healthy = sorted((e for e in candidates if e.healthy), key=lambda e: e.score(self.strategy))
+            down = sorted((e for e in candidates if not e.healthy), key=lambda e: e.consecutive_failures)
+        return healthy + down
+
+    def _acquire(self, exclude: set) -> Optional[MCPEndpoint]:
+        ranked = self._ranked(exclude)
+        if not ranked:
+            return None
+        endpoint = ranked[0]
+        with self._route_lock:
+            endpoint.outstanding += 1
+            endpoint.calls += 1
+        return endpoint
+
+    def _release(self, endpoint: MCPEndpoint, started: float, result: Dict[str, Any]) -> bool:
+        """Record the call; False if the endpoint lost its session and the call should fail over."""
+        elapsed = time.perf_counter() - started
+        with self._route_lock:
+            endpoint.outstanding -= 1
+            if result["status"] == "error" and not endpoint.client.connected:
+                endpoint.mark_down(endpoint.client.stats()["last_error"] or "session lost during tool call")
+                return False
+            endpoint.observe(elapsed)
+            return True
+
+    def _failed_over(self, endpoint: MCPEndpoint, tried: set):
+        with self._route_lock:
+            self._failovers += 1
+        print(f"[MCP] {endpoint.name} failed a tool call ({endpoint.last_error}); "
+              f"{len(self.endpoints) - len(tried)} endpoint(s) left to try")
+
+    async def _call_tool_async(self, tool_use_id: str, name: str, arguments: Optional[Dict[str, Any]] = None,
+                               read_timeout_seconds: Optional[timedelta] = None):
+        tried: set = set()
+        result = None
+        while True:
+            endpoint = self._acquire(tried)
+            if endpoint is None:
+                return result
+            tried.add(endpoint.name)
+            started = time.perf_counter()
+            result = {"status": "error"}
+            try:
+                result = await endpoint.client._call_tool_async(tool_use_id, name, arguments, read_timeout_seconds)
+            finally:
+                served = self._release(endpoint, started, result)
+            if served:
+                return result
+            self._failed_over(endpoint, tried)
+
+    def _call_tool_sync(self, tool_use_id: str, name: str, arguments: Optional[Dict[str, Any]] = None,
+                        read_timeout_seconds: Optional[timedelta] = None):
+        tried: set = set()
+        result = None
+        while True:
+            endpoint = self._acquire(tried)
+            if endpoint is None:
+                return result
+            tried.add(endpoint.name)
+            started = time.perf_counter()
+            result = {"status": "error"}
+            try:
+                result = endpoint.client._call_tool_sync(tool_use_id, name, arguments, read_timeout_seconds)
+            finally:
+                served = self._release(endpoint, started, result)
+            if served:
+                return result
+            self._failed_over(endpoint, tried)
+
+    # ------------------------------------------------------------------
+    # Catalog
+    # ------------------------------------------------------------------
+
+    def _fetch_catalog(self) -> List[MCPAgentTool]:
+        """tools/list from the best reachable endpoint; the tools call back through the pool."""
+        self._tool_provider_started = True
+        errors = []
+        for endpoint in self._ranked():
+            try:
+                endpoint.client.ensure_session()
+                tools = []
+                pagination_token = None
+                while True:
+                    page = endpoint.client.list_tools_sync(pagination_token, prefix=self._prefix,
+                                                           tool_filters=self._tool_filters)
+                    tools.extend(page)
+                    pagination_token = page.pagination_token
+                    if pagination_token is None:
+                        break
+            except Exception as e:
+                with self._route_lock:
+                    endpoint.mark_down(_describe(e))
+                errors.append(f"{endpoint.name}: {endpoint.last_error}")
+                continue
+            with self._route_lock:
+                endpoint.mark_up()
+            return [MCPAgentTool(tool.mcp_tool, self, name_override=tool.tool_name) for tool in tools]
+        raise ConnectionError(f"No MCP endpoint could list tools: {'; '.join(errors)}")
+
+    # ------------------------------------------------------------------
+    # Health checks
+    # ------------------------------------------------------------------
+
+    def start_keepalive(self):
+        """Check every endpoint now and then every ``health_interval`` seconds (0 disables)."""
+        if self.health_interval <= 0 or self._health_thread is not None:
+            return
+        self._health_thread = threading.Thread(target=self._health_loop, name="mcp-health", daemon=True)
+        self._health_thread.start()
+
+    def stop_keepalive(self):
+        self._health_stop.set()
+
+    def _health_loop(self):
+        while True:
+            if self.catalog_stale:
+                self.refresh_catalog_async()
+            # Checked in parallel so one unreachable endpoint cannot delay the others
+            list(self._checker.map(self._check, self.endpoints))
+            if self._health_stop.wait(self.health_interval):
+                return
+
+    def probe(self):
+        """Circuit-breaker probe: check every endpoint; raises unless at least one is reachable."""
+        list(self._checker.map(self._check, self.endpoints))
+        if not any(endpoint.healthy for endpoint in self.endpoints):
+            errors = "; ".join(f"{endpoint.name}: {endpoint.last_error}" for endpoint in self.endpoints)
+            raise ConnectionError(f"No MCP endpoint reachable: {errors}")
+
+    def _check(self, endpoint: MCPEndpoint):
+        client = endpoint.client
+        try:
+            client.ensure_session()
+            started = time.perf_counter()
+            client.ping()
+            elapsed = time.perf_counter() - started
+        except Exception as e:
+            was_healthy = endpoint.healthy
+            with self._route_lock:
+                endpoint.mark_down(_describe(e))
+                endpoint.checked_at = time.time()
+            if was_healthy:
+                print(f"[MCP] {endpoint.name} is down: {endpoint.last_error}")
+            return
+        was_healthy = endpoint.healthy
+        with self._route_lock:
+            endpoint.observe(elapsed)
+            endpoint.mark_up()
+            endpoint.checked_at = time.time()
+        if not was_healthy:
+            print(f"[MCP] {endpoint.name} is back in rotation")
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """ManagedMCPClient's counters summed over endpoints, plus per-endpoint routing state."""
+        members = [endpoint.client.stats() for endpoint in self.endpoints]
+        totals = {key: sum(member[key] for member in members)
+                  for key in ("handshakes", "reconnects", "reconnect_failures", "broken_sessions",
+                              "abandoned_sessions", "tool_calls", "warm_calls", "pings", "ping_failures")}
+        with self._route_lock:
+            endpoints = [endpoint.stats() for endpoint in self.endpoints]
+            failovers = self._failovers
+        return {
+            "connected": self.connected,
+            **totals,
+            "reuse_ratio": round(totals["warm_calls"] / totals["tool_calls"], 4) if totals["tool_calls"] else None,
+            "routing": self.strategy,
+            "health_interval_seconds": self.health_interval,
+            "healthy_endpoints": sum(1 for endpoint in endpoints if endpoint["healthy"]),
+            "failovers": failovers,
+            "endpoints": endpoints,
+        }
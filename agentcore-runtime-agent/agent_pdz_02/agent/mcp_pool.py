@@ -0,0 +1,369 @@
+"""
+Long-lived MCP connection for the agent.
+Keeps one initialized MCP session warm (with HTTP keep-alive pooling
+underneath), notices when it breaks and reconnects with jittered
+backoff, so tool calls normally skip the connect + initialize handshake.
+"""
+
+import asyncio
+import inspect
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent import futures
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import quote
+
+import httpx
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared._httpx_utils import MCP_DEFAULT_SSE_READ_TIMEOUT, MCP_DEFAULT_TIMEOUT
+
+from tool_catalog import CachedToolsMCPClient
+
+
+def pooled_http_client_factory(max_connections: int = 16, keepalive_expiry: float = 300.0):
+    """
+    httpx client factory for the MCP transports: the stock MCP timeouts
+    plus a connection pool whose idle connections live ``keepalive_expiry``
+    seconds, so requests on a session reuse the same TLS connection.
+    """
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+
+    def factory(headers: Optional[Dict[str, str]] = None, timeout: Optional[httpx.Timeout] = None,
+                auth: Optional[httpx.Auth] = None) -> httpx.AsyncClient:
+        if timeout is None:
+            timeout = httpx.Timeout(MCP_DEFAULT_TIMEOUT, read=MCP_DEFAULT_SSE_READ_TIMEOUT)
+        return httpx.AsyncClient(headers=headers, timeout=timeout, auth=auth, limits=limits)
+
+    return factory
+
+
+def with_pooled_http(transport: Callable[..., Any], **kwargs: Any) -> Dict[str, Any]:
+    """``kwargs`` plus the pooled client factory, if ``transport`` accepts one."""
+    if "httpx_client_factory" in inspect.signature(transport).parameters:
+        kwargs["httpx_client_factory"] = pooled_http_client_factory(
+            keepalive_expiry=float(os.getenv("AGENT_MCP_KEEPALIVE_EXPIRY", "300"))
+        )
+    return kwargs
+
+
+def endpoint_transport(endpoint: str) -> Callable[[], Any]:
+    """
+    Transport factory for an MCP endpoint: an HTTP(S) URL, or an AgentCore
+    Runtime ARN reached over SigV4 in the region named by the ARN.
+    Raises ImportError for an ARN when mcp-proxy-for-aws is not installed.
+    """
+    if not endpoint.startswith("arn:"):
+        http_kwargs = with_pooled_http(streamablehttp_client, url=endpoint)
+        return lambda: streamablehttp_client(**http_kwargs)
+
+    from mcp_proxy_for_aws.client import aws_iam_streamablehttp_client
+    # arn:aws:bedrock-agentcore:{region}:{account}:runtime/{id}
+    region = endpoint.split(":")[3]
+    # mcp-proxy-for-aws expects the runtime's invoke URL, not the ARN
+    invoke_url = (f"https://bedrock-agentcore.{region}.amazonaws.com/runtimes/"
+                  f"{quote(endpoint, safe='')}/invocations?qualifier=DEFAULT")
+    iam_kwargs = with_pooled_http(
+        aws_iam_streamablehttp_client,
+        endpoint=invoke_url,
+        aws_region=region,
+        aws_service="bedrock-agentcore"
+    )
+    return lambda: aws_iam_streamablehttp_client(**iam_kwargs)
+
+
+def _describe(error: BaseException) -> str:
+    """Innermost cause of a connection error (anyio wraps them in task groups)."""
+    error = error.__cause__ or error
+    while isinstance(error, BaseExceptionGroup) and error.exceptions:
+        error = error.exceptions[0]
+    return f"{type(error).__name__}: {error}"
+
+
+class ManagedMCPClient(CachedToolsMCPClient):
+    """
+    MCPClient that keeps its session alive and repairs it.
+
+    Every tool call checks the session first; a dead session (or one that
+    dies mid-call) is replaced by a new one, retrying up to
+    ``reconnect_attempts`` times with full-jitter exponential backoff, and
+    the interrupted call is retried once. A background keep-alive pings the
+    server every ``keepalive_interval`` seconds so idle timeouts are caught
+    off the request path, and also triggers the tool-catalog refresh once
+    its TTL passes. The discovered tools and registered agents survive a
+    reconnect. Closing a broken session waits at most ``shutdown_timeout``
+    seconds; a transport that hangs on close is abandoned on its daemon
+    thread.
+    """
+
+    def __init__(self, transport_callable: Callable[[], Any], *, reconnect_attempts: int = 5,
+                 backoff_base: float = 0.2, backoff_cap: float = 10.0,
+                 keepalive_interval: float = 60.0, shutdown_timeout: float = 5.0, **kwargs: Any):
+        super().__init__(self._counted(transport_callable), **kwargs)
+        self.reconnect_attempts = reconnect_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.keepalive_interval = keepalive_interval
+        self.shutdown_timeout = shutdown_timeout
+        self._reconnect_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._handshakes = 0
+        self._reconnects = 0
+        self._reconnect_failures = 0
+        self._broken_sessions = 0
+        self._abandoned_sessions = 0
+        self._tool_calls = 0
+        self._warm_calls = 0
+        self._pings = 0
+        self._ping_failures = 0
+        self._last_error: Optional[str] = None
+        self._keepalive_stop = threading.Event()
+        self._keepalive_thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls, transport_callable: Callable[[], Any], **kwargs: Any) -> "ManagedMCPClient":
+        """
+        Build from AGENT_MCP_RECONNECT_ATTEMPTS / AGENT_MCP_BACKOFF_BASE / AGENT_MCP_BACKOFF_CAP /
+        AGENT_MCP_KEEPALIVE / AGENT_MCP_SHUTDOWN_TIMEOUT.
+        """
+        return cls(
+            transport_callable,
+            reconnect_attempts=int(os.getenv("AGENT_MCP_RECONNECT_ATTEMPTS", "5")),
+            backoff_base=float(os.getenv("AGENT_MCP_BACKOFF_BASE", "0.2")),
+            backoff_cap=float(os.getenv("AGENT_MCP_BACKOFF_CAP", "10")),
+            keepalive_interval=float(os.getenv("AGENT_MCP_KEEPALIVE", "60")),
+            shutdown_timeout=float(os.getenv("AGENT_MCP_SHUTDOWN_TIMEOUT", "5")),
+            **kwargs,
+        )
+
+    def _counted(self, transport_callable: Callable[[], Any]) -> Callable[[], Any]:
+        # The transport is opened once per session, right before initialize
+        def transport():
+            with self._stats_lock:
+                self._handshakes += 1
+            return transport_callable()
+        return transport
+
+    # ------------------------------------------------------------------
+    # Session lifecycle
+    # ------------------------------------------------------------------
+
+    @property
+    def connected(self) -> bool:
+        return self._is_session_active()
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, min(cap, base * 2**attempt)]."""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def ensure_session(self) -> bool:
+        """Reconnect if the session is down; True when a new session was opened."""
+        if self._is_session_active():
+            return False
+        with self._reconnect_lock:
+            # Another caller may have reconnected while we waited
+            if self._is_session_active():
+                return False
+            self._reconnect()
+            return True
+
+    def _open_session(self):
+        self.ensure_session()
+
+    def _reconnect(self):
+        # The first connect (tools loaded from a snapshot) is not a reconnect
+        had_session = self._background_thread is not None
+        # stop() resets the provider state; keep what the agents rely on
+        consumers = set(self._consumers)
+        tools = self._loaded_tools
+        provider_started = self._tool_provider_started
+        try:
+            self._stop_session()
+        except Exception as e:
+            # stop() re-raises whatever broke the old session
+            self._last_error = _describe(e)
+
+        try:
+            for attempt in range(self.reconnect_attempts):
+                if attempt:
+                    time.sleep(self._backoff(attempt))
+                try:
+                    self.start()
+                except Exception as e:
+                    with self._stats_lock:
+                        self._reconnect_failures += 1
+                    self._last_error = _describe(e)
+                    print(f"[MCP] reconnect attempt {attempt + 1}/{self.reconnect_attempts} failed: {self._last_error}")
+                    continue
+                if had_session:
+                    with self._stats_lock:
+                        self._reconnects += 1
+                    print(f"[MCP] session re-established after {attempt + 1} attempt(s)")
+                return
+            raise ConnectionError(f"MCP server unreachable after {self.reconnect_attempts} attempts: {self._last_error}")
+        finally:
+            self._consumers = consumers
+            self._loaded_tools = tools
+            self._tool_provider_started = provider_started
+
+    def _stop_session(self):
+        """
+        stop() with a bounded wait. Strands joins the session thread without
+        a timeout, so a transport that hangs on close would block the
+        reconnect (and every tool call waiting on it) forever.
+        """
+        thread, loop = self._background_thread, self._background_thread_event_loop
+        if thread is not None and thread.is_alive() and loop is not None:
+            async def _close():
+                if self._close_future and not self._close_future.done():
+                    self._close_future.set_result(None)
+
+            asyncio.run_coroutine_threadsafe(_close(), loop)
+            thread.join(self.shutdown_timeout)
+            if thread.is_alive():
+                # Still closing: cancel whatever it is stuck on and give it a moment
+                loop.call_soon_threadsafe(lambda: [task.cancel() for task in asyncio.all_tasks(loop)])
+                thread.join(min(1.0, self.shutdown_timeout))
+        if thread is None or not thread.is_alive():
+            self.stop(None, None, None)
+            return
+        # Abandon the thread (a daemon) with its loop still running; the next start() opens a fresh one
+        with self._stats_lock:
+            self._abandoned_sessions += 1
+        print(f"[MCP] session did not close within {self.shutdown_timeout}s, abandoning it")
+        self._init_future = futures.Future()
+        self._background_thread = None
+        self._background_thread_session = None
+        self._background_thread_event_loop = None
+        self._session_id = uuid.uuid4()
+        self._close_exception = None
+
+    def start_keepalive(self):
+        """Ping the server every ``keepalive_interval`` seconds (0 disables)."""
+        if self.keepalive_interval <= 0 or self._keepalive_thread is not None:
+            return
+        self._keepalive_thread = threading.Thread(target=self._keepalive, name="mcp-keepalive", daemon=True)
+        self._keepalive_thread.start()
+
+    def stop_keepalive(self):
+        self._keepalive_stop.set()
+
+    def _keepalive(self):
+        while not self._keepalive_stop.wait(self.keepalive_interval):
+            # Nothing to keep alive until the tools have been loaded once
+            if not self._tool_provider_started:
+                continue
+            if self.catalog_stale:
+                self.refresh_catalog_async()
+            if self._is_session_active():
+                try:
+                    self.ping()
+                    continue
+                except Exception:
+                    # ping() marked the session broken; reconnect it below
+                    pass
+            try:
+                self.ensure_session()
+            except Exception as e:
+                print(f"[MCP] keep-alive could not reconnect: {str(e)}")
+
+    def ping(self):
+        """MCP ping on the open session; a failure marks the session broken and re-raises."""
+        try:
+            session = self._background_thread_session
+            self._invoke_on_background_thread(session.send_ping()).result(timeout=MCP_DEFAULT_TIMEOUT)
+        except Exception as e:
+            with self._stats_lock:
+                self._ping_failures += 1
+            self._last_error = _describe(e)
+            # A failed ping leaves the transport in an unknown state; replace it
+            self._mark_broken()
+            raise
+        with self._stats_lock:
+            self._pings += 1
+
+    def probe(self):
+        """Circuit-breaker probe: open the session if needed and ping it; raises if the server is unreachable."""
+        self.ensure_session()
+        self.ping()
+
+    def _mark_broken(self):
+        with self._stats_lock:
+            self._broken_sessions += 1
+        close_future = self._close_future
+        loop = self._background_thread_event_loop
+        if close_future is not None and loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(lambda: close_future.done() or close_future.set_result(None))
+
+    # ------------------------------------------------------------------
+    # Tool calls
+    # ------------------------------------------------------------------
+
+    async def _call_tool_async(self, tool_use_id: str, name: str, arguments: Optional[Dict[str, Any]] = None,
+                               read_timeout_seconds: Optional[timedelta] = None):
+        with self._stats_lock:
+            self._tool_calls += 1
+        try:
+            if self._is_session_active():
+                with self._stats_lock:
+                    self._warm_calls += 1
+            else:
+                await asyncio.to_thread(self.ensure_session)
+
+            result = await super()._call_tool_async(tool_use_id, name, arguments, read_timeout_seconds)
+            if result["status"] == "error" and not self._is_session_active():
+                # The session died under this call; reconnect and retry it once
+                with self._stats_lock:
+                    self._broken_sessions += 1
+                await asyncio.to_thread(self.ensure_session)
+                result = await super()._call_tool_async(tool_use_id, name, arguments, read_timeout_seconds)
+            return result
+        except ConnectionError as e:
+            return self._handle_tool_execution_error(tool_use_id, e)
+
+    def _call_tool_sync(self, tool_use_id: str, name: str, arguments: Optional[Dict[str, Any]] = None,
+                        read_timeout_seconds: Optional[timedelta] = None):
+        with self._stats_lock:
+            self._tool_calls += 1
+        try:
+            if self._is_session_active():
+                with self._stats_lock:
+                    self._warm_calls += 1
+            else:
+                self.ensure_session()
+
+            result = super()._call_tool_sync(tool_use_id, name, arguments, read_timeout_seconds)
+            if result["status"] == "error" and not self._is_session_active():
+                with self._stats_lock:
+                    self._broken_sessions += 1
+                self.ensure_session()
+                result = super()._call_tool_sync(tool_use_id, name, arguments, read_timeout_seconds)
+            return result
+        except ConnectionError as e:
+            return self._handle_tool_execution_error(tool_use_id, e)
+
+    def stats(self) -> Dict[str, Any]:
+        """Handshakes, reconnects and how many tool calls found the session already warm."""
+        with self._stats_lock:
+            return {
+                "connected": self._is_session_active(),
+                "handshakes": self._handshakes,
+                "reconnects": self._reconnects,
+                "reconnect_failures": self._reconnect_failures,
+                "broken_sessions": self._broken_sessions,
+                "abandoned_sessions": self._abandoned_sessions,
+                "tool_calls": self._tool_calls,
+                "warm_calls": self._warm_calls,
+                "reuse_ratio": round(self._warm_calls / self._tool_calls, 4) if self._tool_calls else None,
+                "keepalive_interval_seconds": self.keepalive_interval,
+                "pings": self._pings,
+                "ping_failures": self._ping_failures,
+                "last_error": self._last_error,
+            }
@@ -0,0 +1,73 @@
+"""
+Bedrock prompt caching for the agent.
+Places cache checkpoints after the tool definitions and after the last
+assistant message of the history, so each turn reads the unchanged
+prefix (tool schemas plus earlier turns) from the cache instead of
+having the model process it again.
+"""
+
+import os
+from typing import Any, Dict
+
+from strands.hooks import AfterModelCallEvent, HookProvider, HookRegistry
+from strands.models.model import CacheConfig
+
+PROMPT_CACHE_MODES = ("auto", "tools", "off")
+
+
+def prompt_cache_mode() -> str:
+    """AGENT_PROMPT_CACHE: ``auto`` (tools + history), ``tools`` or ``off``."""
+    mode = os.getenv("AGENT_PROMPT_CACHE", "auto").lower()
+    return mode if mode in PROMPT_CACHE_MODES else "auto"
+
+
+def prompt_cache_options(mode: str = None) -> Dict[str, Any]:
+    """BedrockModel arguments for the cache checkpoints of ``mode``."""
+    mode = mode or prompt_cache_mode()
+    if mode == "off":
+        return {}
+    options: Dict[str, Any] = {"cache_tools": "default"}
+    if mode == "auto":
+        # Strands moves one checkpoint to the end of the latest assistant message every call
+        options["cache_config"] = CacheConfig(strategy="auto")
+    return options
+
+
+def cache_usage(result: Any) -> Dict[str, int]:
+    """Input/output and cache read/write token counts of one Strands AgentResult."""
+    try:
+        usage = result.metrics.latest_agent_invocation.usage
+    except AttributeError:
+        return {}
+    return {
+        "input_tokens": usage.get("inputTokens", 0),
+        "output_tokens": usage.get("outputTokens", 0),
+        "cache_read_tokens": usage.get("cacheReadInputTokens", 0),
+        "cache_write_tokens": usage.get("cacheWriteInputTokens", 0),
+    }
+
+
+class PromptCacheFallback(HookProvider):
+    """
+    Switches caching off (for the shared model) and retries the call when
+    Bedrock rejects cache checkpoints, e.g. for a model without prompt
+    caching support.
+    """
+
+    def __init__(self):
+        self.disabled_reason = None
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any):
+        registry.add_callback(AfterModelCallEvent, self._after_model)
+
+    def _after_model(self, event: AfterModelCallEvent):
+        if event.exception is None or "cach" not in str(event.exception).lower():
+            return
+        model = event.agent.model
+        config = model.get_config()
+        if not (config.get("cache_tools") or config.get("cache_config")):
+            return
+        model.update_config(cache_tools=None, cache_config=None)
+        self.disabled_reason = str(event.exception)
+        print(f"[PROMPT CACHE] disabled, model rejected cache checkpoints: {self.disabled_reason}")
+        event.retry = True
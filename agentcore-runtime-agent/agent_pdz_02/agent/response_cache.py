@@ -0,0 +1,116 @@
+"""
+Exact-match response cache for stateless invocations.
+Bounded by entry count and stored bytes, with a TTL and LRU eviction.
+Only consulted for requests that carry no session id.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+# Request header that skips the cache for one call, and the response
+# header reporting what the cache did
+CACHE_HEADER = "x-agent-cache"
+CACHE_BYPASS = "bypass"
+
+
+def wants_cache_bypass(headers: Any) -> bool:
+    """True for ``X-Agent-Cache: bypass`` or ``Cache-Control: no-cache``."""
+    if headers.get(CACHE_HEADER, "").lower() == CACHE_BYPASS:
+        return True
+    return "no-cache" in headers.get("cache-control", "").lower()
+
+
+class ResponseCache:
+    """LRU map of request key -> response text with per-entry expiry."""
+
+    def __init__(self, enabled: bool = False, max_entries: int = 256, max_bytes: int = 4 * 1024 * 1024,
+                 ttl: float = 300.0):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # key -> (expires_at, text, size_bytes)
+        self._entries: "OrderedDict[str, Tuple[float, str, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._bypassed = 0
+        self._evicted_lru = 0
+        self._expired = 0
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """Configured by AGENT_RESPONSE_CACHE / _SIZE / _MAX_BYTES / _TTL."""
+        return cls(
+            enabled=os.getenv("AGENT_RESPONSE_CACHE", "false").lower() in ("true", "1", "yes"),
+            max_entries=int(os.getenv("AGENT_RESPONSE_CACHE_SIZE", "256")),
+            max_bytes=int(os.getenv("AGENT_RESPONSE_CACHE_MAX_BYTES", str(4 * 1024 * 1024))),
+            ttl=float(os.getenv("AGENT_RESPONSE_CACHE_TTL", "300")),
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, text, size = entry
+            if expires_at <= time.monotonic():
+                self._drop(key, size)
+                self._expired += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return text
+
+    def put(self, key: str, text: str):
+        size = len(text.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (time.monotonic() + self.ttl, text, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evicted_lru += 1
+
+    def record_bypass(self):
+        with self._lock:
+            self._bypassed += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _drop(self, key: str, size: int):
+        del self._entries[key]
+        self._bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "bypassed": self._bypassed,
+                "evicted_lru": self._evicted_lru,
+                "expired": self._expired,
+            }
@@ -0,0 +1,123 @@
+"""
+Tool executors for the agent.
+When the model asks for several tools in one turn they are dispatched
+together over the shared MCP session, at most ``max_concurrency`` at a
+time, and their results are put back in the order the model asked for
+them. A sequential executor is kept for comparison; both time each batch.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections.abc import AsyncGenerator
+from typing import Any, Callable, Dict, List, Optional
+
+from strands.tools.executors import ConcurrentToolExecutor, SequentialToolExecutor
+
+
+class ToolBatchStats:
+    """Wall time of each turn's tool batch versus the time its calls took one by one."""
+
+    def __init__(self, mode: str, max_concurrency: int):
+        self.mode = mode
+        self.max_concurrency = max_concurrency
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._calls = 0
+        self._max_batch = 0
+        self._wall_seconds = 0.0
+        self._call_seconds = 0.0
+        # Called with (tool calls, wall seconds) after each batch
+        self.on_batch: Optional[Callable[[int, float], None]] = None
+
+    def record(self, calls: int, wall: float, call_seconds: float):
+        with self._lock:
+            self._batches += 1
+            self._calls += calls
+            self._max_batch = max(self._max_batch, calls)
+            self._wall_seconds += wall
+            self._call_seconds += call_seconds
+        if self.on_batch is not None:
+            self.on_batch(calls, wall)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "max_concurrency": self.max_concurrency,
+                "batches": self._batches,
+                "tool_calls": self._calls,
+                "max_batch_size": self._max_batch,
+                "avg_batch_ms": round(self._wall_seconds / self._batches * 1000, 2) if self._batches else 0.0,
+                "avg_serial_ms": round(self._call_seconds / self._batches * 1000, 2) if self._batches else 0.0,
+                # Summed call time over wall time; 1.0 means the calls did not overlap
+                "speedup": round(self._call_seconds / self._wall_seconds, 2) if self._wall_seconds else None,
+            }
+
+
+class OrderedConcurrentToolExecutor(ConcurrentToolExecutor):
+    """
+    Strands' concurrent executor with a per-turn concurrency cap.
+
+    The stock executor appends results in completion order, so the tool
+    result message (and everything downstream: history, response cache
+    keys, prompt caching) would vary from run to run; results are sorted
+    back into request order once the batch is done.
+    """
+
+    def __init__(self, max_concurrency: int = 4, stats: Optional[ToolBatchStats] = None):
+        super().__init__()
+        self.max_concurrency = max_concurrency
+        self.stats = stats or ToolBatchStats("concurrent", max_concurrency)
+        # One limiter and call timer per running turn, keyed by its tool_results list
+        self._turns: Dict[int, List[Any]] = {}
+
+    async def _execute(self, agent: Any, tool_uses: list, tool_results: list, *args: Any,
+                       **kwargs: Any) -> AsyncGenerator[Any, None]:
+        turn = id(tool_results)
+        self._turns[turn] = [asyncio.Semaphore(max(1, self.max_concurrency)), 0.0]
+        started = time.perf_counter()
+        try:
+            async for event in super()._execute(agent, tool_uses, tool_results, *args, **kwargs):
+                yield event
+        finally:
+            call_seconds = self._turns.pop(turn)[1]
+        self.stats.record(len(tool_uses), time.perf_counter() - started, call_seconds)
+
+        order = {tool_use["toolUseId"]: i for i, tool_use in enumerate(tool_uses)}
+        # Results of rejected or resumed tool uses are not in this batch; they stay in front
+        tool_results.sort(key=lambda result: order.get(result["toolUseId"], -1))
+
+    async def _task(self, agent: Any, tool_use: Any, tool_results: list, *args: Any) -> None:
+        turn = self._turns[id(tool_results)]
+        async with turn[0]:
+            started = time.perf_counter()
+            try:
+                await super()._task(agent, tool_use, tool_results, *args)
+            finally:
+                turn[1] += time.perf_counter() - started
+
+
+class TimedSequentialToolExecutor(SequentialToolExecutor):
+    """Strands' sequential executor, timed the same way for comparison."""
+
+    def __init__(self, stats: Optional[ToolBatchStats] = None):
+        super().__init__()
+        self.stats = stats or ToolBatchStats("sequential", 1)
+
+    async def _execute(self, agent: Any, tool_uses: list, tool_results: list, *args: Any,
+                       **kwargs: Any) -> AsyncGenerator[Any, None]:
+        started = time.perf_counter()
+        async for event in super()._execute(agent, tool_uses, tool_results, *args, **kwargs):
+            yield event
+        wall = time.perf_counter() - started
+        self.stats.record(len(tool_uses), wall, wall)
+
+
+def tool_executor_from_env():
+    """AGENT_TOOL_EXECUTION=concurrent|sequential, AGENT_TOOL_CONCURRENCY caps each turn."""
+    mode = os.getenv("AGENT_TOOL_EXECUTION", "concurrent").lower()
+    if mode == "sequential":
+        return TimedSequentialToolExecutor()
+    return OrderedConcurrentToolExecutor(max_concurrency=int(os.getenv("AGENT_TOOL_CONCURRENCY", "4")))
@@ -0,0 +1,134 @@
+"""
+Memoized MCP tool results.
+Tools that are pure functions of their arguments can be answered from a
+local cache instead of a round-trip to the MCP server. Only tools named
+in the opt-in list are cached; entries are bounded by count and bytes,
+expire after a TTL and are evicted LRU.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+def canonical_arguments(arguments: Optional[Dict[str, Any]]) -> str:
+    """Arguments as JSON with sorted keys and no whitespace, so equal calls get equal keys."""
+    return json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class ToolResultCache:
+    """LRU map of (tool, canonical arguments) -> successful tool result, per-entry expiry."""
+
+    def __init__(self, tools: Iterable[str] = (), max_entries: int = 1024, max_bytes: int = 8 * 1024 * 1024,
+                 ttl: float = 600.0):
+        self.tools = frozenset(tools)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # key -> (expires_at, tool, result without toolUseId, size_bytes)
+        self._entries: "OrderedDict[str, Tuple[float, str, Dict[str, Any], int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # tool -> [hits, misses, stores]
+        self._per_tool: Dict[str, list] = {name: [0, 0, 0] for name in self.tools}
+        self._evicted_lru = 0
+        self._expired = 0
+        self._too_large = 0
+
+    @classmethod
+    def from_env(cls) -> "ToolResultCache":
+        """Configured by AGENT_TOOL_CACHE_TOOLS / _SIZE / _MAX_BYTES / _TTL."""
+        tools = [name.strip() for name in os.getenv("AGENT_TOOL_CACHE_TOOLS", "").split(",") if name.strip()]
+        return cls(
+            tools=tools,
+            max_entries=int(os.getenv("AGENT_TOOL_CACHE_SIZE", "1024")),
+            max_bytes=int(os.getenv("AGENT_TOOL_CACHE_MAX_BYTES", str(8 * 1024 * 1024))),
+            ttl=float(os.getenv("AGENT_TOOL_CACHE_TTL", "600")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.tools)
+
+    def cacheable(self, name: str) -> bool:
+        return name in self.tools
+
+    @staticmethod
+    def key(name: str, arguments: Optional[Dict[str, Any]]) -> str:
+        digest = hashlib.sha256(canonical_arguments(arguments).encode("utf-8")).hexdigest()
+        return f"{name}:{digest}"
+
+    def get(self, tool_use_id: str, name: str, arguments: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """The cached result re-addressed to ``tool_use_id``, or None on a miss."""
+        key = self.key(name, arguments)
+        with self._lock:
+            counts = self._per_tool[name]
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._drop(key)
+                self._expired += 1
+                entry = None
+            if entry is None:
+                counts[1] += 1
+                return None
+            self._entries.move_to_end(key)
+            counts[0] += 1
+            result = entry[2]
+        return {**result, "toolUseId": tool_use_id, "content": list(result["content"])}
+
+    def put(self, name: str, arguments: Optional[Dict[str, Any]], result: Dict[str, Any]):
+        """Store a successful result; errors are never cached."""
+        if result.get("status") != "success":
+            return
+        stored = {k: v for k, v in result.items() if k != "toolUseId"}
+        size = len(json.dumps(stored, default=str).encode("utf-8"))
+        key = self.key(name, arguments)
+        with self._lock:
+            if size > self.max_bytes:
+                self._too_large += 1
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, name, stored, size)
+            self._bytes += size
+            self._per_tool[name][2] += 1
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, _, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evicted_lru += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _drop(self, key: str):
+        self._bytes -= self._entries.pop(key)[3]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            per_tool = {}
+            for name, (hits, misses, stores) in sorted(self._per_tool.items()):
+                lookups = hits + misses
+                per_tool[name] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "stores": stores,
+                    "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                }
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "evicted_lru": self._evicted_lru,
+                "expired": self._expired,
+                "too_large": self._too_large,
+                "tools": per_tool,
+            }
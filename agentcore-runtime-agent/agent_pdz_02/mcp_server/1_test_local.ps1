@@ -19,7 +19,7 @@ Write-Host "`n[2/3] Starting container..."
 docker stop mcp-server-test 2>$null | Out-Null
 docker rm mcp-server-test 2>$null | Out-Null
 
-docker run --platform linux/arm64 -p 8000:8000 --name mcp-server-test -d $IMAGE | Out-Null
+docker run --platform linux/arm64 -p 8000:8000 -e MCP_DATA_DIR=/tmp/mcp-data --name mcp-server-test -d $IMAGE | Out-Null
 
 if ($LASTEXITCODE -ne 0) {
     Write-Host "ERROR - Container start failed"
@@ -0,0 +1,97 @@
+"""
+Benchmark: calculate_statistics across input sizes.
+
+Compares the previous implementation (full sort for the median, separate
+pure-Python passes for sum, variance, min and max) with the NumPy path
+and the pure-Python single-pass fallback. Every series is checked to give
+exactly the same result dict on all three before it is timed.
+
+Run from agent_pdz_02/mcp_server:  python benchmark_statistics.py --sizes 10,1000,100000,1000000
+"""
+
+import argparse
+import contextlib
+import io
+import math
+import random
+import statistics
+import time
+from typing import Callable, Dict, List
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import mcp_server
+
+
+def previous_statistics(numbers: List[float]) -> Dict[str, float]:
+    """calculate_statistics as it was before the vectorized and single-pass paths."""
+    sorted_nums = sorted(numbers)
+    count = len(numbers)
+    total = sum(numbers)
+    mean = total / count
+    if count % 2 == 0:
+        median = (sorted_nums[count // 2 - 1] + sorted_nums[count // 2]) / 2
+    else:
+        median = sorted_nums[count // 2]
+    variance = sum((x - mean) ** 2 for x in numbers) / count
+    return {
+        "mean": round(mean, 4),
+        "median": round(median, 4),
+        "std_dev": round(math.sqrt(variance), 4),
+        "min": min(numbers),
+        "max": max(numbers),
+        "sum": round(total, 4),
+        "count": count
+    }
+
+
+def series(size: int, seed: int) -> List[float]:
+    """Prices-like data: a random walk with rounded values, so the median often has ties."""
+    rng = random.Random(seed)
+    value, numbers = 100.0, []
+    for _ in range(size):
+        value += rng.gauss(0, 1)
+        numbers.append(round(value, 2))
+    return numbers
+
+
+def timed(fn: Callable[[List[float]], Dict[str, float]], numbers: List[float], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(numbers)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000,10000,100000,1000000",
+                        help="comma-separated series lengths")
+    parser.add_argument("--seeds", type=int, default=5, help="series checked for identical results per size")
+    args = parser.parse_args()
+
+    implementations = [("previous", previous_statistics), ("python", mcp_server._statistics_python)]
+    if mcp_server.np is not None:
+        implementations.append(("numpy", mcp_server._statistics_numpy))
+    else:
+        print("NumPy is not installed; timing the pure-Python path only")
+
+    header = "".join(f"{name + ' ms':>14}" for name, _ in implementations)
+    print(f"{'size':>10}{header}{'speedup':>10}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        for seed in range(args.seeds):
+            numbers = series(size, seed)
+            expected = previous_statistics(numbers)
+            for name, fn in implementations[1:]:
+                if fn(numbers) != expected:
+                    raise SystemExit(f"{name} differs from the previous result at size {size}, seed {seed}")
+        numbers = series(size, args.seeds)
+        repeat = max(3, min(200, 200_000 // size))
+        timings = [timed(fn, numbers, repeat) for _, fn in implementations]
+        row = "".join(f"{seconds * 1000:>14.3f}" for seconds in timings)
+        print(f"{size:>10}{row}{timings[0] / min(timings[1:]):>9.1f}x")
+    print("results identical to the previous implementation at every size")
+
+
+if __name__ == "__main__":
+    main()
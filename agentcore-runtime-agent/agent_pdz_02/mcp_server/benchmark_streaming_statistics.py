@@ -0,0 +1,90 @@
+"""
+Benchmark: statistics_accumulate / statistics_summary on series fed in chunks.
+
+Folds each series into a RunningStatistics chunk by chunk, as the tools do,
+then checks the result against the exact values: mean, std_dev, min, max
+and count must match calculate_statistics. While the sketch is exact, the
+median must match too and every percentile must equal the value interpolated
+between its two closest ranks; after that, the median and every percentile
+must be within the sketch's reported rank error of their true rank. Prints the fold time, how many
+values the sketch holds and the worst rank error seen.
+
+Run from agent_pdz_02/mcp_server:  python benchmark_streaming_statistics.py --sizes 10000,1000000 --chunk 50000
+"""
+
+import argparse
+import bisect
+import contextlib
+import io
+import time
+
+from benchmark_statistics import series
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import mcp_server
+
+PERCENTILES = [0, 1, 5, 25, 50, 75, 95, 99, 99.9, 100]
+
+
+def rank_error(ordered, value, fraction):
+    """Distance from ``fraction`` to the range of ranks ``value`` occupies in the sorted data."""
+    low = bisect.bisect_left(ordered, value) / len(ordered)
+    high = bisect.bisect_right(ordered, value) / len(ordered)
+    return 0.0 if low <= fraction <= high else min(abs(low - fraction), abs(high - fraction))
+
+
+def interpolated(ordered, fraction):
+    """Percentile by linear interpolation between the closest ranks (NumPy's default method)."""
+    position = fraction * (len(ordered) - 1)
+    below = min(int(position), len(ordered) - 1)
+    above = min(below + 1, len(ordered) - 1)
+    return ordered[below] + (position - below) * (ordered[above] - ordered[below])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,100000,1000000,5000000", help="comma-separated series lengths")
+    parser.add_argument("--chunk", type=int, default=50000, help="values per statistics_accumulate call")
+    args = parser.parse_args()
+
+    print(f"sketch k={mcp_server.SKETCH_K}")
+    print(f"{'size':>10}{'chunks':>8}{'fold ms':>10}{'sketch values':>15}{'worst rank error':>18}{'bound':>8}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        numbers = series(size, 0)
+        started = time.perf_counter()
+        accumulator = mcp_server.RunningStatistics()
+        for i in range(0, size, args.chunk):
+            accumulator.merge(mcp_server.RunningStatistics.of_chunk(numbers[i:i + args.chunk]))
+        summary = accumulator.summary(PERCENTILES)
+        elapsed = time.perf_counter() - started
+
+        exact = mcp_server._statistics(numbers)
+        # The median is exact until the sketch compacts; after that it is held to the rank error bound
+        keys = ("mean", "median", "std_dev", "min", "max", "count") if summary["exact"] else \
+            ("mean", "std_dev", "min", "max", "count")
+        for key in keys:
+            if summary[key] != exact[key]:
+                raise SystemExit(f"{key} differs at size {size}: {summary[key]} != {exact[key]}")
+        ordered = sorted(numbers)
+        if summary["exact"]:
+            for p in PERCENTILES:
+                expected = round(interpolated(ordered, p / 100), 4)
+                if abs(summary["percentiles"][f"p{p:g}"] - expected) > 1e-9 * max(1.0, abs(expected)):
+                    raise SystemExit(f"p{p:g} differs at size {size}: {summary['percentiles'][f'p{p:g}']} != {expected}")
+            if summary["percentiles"]["p50"] != summary["median"]:
+                raise SystemExit(f"p50 differs from the median at size {size}")
+            print(f"{size:>10}{accumulator.chunks:>8}{elapsed * 1000:>10.1f}{summary['sketch_values']:>15}"
+                  f"{'exact':>18}{summary['rank_error']:>8}")
+            continue
+        worst = max(rank_error(ordered, summary["percentiles"][f"p{p:g}"], p / 100) for p in PERCENTILES)
+        worst = max(worst, rank_error(ordered, summary["median"], 0.5))
+        if worst > summary["rank_error"]:
+            raise SystemExit(f"rank error {worst:.4f} above the bound {summary['rank_error']} at size {size}")
+        print(f"{size:>10}{accumulator.chunks:>8}{elapsed * 1000:>10.1f}{summary['sketch_values']:>15}"
+              f"{worst:>18.5f}{summary['rank_error']:>8}")
+    print("moments identical to calculate_statistics; median and percentiles exact while the sketch is, "
+          "then within the rank error bound")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: text_analyzer across document sizes.
+
+Compares the previous implementation (a copy of the text without spaces,
+three scans for sentence endings, one list of all words, a per-word dict
+loop and a full sort of the vocabulary for the top 5) with the chunked
+Counter/heapq path. Every document is checked to give exactly the same
+values for the previous fields on both before it is timed. --memory also
+reports peak allocations (tracemalloc, in a separate untimed run).
+
+Run from agent_pdz_02/mcp_server:  python benchmark_text_analyzer.py --sizes 1K,1M,50M
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import random
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import mcp_server
+
+UNITS = {"K": 1 << 10, "M": 1 << 20}
+
+
+def previous_text_analyzer(text: str) -> Dict[str, Any]:
+    """text_analyzer as it was before the chunked Counter/heapq path."""
+    char_count = len(text)
+    char_no_spaces = len(text.replace(" ", ""))
+    words = text.split()
+    word_count = len(words)
+
+    sentence_endings = ['.', '!', '?']
+    sentence_count = sum(text.count(ending) for ending in sentence_endings)
+    sentence_count = max(sentence_count, 1)
+
+    avg_word_length = sum(len(word) for word in words) / word_count if word_count > 0 else 0
+
+    word_freq = {}
+    for word in words:
+        word_lower = word.lower().strip('.,!?;:')
+        word_freq[word_lower] = word_freq.get(word_lower, 0) + 1
+
+    top_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:5]
+
+    return {
+        "characters": char_count,
+        "characters_no_spaces": char_no_spaces,
+        "words": word_count,
+        "sentences": sentence_count,
+        "avg_word_length": round(avg_word_length, 2),
+        "avg_words_per_sentence": round(word_count / sentence_count, 2),
+        "top_5_words": [{"word": word, "count": count} for word, count in top_words]
+    }
+
+
+def document(size: int, seed: int) -> str:
+    """Prose-like text: Zipf-distributed vocabulary, capitalized sentence starts, punctuation, paragraphs."""
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(50000)]
+    weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    parts, length = [], 0
+    while length < size:
+        words = rng.choices(vocabulary, cum_weights=weights, k=rng.randint(5, 25))
+        words[0] = words[0].capitalize()
+        if rng.random() < 0.3:
+            words[rng.randrange(len(words))] += rng.choice(",;:")
+        sentence = " ".join(words) + rng.choice("..!?") + ("\n\n" if rng.random() < 0.1 else " ")
+        parts.append(sentence)
+        length += len(sentence)
+    return "".join(parts)[:size]
+
+
+def timed(fn: Callable[[str], Dict[str, Any]], text: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(text)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def peak_bytes(fn: Callable[[str], Dict[str, Any]], text: str) -> int:
+    tracemalloc.start()
+    try:
+        fn(text)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1K,10K,100K,1M,10M,50M",
+                        help="comma-separated document sizes in characters (K/M suffixes)")
+    parser.add_argument("--memory", action="store_true", help="also report peak allocations")
+    args = parser.parse_args()
+
+    implementations = [("previous", previous_text_analyzer), ("chunked", mcp_server._analyze_text)]
+    memory_header = "".join(f"{name + ' MB':>14}" for name, _ in implementations) if args.memory else ""
+    print(f"{'size':>8}{'previous ms':>14}{'chunked ms':>14}{'speedup':>10}{memory_header}")
+    for label in args.sizes.split(","):
+        size = int(label[:-1]) * UNITS[label[-1].upper()] if label[-1].upper() in UNITS else int(label)
+        text = document(size, 0)
+        result, expected = mcp_server._analyze_text(text), previous_text_analyzer(text)
+        # Every previous field must match; top_words is new
+        if {key: result[key] for key in expected} != expected or result["top_words"] != expected["top_5_words"]:
+            raise SystemExit(f"chunked result differs from the previous one at size {label}")
+        repeat = max(3, min(200, (20 << 20) // size))
+        timings = [timed(fn, text, repeat) for _, fn in implementations]
+        row = f"{label:>8}" + "".join(f"{seconds * 1000:>14.2f}" for seconds in timings)
+        row += f"{timings[0] / timings[1]:>9.1f}x"
+        if args.memory:
+            row += "".join(f"{peak_bytes(fn, text) / (1 << 20):>14.1f}" for _, fn in implementations)
+        print(row)
+    print("previous fields identical to the previous implementation at every size")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,32 @@ Provides advanced tools via Model Context Protocol.
 """
 
 from mcp.server.fastmcp import FastMCP
-from typing import Dict, List, Any
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from typing import Dict, Iterator, List, Any, Optional
+from array import array
+from collections import Counter, OrderedDict
+import bisect
+import codecs
+import heapq
+import itertools
 import math
+import mmap
+import operator
+import os
+import random
+import threading
+import time
+import uuid
 from datetime import datetime
 
+try:
+    import numpy as np
+except ImportError:  # calculate_statistics falls back to a single-pass pure-Python path
+    np = None
+
 # ============================================================================
 # MCP Server Configuration
 # ============================================================================
@@ -27,44 +49,624 @@ print("[INFO] Host: 0.0.0.0:8000")
 print("=" * 70 + "\n")
 
 
+# ============================================================================
+# Statistics
+# ============================================================================
+
+# Below this many values the pure-Python path is faster than converting to an array
+NUMPY_MIN_SIZE = 64
+# Lists up to this size are sorted outright to find the median
+SORT_MAX_SIZE = 30000
+
+
+def _order_statistics(values: List[float], ranks: List[int]) -> List[float]:
+    """
+    The values at the given ascending 0-based ranks of ``values``, in expected O(n) without sorting it.
+    Two pivots taken from a sorted random sample bracket the ranks; one pass counts the values below
+    the bracket and one collects those inside it, which is small enough to sort. If the sample was
+    unlucky and a rank falls outside the bracket, the whole list is sorted instead.
+    """
+    count = len(values)
+    if count <= SORT_MAX_SIZE:
+        ordered = sorted(values)
+        return [ordered[k] for k in ranks]
+    size = int(count ** (2 / 3))
+    sample = sorted(random.sample(values, size))
+    margin = int(3 * math.sqrt(size))
+    low = sample[max(0, ranks[0] * size // count - margin)]
+    high = sample[min(size - 1, ranks[-1] * size // count + margin)]
+    below = sum(map(float(low).__gt__, values))
+    band = [x for x in values if low <= x <= high]
+    if below <= ranks[0] and ranks[-1] < below + len(band):
+        band.sort()
+        return [band[k - below] for k in ranks]
+    ordered = sorted(values)
+    return [ordered[k] for k in ranks]
+
+
+def _median_ranks(count: int) -> List[int]:
+    return [count // 2 - 1, count // 2] if count % 2 == 0 else [count // 2]
+
+
+def _summary(total: float, median: float, variance: float, low: float, high: float, count: int) -> Dict[str, float]:
+    return {
+        "mean": round(total / count, 4),
+        "median": round(median, 4),
+        "std_dev": round(math.sqrt(variance), 4),
+        "min": low,
+        "max": high,
+        "sum": round(total, 4),
+        "count": count
+    }
+
+
+def _statistics_python(numbers: List[float]) -> Dict[str, float]:
+    """Welford's single pass for the variance, minimum and maximum; selection for the median."""
+    # The builtin sum is a C loop, and keeps sum and mean exactly as they always were
+    total = sum(numbers)
+    mean = 0.0
+    m2 = 0.0
+    low = high = numbers[0]
+    for n, x in enumerate(numbers, 1):
+        delta = x - mean
+        mean += delta / n
+        m2 += delta * (x - mean)
+        if x < low:
+            low = x
+        elif x > high:
+            high = x
+    count = len(numbers)
+    middle = _order_statistics(numbers, _median_ranks(count))
+    median = (middle[0] + middle[1]) / 2 if len(middle) == 2 else middle[0]
+    return _summary(total, median, m2 / count, low, high, count)
+
+
+def _statistics_numpy(numbers: List[float]) -> Dict[str, float]:
+    return _statistics_numpy_batch([numbers])[0]
+
+
+def _statistics_numpy_batch(batch: List[List[float]]) -> List[Dict[str, float]]:
+    """
+    Several non-empty series in one array: moments and extremes are reduced per series in
+    single vectorized passes (ufunc.reduceat over the series offsets); np.partition on each
+    series' slice gives its median.
+    """
+    counts = np.fromiter(map(len, batch), dtype=np.int64, count=len(batch))
+    offsets = np.zeros(len(batch), dtype=np.int64)
+    np.cumsum(counts[:-1], out=offsets[1:])
+    values = np.fromiter(itertools.chain.from_iterable(batch), dtype=np.float64, count=int(counts.sum()))
+    # NumPy sums pairwise; the builtin sum keeps sum and mean identical to the pure-Python path
+    totals = [sum(numbers) for numbers in batch]
+    deviations = values - np.repeat(np.array(totals) / counts, counts)
+    squares = np.add.reduceat(deviations * deviations, offsets)
+    lows = np.minimum.reduceat(values, offsets)
+    highs = np.maximum.reduceat(values, offsets)
+    results = []
+    for i, total in enumerate(totals):
+        count = len(batch[i])
+        ranks = _median_ranks(count)
+        middle = np.partition(values[offsets[i]:offsets[i] + count], ranks)[ranks]
+        median = (float(middle[0]) + float(middle[1])) / 2 if len(ranks) == 2 else float(middle[0])
+        results.append(_summary(total, median, float(squares[i]) / count,
+                                float(lows[i]), float(highs[i]), count))
+    return results
+
+
+def _statistics_numpy_buffer(numbers: array) -> Dict[str, float]:
+    """
+    A float64 array (file input) without copying it: a zero-copy view, one scratch array squared in
+    place for the variance, and the median partitioned in the array itself, so it is reordered.
+    Same reductions as the list path, so the result is identical.
+    """
+    values = np.frombuffer(numbers, dtype=np.float64)
+    count = len(values)
+    total = sum(numbers)
+    low, high = float(values.min()), float(values.max())
+    deviations = values - total / count
+    np.multiply(deviations, deviations, out=deviations)
+    squares = float(np.add.reduce(deviations))
+    del deviations
+    ranks = _median_ranks(count)
+    values.partition(ranks)
+    median = (float(values[ranks[0]]) + float(values[ranks[1]])) / 2 if len(ranks) == 2 else float(values[ranks[0]])
+    return _summary(total, median, squares / count, low, high, count)
+
+
+def _statistics(numbers: List[float]) -> Dict[str, float]:
+    if np is not None and len(numbers) >= NUMPY_MIN_SIZE:
+        if isinstance(numbers, array):
+            return _statistics_numpy_buffer(numbers)
+        return _statistics_numpy(numbers)
+    return _statistics_python(numbers)
+
+
+def _statistics_batch(batch: List[List[float]]) -> List[Dict[str, float]]:
+    if np is not None and sum(map(len, batch)) >= NUMPY_MIN_SIZE:
+        return _statistics_numpy_batch(batch)
+    return [_statistics_python(numbers) for numbers in batch]
+
+
+# ============================================================================
+# Streaming statistics
+# ============================================================================
+
+# KLL accuracy parameter: the sketch keeps about 3k values whatever the data size
+SKETCH_K = int(os.getenv("MCP_STATS_SKETCH_K", "200"))
+# Smallest compactor, and the factor by which each level below the top shrinks (KLL's c)
+SKETCH_MIN_CAPACITY = 8
+SKETCH_DECAY = 2 / 3
+MAX_ACCUMULATORS = int(os.getenv("MCP_STATS_MAX_ACCUMULATORS", "1000"))
+ACCUMULATOR_TTL = float(os.getenv("MCP_STATS_ACCUMULATOR_TTL", "3600"))
+DEFAULT_PERCENTILES = [1, 5, 25, 50, 75, 95, 99]
+
+
+class QuantileSketch:
+    """
+    KLL quantile sketch (Karnin, Lang, Liberty 2016). Values sit in compactors; a value at level h
+    stands for 2**h inputs. When the sketch is over its budget, the lowest overfull level is sorted
+    and every other value (random offset) is promoted a level up. Two sketches merge by pooling
+    their levels and compacting, so chunks can be sketched on their own and folded in.
+    """
+
+    def __init__(self, k: int = SKETCH_K):
+        self.k = k
+        self.levels: List[List[float]] = [[]]
+        self.count = 0
+
+    @property
+    def exact(self) -> bool:
+        """True until the first compaction: every value is still held."""
+        return len(self.levels) == 1
+
+    @property
+    def size(self) -> int:
+        return sum(map(len, self.levels))
+
+    def rank_error(self) -> float:
+        """Normalized rank error of a quantile at 99% confidence (the DataSketches fit for KLL)."""
+        return 0.0 if self.exact else 2.296 / self.k ** 0.9723
+
+    def update(self, values: List[float]):
+        # Already sorted values (a sorted chunk) make the first compaction linear
+        self.levels[0].extend(values)
+        self.count += len(values)
+        self._compress()
+
+    def merge(self, other: "QuantileSketch"):
+        self.levels.extend([] for _ in range(len(other.levels) - len(self.levels)))
+        for level, values in zip(self.levels, other.levels):
+            level.extend(values)
+        self.count += other.count
+        self._compress()
+
+    def quantiles(self, fractions: List[float]) -> List[float]:
+        """
+        While exact, interpolated between the two values either side of rank q * (count - 1), so p50
+        is the median calculate_statistics gives. After that, each value stands at the middle of the
+        ranks it represents and the quantile is interpolated between the values either side of rank
+        q * count.
+        """
+        if self.exact:
+            ordered = sorted(self.levels[0])
+            return [self._interpolate_exact(ordered, q) for q in fractions]
+        weighted = sorted((x, 1 << h) for h, level in enumerate(self.levels) for x in level)
+        return [self._interpolate_weighted(weighted, q * self.count) for q in fractions]
+
+    def median(self) -> float:
+        return self.quantiles([0.5])[0]
+
+    @staticmethod
+    def _interpolate_exact(ordered: List[float], fraction: float) -> float:
+        position = fraction * (len(ordered) - 1)
+        below = min(int(position), len(ordered) - 1)
+        share = position - below
+        if share == 0:
+            return ordered[below]
+        # (1 - share) * a + share * b is exactly (a + b) / 2 at the midpoint, as the median averages
+        return (1 - share) * ordered[below] + share * ordered[below + 1]
+
+    @staticmethod
+    def _interpolate_weighted(weighted: List[tuple], target: float) -> float:
+        rank = 0
+        previous_value = previous_rank = None
+        for value, weight in weighted:
+            position = rank + weight / 2
+            if position >= target:
+                if previous_rank is None:
+                    return value
+                share = (target - previous_rank) / (position - previous_rank)
+                return previous_value + share * (value - previous_value)
+            previous_value, previous_rank = value, position
+            rank += weight
+        return weighted[-1][0]
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(SKETCH_MIN_CAPACITY, math.ceil(self.k * SKETCH_DECAY ** depth))
+
+    def _compress(self):
+        while self.size > sum(map(self._capacity, range(len(self.levels)))):
+            h = next(h for h, level in enumerate(self.levels) if len(level) > self._capacity(h))
+            if h + 1 == len(self.levels):
+                self.levels.append([])
+            level = sorted(self.levels[h])
+            # An odd value out stays behind, so the total weight stays equal to the count
+            self.levels[h] = [level.pop()] if len(level) % 2 else []
+            self.levels[h + 1].extend(level[random.getrandbits(1)::2])
+
+
+class RunningStatistics:
+    """
+    Mergeable moments (count, sum, sum of squared deviations, min, max) plus a QuantileSketch:
+    constant memory however many chunks are folded in. Moments merge exactly (Chan et al.);
+    percentiles are approximate once the sketch has compacted.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.m2 = 0.0
+        self.low = math.inf
+        self.high = -math.inf
+        self.chunks = 0
+        self.sketch = QuantileSketch()
+        self.last_used = time.monotonic()
+
+    @classmethod
+    def of_chunk(cls, numbers: List[float]) -> "RunningStatistics":
+        """Statistics of one non-empty chunk; its sorted values seed the sketch."""
+        chunk = cls()
+        chunk.count = len(numbers)
+        chunk.total = sum(numbers)
+        mean = chunk.total / chunk.count
+        if np is not None and chunk.count >= NUMPY_MIN_SIZE:
+            values = np.fromiter(numbers, dtype=np.float64, count=chunk.count)
+            deviations = values - mean
+            chunk.m2 = float(deviations @ deviations)
+            ordered = np.sort(values).tolist()
+        else:
+            chunk.m2 = sum((x - mean) * (x - mean) for x in numbers)
+            ordered = sorted(map(float, numbers))
+        chunk.low, chunk.high = ordered[0], ordered[-1]
+        chunk.chunks = 1
+        chunk.sketch.update(ordered)
+        return chunk
+
+    def merge(self, other: "RunningStatistics"):
+        count = self.count + other.count
+        if self.count:
+            delta = other.total / other.count - self.total / self.count
+            self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        else:
+            self.m2 = other.m2
+        self.count = count
+        self.total += other.total
+        self.low = min(self.low, other.low)
+        self.high = max(self.high, other.high)
+        self.chunks += other.chunks
+        self.sketch.merge(other.sketch)
+
+    def summary(self, percentiles: List[float]) -> Dict[str, Any]:
+        values = self.sketch.quantiles([p / 100 for p in percentiles])
+        return {
+            "mean": round(self.total / self.count, 4),
+            "median": round(self.sketch.median(), 4),
+            "std_dev": round(math.sqrt(self.m2 / self.count), 4),
+            "min": self.low,
+            "max": self.high,
+            "sum": round(self.total, 4),
+            "count": self.count,
+            "chunks": self.chunks,
+            "percentiles": {f"p{p:g}": round(value, 4) for p, value in zip(percentiles, values)},
+            "exact": self.sketch.exact,
+            "rank_error": round(self.sketch.rank_error(), 4),
+            "sketch_values": self.sketch.size
+        }
+
+
+class Accumulators:
+    """Named RunningStatistics, least recently used evicted first, idle ones expired after ``ttl`` seconds."""
+
+    def __init__(self, max_size: int = MAX_ACCUMULATORS, ttl: float = ACCUMULATOR_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._items: "OrderedDict[str, RunningStatistics]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, name: str, chunk: RunningStatistics) -> RunningStatistics:
+        with self._lock:
+            self._expire()
+            accumulator = self._items.pop(name, None) or RunningStatistics()
+            accumulator.merge(chunk)
+            accumulator.last_used = time.monotonic()
+            self._items[name] = accumulator
+            while len(self._items) > self.max_size:
+                evicted, _ = self._items.popitem(last=False)
+                print(f"  [INFO] accumulator '{evicted}' evicted (limit {self.max_size})")
+            return accumulator
+
+    def get(self, name: str, remove: bool = False) -> Optional[RunningStatistics]:
+        with self._lock:
+            self._expire()
+            if remove:
+                return self._items.pop(name, None)
+            accumulator = self._items.get(name)
+            if accumulator is not None:
+                accumulator.last_used = time.monotonic()
+                self._items.move_to_end(name)
+            return accumulator
+
+    def _expire(self):
+        # Caller holds the lock
+        cutoff = time.monotonic() - self.ttl
+        while self._items:
+            name, accumulator = next(iter(self._items.items()))
+            if accumulator.last_used > cutoff:
+                break
+            del self._items[name]
+
+
+accumulators = Accumulators()
+
+
+# ============================================================================
+# Text analysis
+# ============================================================================
+
+# Characters tokenized at a time: one chunk stays in cache for all the counts over it
+TEXT_CHUNK_SIZE = 1 << 20
+SENTENCE_ENDINGS = ".!?"
+WORD_PUNCTUATION = ".,!?;:"
+
+
+class TextStatistics:
+    """
+    text_analyzer's counts, fed chunk by chunk so a large text is never split into one list of
+    words. Each chunk is lowercased at once and its words counted with Counter (in C); stripping
+    punctuation then happens once per distinct word instead of once per occurrence.
+    """
+
+    def __init__(self):
+        self.characters = 0
+        self.spaces = 0
+        self.sentence_endings = 0
+        self.words = 0
+        self.word_characters = 0
+        self.frequencies: Dict[str, int] = {}
+        self._pending: List[str] = []
+
+    def feed(self, chunk: str):
+        self.characters += len(chunk)
+        self.spaces += chunk.count(" ")
+        # Three C-level counts over a cached chunk beat one regex scan (re.findall was ~4x slower)
+        self.sentence_endings += sum(map(chunk.count, SENTENCE_ENDINGS))
+        # Only whole words are tokenized; the part after the last whitespace waits for the next chunk
+        cut = max(chunk.rfind(" "), chunk.rfind("\n"), chunk.rfind("\t"))
+        if cut < 0:
+            self._pending.append(chunk)
+            return
+        self._pending.append(chunk[:cut])
+        self._count_words("".join(self._pending))
+        self._pending = [chunk[cut + 1:]]
+
+    def finish(self) -> "TextStatistics":
+        self._count_words("".join(self._pending))
+        self._pending = []
+        return self
+
+    def _count_words(self, text: str):
+        lowered = text.lower()
+        words = lowered.split()
+        self.words += len(words)
+        # lower() lengthens a few characters (e.g. "İ"), never whitespace; take what it added back out
+        self.word_characters += sum(map(len, words)) - (len(lowered) - len(text))
+        frequencies = self.frequencies
+        get = frequencies.get
+        for word, count in Counter(words).items():
+            word = word.strip(WORD_PUNCTUATION)
+            frequencies[word] = get(word, 0) + count
+
+    def top_words(self, k: int) -> List[Dict[str, Any]]:
+        # Same order as a full stable sort by count: ties keep first-seen order
+        top = heapq.nlargest(k, self.frequencies.items(), key=operator.itemgetter(1))
+        return [{"word": word, "count": count} for word, count in top]
+
+    def summary(self, top_k: int) -> Dict[str, Any]:
+        sentences = max(self.sentence_endings, 1)
+        # top_5_words keeps the original field whatever top_k is; top_words holds the top_k
+        top = self.top_words(max(top_k, 5))
+        return {
+            "characters": self.characters,
+            "characters_no_spaces": self.characters - self.spaces,
+            "words": self.words,
+            "sentences": sentences,
+            "avg_word_length": round(self.word_characters / self.words, 2) if self.words else 0,
+            "avg_words_per_sentence": round(self.words / sentences, 2),
+            "top_5_words": top[:5],
+            "top_words": top[:top_k]
+        }
+
+
+def _analyze_text(text: str, top_k: int = 5) -> Dict[str, Any]:
+    stats = TextStatistics()
+    for start in range(0, len(text), TEXT_CHUNK_SIZE):
+        stats.feed(text[start:start + TEXT_CHUNK_SIZE])
+    return stats.finish().summary(top_k)
+
+
+# ============================================================================
+# File input
+# ============================================================================
+
+# Files the tools may read by name; unset disables file input and uploads
+DATA_DIR = os.getenv("MCP_DATA_DIR", "")
+# Bytes read from a mapped file at a time
+FILE_CHUNK_SIZE = 1 << 20
+NUMBER_SEPARATORS = (b" ", b"\n", b",", b"\t")
+MAX_BLOB_BYTES = int(os.getenv("MCP_MAX_BLOB_BYTES", str(1 << 30)))
+BLOB_TTL = float(os.getenv("MCP_BLOB_TTL", "3600"))
+
+
+def _data_path(name: str) -> str:
+    """Absolute path of ``name`` inside the data directory; ValueError if it is missing or escapes it."""
+    if not DATA_DIR:
+        raise ValueError("File input is disabled on this server (MCP_DATA_DIR is not set)")
+    root = os.path.realpath(DATA_DIR)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"File '{name}' is outside the data directory")
+    if not os.path.isfile(path):
+        raise ValueError(f"File '{name}' not found")
+    return path
+
+
+def _mapped_chunks(path: str) -> Iterator[bytes]:
+    """The file's bytes, FILE_CHUNK_SIZE at a time, through a read-only mmap."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, "madvise"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            released = 0
+            for start in range(0, len(mapped), FILE_CHUNK_SIZE):
+                yield mapped[start:start + FILE_CHUNK_SIZE]
+                # The chunk was copied out; drop its pages so resident memory stays at about one chunk.
+                # madvise takes whole pages, so a page the next chunk still starts in is kept for now
+                done = min(start + FILE_CHUNK_SIZE, len(mapped)) // mmap.PAGESIZE * mmap.PAGESIZE
+                if hasattr(mapped, "madvise") and done > released:
+                    mapped.madvise(mmap.MADV_DONTNEED, released, done - released)
+                    released = done
+
+
+def _read_numbers(name: str) -> array:
+    """
+    Numbers separated by whitespace and/or commas (e.g. a one-column CSV), parsed chunk by chunk
+    into a float64 array: 8 bytes per value instead of a Python float and a JSON list entry.
+    """
+    path = _data_path(name)
+    values = array("d")
+    tail = b""
+    try:
+        for chunk in _mapped_chunks(path):
+            chunk = tail + chunk
+            # A number cut by the chunk boundary is finished by the next chunk
+            cut = max(map(chunk.rfind, NUMBER_SEPARATORS))
+            values.extend(map(float, chunk[:cut + 1].replace(b",", b" ").split()))
+            tail = chunk[cut + 1:]
+        values.extend(map(float, tail.replace(b",", b" ").split()))
+    except ValueError as e:
+        raise ValueError(f"File '{name}' is not a list of numbers ({e})") from None
+    return values
+
+
+def _analyze_file(name: str, top_k: int) -> Dict[str, Any]:
+    """text_analyzer over a UTF-8 file, decoded and tokenized chunk by chunk; the text is never one string."""
+    stats = TextStatistics()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for chunk in _mapped_chunks(_data_path(name)):
+        stats.feed(decoder.decode(chunk))
+    stats.feed(decoder.decode(b"", final=True))
+    return stats.finish().summary(top_k)
+
+
+def _preview(numbers: List[float], limit: int = 10) -> str:
+    return f"{numbers[:limit]}{'...' if len(numbers) > limit else ''} ({len(numbers)} values)"
+
+
 # ============================================================================
 # Tools
 # ============================================================================
 
 @mcp.tool()
-def calculate_statistics(numbers: List[float]) -> Dict[str, float]:
-    """Calculate comprehensive statistics for a list of numbers."""
+def calculate_statistics(numbers: Optional[List[float]] = None, file: Optional[str] = None) -> Dict[str, Any]:
+    """Calculate comprehensive statistics for a list of numbers, or for a file of numbers separated by whitespace or commas in the server's data directory (file: its name, or the file returned by a blob upload)."""
     print(f"\n[TOOL CALL] calculate_statistics")
-    print(f"  Parameters: numbers={numbers}")
+    print(f"  Parameters: {f'file={file!r}' if file is not None else f'numbers={_preview(numbers or [])}'}")
+    
+    if (numbers is None) == (file is None):
+        print(f"  Result: ERROR - Need numbers or file")
+        return {"error": "Provide either numbers or file"}
+    
+    if file is not None:
+        try:
+            numbers = _read_numbers(file)
+        except (ValueError, OSError) as e:
+            print(f"  Result: ERROR - {str(e)}")
+            return {"error": str(e)}
     
     if not numbers:
         print(f"  Result: ERROR - Empty list")
         return {"error": "Empty list provided"}
     
-    sorted_nums = sorted(numbers)
-    count = len(numbers)
-    total = sum(numbers)
-    mean = total / count
+    result = _statistics(numbers)
     
-    if count % 2 == 0:
-        median = (sorted_nums[count // 2 - 1] + sorted_nums[count // 2]) / 2
-    else:
-        median = sorted_nums[count // 2]
+    print(f"  Result: mean={result['mean']}, median={result['median']}, std_dev={result['std_dev']}")
+    return result
+
+
+@mcp.tool()
+def calculate_statistics_batch(series: Dict[str, List[float]]) -> Dict[str, Any]:
+    """Calculate the same statistics as calculate_statistics for several named series in one call (e.g. the columns of a table); returns the statistics keyed by series name."""
+    print(f"\n[TOOL CALL] calculate_statistics_batch")
+    print(f"  Parameters: series={', '.join(f'{name}: {len(numbers)} values' for name, numbers in series.items())}")
+    
+    if not series:
+        print(f"  Result: ERROR - No series")
+        return {"error": "No series provided"}
     
-    variance = sum((x - mean) ** 2 for x in numbers) / count
-    std_dev = math.sqrt(variance)
+    names = [name for name, numbers in series.items() if numbers]
+    result = {name: {"error": "Empty list provided"} for name, numbers in series.items() if not numbers}
+    result.update(zip(names, _statistics_batch([series[name] for name in names])))
+    # Keep the caller's order
+    result = {name: result[name] for name in series}
     
+    print(f"  Result: {len(names)} series computed, {len(series) - len(names)} empty")
+    return result
+
+
+@mcp.tool()
+def statistics_accumulate(accumulator_id: str, numbers: List[float]) -> Dict[str, Any]:
+    """Add a chunk of numbers to a named running statistics accumulator (created on first use); send a dataset too large for one call in chunks, then call statistics_summary with the same accumulator_id."""
+    print(f"\n[TOOL CALL] statistics_accumulate")
+    print(f"  Parameters: accumulator_id={accumulator_id!r}, numbers={_preview(numbers)}")
+    
+    if not numbers:
+        print(f"  Result: ERROR - Empty list")
+        return {"error": "Empty list provided"}
+    
+    # The chunk is summarized outside the lock; only the merge is serialized
+    accumulator = accumulators.add(accumulator_id, RunningStatistics.of_chunk(numbers))
     result = {
-        "mean": round(mean, 4),
-        "median": round(median, 4),
-        "std_dev": round(std_dev, 4),
-        "min": min(numbers),
-        "max": max(numbers),
-        "sum": round(total, 4),
-        "count": count
+        "accumulator_id": accumulator_id,
+        "chunks": accumulator.chunks,
+        "count": accumulator.count,
+        "sketch_values": accumulator.sketch.size
     }
     
-    print(f"  Result: mean={result['mean']}, median={result['median']}, std_dev={result['std_dev']}")
+    print(f"  Result: chunks={result['chunks']}, count={result['count']}, sketch_values={result['sketch_values']}")
+    return result
+
+
+@mcp.tool()
+def statistics_summary(accumulator_id: str, percentiles: Optional[List[float]] = None, reset: bool = False) -> Dict[str, Any]:
+    """Statistics of everything added to an accumulator with statistics_accumulate: exact mean, std_dev, min, max, sum and count, plus median and percentiles (0-100, default 1, 5, 25, 50, 75, 95, 99) from a quantile sketch, approximate within rank_error. reset=true discards the accumulator afterwards."""
+    print(f"\n[TOOL CALL] statistics_summary")
+    print(f"  Parameters: accumulator_id={accumulator_id!r}, percentiles={percentiles}, reset={reset}")
+    
+    percentiles = DEFAULT_PERCENTILES if percentiles is None else percentiles
+    if not all(0 <= p <= 100 for p in percentiles):
+        print(f"  Result: ERROR - Percentile out of range")
+        return {"error": "Percentiles must be between 0 and 100"}
+    
+    accumulator = accumulators.get(accumulator_id, remove=reset)
+    if accumulator is None:
+        print(f"  Result: ERROR - Unknown accumulator")
+        return {"error": f"Unknown accumulator '{accumulator_id}' (never filled, reset or expired)"}
+    
+    result = {"accumulator_id": accumulator_id, **accumulator.summary(percentiles)}
+    
+    print(f"  Result: count={result['count']}, mean={result['mean']}, median={result['median']}, rank_error={result['rank_error']}")
     return result
 
 
@@ -93,43 +695,84 @@ def compound_interest(principal: float, rate: float, time: float, frequency: int
 
 
 @mcp.tool()
-def text_analyzer(text: str) -> Dict[str, Any]:
-    """Analyze text and provide comprehensive statistics."""
+def text_analyzer(text: Optional[str] = None, top_k: int = 5, file: Optional[str] = None) -> Dict[str, Any]:
+    """Analyze text and provide comprehensive statistics, including the top_k most frequent words (default 5) under top_words. Pass the text inline, or a UTF-8 file in the server's data directory (file: its name, or the file returned by a blob upload)."""
     print(f"\n[TOOL CALL] text_analyzer")
-    print(f"  Parameters: text='{text[:50]}{'...' if len(text) > 50 else ''}'")
-    
-    char_count = len(text)
-    char_no_spaces = len(text.replace(" ", ""))
-    words = text.split()
-    word_count = len(words)
-    
-    sentence_endings = ['.', '!', '?']
-    sentence_count = sum(text.count(ending) for ending in sentence_endings)
-    sentence_count = max(sentence_count, 1)
-    
-    avg_word_length = sum(len(word) for word in words) / word_count if word_count > 0 else 0
-    
-    word_freq = {}
-    for word in words:
-        word_lower = word.lower().strip('.,!?;:')
-        word_freq[word_lower] = word_freq.get(word_lower, 0) + 1
+    if file is not None:
+        print(f"  Parameters: file={file!r}, top_k={top_k}")
+    else:
+        preview = text or ""
+        print(f"  Parameters: text='{preview[:50]}{'...' if len(preview) > 50 else ''}' ({len(preview)} characters), top_k={top_k}")
     
-    top_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:5]
+    if (text is None) == (file is None):
+        print(f"  Result: ERROR - Need text or file")
+        return {"error": "Provide either text or file"}
+    if top_k < 1:
+        print(f"  Result: ERROR - top_k below 1")
+        return {"error": "top_k must be at least 1"}
     
-    result = {
-        "characters": char_count,
-        "characters_no_spaces": char_no_spaces,
-        "words": word_count,
-        "sentences": sentence_count,
-        "avg_word_length": round(avg_word_length, 2),
-        "avg_words_per_sentence": round(word_count / sentence_count, 2),
-        "top_5_words": [{"word": word, "count": count} for word, count in top_words]
-    }
+    try:
+        result = _analyze_file(file, top_k) if file is not None else _analyze_text(text, top_k)
+    except (ValueError, OSError) as e:
+        print(f"  Result: ERROR - {str(e)}")
+        return {"error": str(e)}
     
     print(f"  Result: words={result['words']}, characters={result['characters']}, sentences={result['sentences']}")
     return result
 
 
+# ============================================================================
+# Blob uploads
+# ============================================================================
+
+def _sweep_blobs(blob_dir: str):
+    """Delete blobs (and abandoned partial uploads) older than MCP_BLOB_TTL."""
+    cutoff = time.time() - BLOB_TTL
+    for entry in os.scandir(blob_dir):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            # Removed by a concurrent sweep
+            pass
+
+
+@mcp.custom_route("/blobs", methods=["POST"])
+async def upload_blob(request: Request) -> JSONResponse:
+    """
+    Store the raw request body in the data directory and return the file name the tools accept,
+    so large inputs skip JSON encoding. File I/O runs on worker threads, so an upload never blocks
+    the event loop (and the tool calls on it); expired blobs are swept after the response is sent.
+    """
+    if not DATA_DIR:
+        return JSONResponse({"error": "Uploads are disabled on this server (MCP_DATA_DIR is not set)"}, status_code=404)
+    blob_dir = os.path.join(DATA_DIR, "blobs")
+    await run_in_threadpool(os.makedirs, blob_dir, exist_ok=True)
+    
+    name = uuid.uuid4().hex
+    path = os.path.join(blob_dir, name)
+    size = 0
+    f = await run_in_threadpool(open, path + ".part", "wb")
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > MAX_BLOB_BYTES:
+                break
+            await run_in_threadpool(f.write, chunk)
+    except BaseException:
+        await run_in_threadpool(f.close)
+        await run_in_threadpool(os.remove, path + ".part")
+        raise
+    await run_in_threadpool(f.close)
+    if size > MAX_BLOB_BYTES:
+        await run_in_threadpool(os.remove, path + ".part")
+        return JSONResponse({"error": f"Blob larger than {MAX_BLOB_BYTES} bytes"}, status_code=413)
+    await run_in_threadpool(os.replace, path + ".part", path)
+    
+    print(f"\n[BLOB] stored blobs/{name} ({size} bytes)")
+    return JSONResponse({"file": f"blobs/{name}", "bytes": size}, background=BackgroundTask(_sweep_blobs, blob_dir))
+
+
 # ============================================================================
 # Server Entry Point
 # ============================================================================
@@ -3,10 +3,11 @@ import boto3
 import json
 import os
 import sys
+import uuid
 from botocore.exceptions import ClientError
 
 
-def call_mcp(client, runtime_arn, method, params=None):
+def call_mcp(client, runtime_arn, method, params=None, session_id=None):
     """
     Call an MCP method on the agent runtime.
     
@@ -15,6 +16,7 @@ def call_mcp(client, runtime_arn, method, params=None):
         runtime_arn: The runtime ARN
         method: The MCP method to call (e.g., 'tools/list', 'tools/call')
         params: Optional parameters for the method
+        session_id: Optional runtime session id (33+ chars); calls sharing one reach the same instance
     
     Returns:
         The result from the MCP response
@@ -29,13 +31,16 @@ def call_mcp(client, runtime_arn, method, params=None):
         "params": params
     }).encode()
 
+    kwargs = {"runtimeSessionId": session_id} if session_id else {}
+
     try:
         response = client.invoke_agent_runtime(
             agentRuntimeArn=runtime_arn,
             payload=payload,
             qualifier='DEFAULT',
             contentType='application/json',
-            accept='application/json, text/event-stream'
+            accept='application/json, text/event-stream',
+            **kwargs
         )
 
         raw = response['response'].read().decode()
@@ -88,8 +93,34 @@ def main():
         print(json.dumps(stats_result['content'], indent=2))
         print()
         
-        # Test 2: compound_interest
-        print("[Test 2] compound_interest(principal=1000, rate=5, time=10)")
+        # Test 2: calculate_statistics_batch
+        print("[Test 2] calculate_statistics_batch({'a': [10, 20, 30], 'b': [1.5, 2.5, 3.5, 4.5]})")
+        batch_result = call_mcp(client, runtime_arn, "tools/call", {
+            "name": "calculate_statistics_batch",
+            "arguments": {"series": {"a": [10, 20, 30], "b": [1.5, 2.5, 3.5, 4.5]}}
+        })
+        print("Result:")
+        print(json.dumps(batch_result['content'], indent=2))
+        print()
+        
+        # Test 3: statistics_accumulate + statistics_summary (accumulators live in one instance)
+        print("[Test 3] statistics_accumulate([10, 20, 30]), statistics_accumulate([40, 50]), statistics_summary")
+        session_id = f"mcp-test-statistics-{uuid.uuid4()}"
+        for chunk in ([10, 20, 30], [40, 50]):
+            call_mcp(client, runtime_arn, "tools/call", {
+                "name": "statistics_accumulate",
+                "arguments": {"accumulator_id": "test", "numbers": chunk}
+            }, session_id=session_id)
+        summary_result = call_mcp(client, runtime_arn, "tools/call", {
+            "name": "statistics_summary",
+            "arguments": {"accumulator_id": "test", "reset": True}
+        }, session_id=session_id)
+        print("Result:")
+        print(json.dumps(summary_result['content'], indent=2))
+        print()
+        
+        # Test 4: compound_interest
+        print("[Test 4] compound_interest(principal=1000, rate=5, time=10)")
         interest_result = call_mcp(client, runtime_arn, "tools/call", {
             "name": "compound_interest",
             "arguments": {
@@ -103,8 +134,8 @@ def main():
         print(json.dumps(interest_result['content'], indent=2))
         print()
         
-        # Test 3: text_analyzer
-        print("[Test 3] text_analyzer('Hello world. This is a test.')")
+        # Test 5: text_analyzer
+        print("[Test 5] text_analyzer('Hello world. This is a test.')")
         text_result = call_mcp(client, runtime_arn, "tools/call", {
             "name": "text_analyzer",
             "arguments": {"text": "Hello world. This is a test."}
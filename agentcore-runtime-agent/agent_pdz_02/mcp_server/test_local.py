@@ -1,5 +1,6 @@
 """Test MCP Server locally"""
 import asyncio
+import httpx
 from mcp import ClientSession
 from mcp.client.streamable_http import streamablehttp_client
 
@@ -26,14 +27,36 @@ async def test_mcp():
                 result = await session.call_tool("calculate_statistics", {"numbers": [10, 20, 30, 40, 50]})
                 print(f"Result: {result.content[0].text}\n")
                 
-                print("[Test 2] compound_interest")
+                print("[Test 2] calculate_statistics_batch")
+                result = await session.call_tool("calculate_statistics_batch",
+                                                 {"series": {"a": [10, 20, 30], "b": [1.5, 2.5, 3.5, 4.5]}})
+                print(f"Result: {result.content[0].text}\n")
+                
+                print("[Test 3] statistics_accumulate + statistics_summary")
+                for chunk in ([10, 20, 30], [40, 50]):
+                    result = await session.call_tool("statistics_accumulate",
+                                                     {"accumulator_id": "test", "numbers": chunk})
+                    print(f"Chunk: {result.content[0].text}")
+                result = await session.call_tool("statistics_summary", {"accumulator_id": "test", "reset": True})
+                print(f"Result: {result.content[0].text}\n")
+                
+                print("[Test 4] compound_interest")
                 result = await session.call_tool("compound_interest", {"principal": 1000, "rate": 5, "time": 10})
                 print(f"Result: {result.content[0].text}\n")
                 
-                print("[Test 3] text_analyzer")
+                print("[Test 5] text_analyzer")
                 result = await session.call_tool("text_analyzer", {"text": "Hello world. This is a test."})
                 print(f"Result: {result.content[0].text}\n")
                 
+                print("[Test 6] blob upload + text_analyzer(file=...)")
+                upload = httpx.post("http://localhost:8000/blobs", content="Hello world. This is a test.".encode())
+                if upload.status_code == 404:
+                    print("Skipped: file input is disabled (MCP_DATA_DIR is not set)\n")
+                else:
+                    upload.raise_for_status()
+                    result = await session.call_tool("text_analyzer", {"file": upload.json()["file"]})
+                    print(f"Result: {result.content[0].text}\n")
+                
                 print("=" * 70)
                 print(" All tests passed!")
                 print("=" * 70)